@@ -1,6 +1,6 @@
 """Anthropic API client implementation."""
 
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, Tuple
 from anthropic import Anthropic, APIError, APIStatusError
 from anthropic.types import Message, TextBlock, ToolUseBlock
 import json
@@ -120,7 +120,7 @@ class AnthropicClient(Client):
         max_tokens: Optional[int] = None,
         tools: Optional[List[Dict[str, Any]]] = None,
         tool_choice: Optional[Dict[str, Any]] = None,
-    ) -> Message:
+    ) -> Tuple[Message, Optional[Dict[str, int]]]:
         """Make API call to Anthropic."""
         try:
             params = {
@@ -135,7 +135,8 @@ class AnthropicClient(Client):
                 if tool_choice:
                     params["tool_choice"] = tool_choice
 
-            return self.client.messages.create(**params)
+            response = self.client.messages.create(**params)
+            return response, self._parse_usage(response.usage)
         except APIStatusError as e:
             # HTTP error with status code (4xx or 5xx)
             raise ClientAPIError(e) from e
@@ -1,7 +1,7 @@
 """Base client for LLM API implementations."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from pathlib import Path
 import importlib.util
 from .conversation_manager import ConversationManager
@@ -14,6 +14,9 @@ from ..types import (
 )
 from prometheus_swarm.utils.logging import log_section, log_key_value, log_error
 from prometheus_swarm.utils.errors import ClientAPIError
+from prometheus_swarm.utils.tracing import start_span
+from prometheus_swarm.utils.budget import ToolLoopBudget, BudgetTracker
+from prometheus_swarm.utils.tool_cache import ToolResultCache
 from prometheus_swarm.utils.retry import (
     is_retryable_error,
     send_message_with_retry,
@@ -62,6 +65,26 @@ class Client(ABC):
         """Convert API response to internal message format."""
         pass
 
+    @staticmethod
+    def _parse_usage(usage: Any) -> Optional[Dict[str, int]]:
+        """Token usage reported by the API for a call, or None if not reported.
+
+        Accepts Anthropic-style (input_tokens/output_tokens) or OpenAI-style
+        (prompt_tokens/completion_tokens) usage objects.
+        """
+        if usage is None:
+            return None
+        input_tokens = getattr(usage, "input_tokens", None)
+        if input_tokens is None:
+            input_tokens = getattr(usage, "prompt_tokens", None)
+        output_tokens = getattr(usage, "output_tokens", None)
+        if output_tokens is None:
+            output_tokens = getattr(usage, "completion_tokens", None)
+        return {
+            "input_tokens": input_tokens or 0,
+            "output_tokens": output_tokens or 0,
+        }
+
     @abstractmethod
     def _make_api_call(
         self,
@@ -71,11 +94,14 @@ class Client(ABC):
         tools: Optional[List[Dict[str, Any]]] = None,
         tool_choice: Optional[Dict[str, Any]] = None,
         extra_headers: Optional[Dict[str, str]] = None,
-    ) -> Any:
+    ) -> Tuple[Any, Optional[Dict[str, int]]]:
         """Make API call to the LLM service.
 
         This method should be implemented by each client to handle the specifics of their API.
         The base class will handle error logging and wrapping.
+
+        Returns the response and its token usage (see _parse_usage). Usage is
+        returned rather than stored on the client, which threads share.
         """
         pass
 
@@ -87,10 +113,11 @@ class Client(ABC):
         tools: Optional[List[Dict[str, Any]]] = None,
         tool_choice: Optional[Dict[str, Any]] = None,
         extra_headers: Optional[Dict[str, str]] = None,
-    ) -> Any:
+    ) -> Tuple[Any, Optional[Dict[str, int]]]:
         """Make API call with error handling.
 
         This method wraps the client-specific _make_api_call with common error handling.
+        Returns the response and its token usage.
         """
         try:
             # Build kwargs based on what the specific client implementation supports
@@ -106,7 +133,11 @@ class Client(ABC):
             if extra_headers:
                 kwargs["extra_headers"] = extra_headers
 
-            return self._make_api_call(**kwargs)
+            with start_span(
+                f"llm {self.api_name}",
+                attributes={"llm.model": self.model, "llm.messages": len(messages)},
+            ):
+                return self._make_api_call(**kwargs)
         except Exception as e:
             # Only wrap non-ClientAPIError exceptions
             if not isinstance(e, ClientAPIError):
@@ -248,7 +279,8 @@ class Client(ABC):
                     log_key_value(key, value)
 
             tool = self.tools[tool_name]
-            result = tool["function"](**tool_args)
+            with start_span(f"tool {tool_name}", attributes={"tool.name": tool_name}):
+                result = tool["function"](**tool_args)
 
             # Log result
             log_section("TOOL RESULT")
@@ -458,7 +490,7 @@ class Client(ABC):
             )
 
             # Make API call - errors will already be wrapped in ClientAPIError
-            response = self.make_api_call(
+            response, usage = self.make_api_call(
                 messages=api_messages,
                 system_prompt=system_prompt,
                 max_tokens=max_tokens,
@@ -481,8 +513,9 @@ class Client(ABC):
                         f"{block['tool_call']['name']} (ID: {block['tool_call']['id']})",
                     )
 
-            # Add conversation_id to converted response
+            # Add conversation_id and token usage to converted response
             converted_response["conversation_id"] = conversation_id
+            converted_response["usage"] = usage
 
             # Save to storage if not a retry
             if not is_retry:
@@ -502,6 +535,55 @@ class Client(ABC):
             )
             raise
 
+    def _budget_exhausted(
+        self,
+        stop_reason: str,
+        tracker: BudgetTracker,
+        conversation_id: str,
+        tool_calls: List[ToolCallContent],
+        tool_results: List[Dict[str, str]],
+    ) -> List[Dict[str, str]]:
+        """Build the result returned when the tool loop budget runs out.
+
+        The agent's last tool calls are answered in the conversation, those not
+        run with a stub result, so it stays valid if it is continued later.
+        """
+        log_section("TOOL LOOP BUDGET EXHAUSTED")
+        log_key_value("Reason", stop_reason)
+        for key, value in tracker.summary().items():
+            log_key_value(key, value)
+
+        answered = {result["tool_call_id"] for result in tool_results}
+        stubs = [
+            {
+                "tool_call_id": tool_call["id"],
+                "response": str(
+                    {
+                        "success": False,
+                        "message": f"Not run, tool loop stopped: {stop_reason}",
+                        "data": None,
+                    }
+                ),
+            }
+            for tool_call in tool_calls
+            if tool_call["id"] not in answered
+        ]
+        tool_message = self._format_tool_response(json.dumps(tool_results + stubs))
+        self.storage.save_message(conversation_id, "tool", tool_message["content"])
+
+        return [
+            {
+                "tool_call_id": None,
+                "response": str(
+                    {
+                        "success": False,
+                        "message": f"Tool loop stopped: {stop_reason}",
+                        "data": {"stop_reason": stop_reason, **tracker.summary()},
+                    }
+                ),
+            }
+        ]
+
     def _get_tool_calls(self, msg: MessageContent) -> List[ToolCallContent]:
         """Return all tool call blocks from the message."""
         tool_calls = []
@@ -510,35 +592,72 @@ class Client(ABC):
                 tool_calls.append(block["tool_call"])
         return tool_calls
 
-    def handle_tool_response(self, response, context: Dict[str, Any]):
+    def handle_tool_response(
+        self,
+        response,
+        context: Dict[str, Any],
+        budget: Optional[ToolLoopBudget] = None,
+    ):
         """
         Handle tool responses until natural completion.
         If a tool has final_tool=True and was successful, returns immediately after executing that tool.
         Otherwise continues until the agent has no more tool calls.
+
+        Repeated identical calls to cacheable (read-only) tools return a reference
+        to the earlier result until a write touches the paths they read.
+
+        If the budget is exhausted, stops early and returns a single failed result
+        whose data contains the stop_reason. Tool calls left unanswered get a stub
+        result in the conversation.
         """
         conversation_id = response["conversation_id"]
         last_results = []  # Track the most recent results
-        MAX_ITERATIONS = 500
-        for _ in range(MAX_ITERATIONS):
+        tracker = (budget or ToolLoopBudget()).start()
+        cache = ToolResultCache()
+        while True:
+            tracker.record_response(response)
             tool_calls = self._get_tool_calls(response)
             if not tool_calls:
                 # No more tool calls, return the last results we got
                 return last_results
 
+            stop_reason = tracker.check()
+            if stop_reason:
+                return self._budget_exhausted(
+                    stop_reason, tracker, conversation_id, tool_calls, []
+                )
+
             # Process all tool calls in the current response
             tool_results = []
             for tool_call in tool_calls:
+                stop_reason = tracker.check_tool_call(
+                    tool_call["name"], tool_call["arguments"]
+                ) or tracker.check()
+                if stop_reason:
+                    return self._budget_exhausted(
+                        stop_reason, tracker, conversation_id, tool_calls, tool_results
+                    )
                 try:
                     # Update tool arguments with context
                     tool_call["arguments"].update(context)
-                    # Execute the tool with retry
-                    result = execute_tool_with_retry(self, tool_call)
-                    if not result:
-                        result = {
-                            "success": False,
-                            "message": "Tool output is None",
-                            "data": None,
-                        }
+                    tool = self.tools.get(tool_call["name"])
+                    # Reuse an earlier identical read if nothing it read has changed
+                    result = None
+                    if tool:
+                        result = cache.lookup(tool, tool_call["arguments"])
+                    if result is None:
+                        # Execute the tool with retry
+                        result = execute_tool_with_retry(self, tool_call)
+                        if not result:
+                            result = {
+                                "success": False,
+                                "message": "Tool output is None",
+                                "data": None,
+                            }
+                        if tool:
+                            cache.record(
+                                tool, tool_call["arguments"], tool_call["id"], result
+                            )
 
                     # Add result to tool_results
                     tool_results.append(
@@ -1,6 +1,6 @@
 """OpenAI API client implementation."""
 
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, Tuple
 import litellm
 from .base_client import Client
 from ..types import (
@@ -164,7 +164,7 @@ class OllamaClient(Client):
         max_tokens: Optional[int] = None,
         tools: Optional[List[Dict[str, Any]]] = None,
         tool_choice: Optional[Dict[str, Any]] = None,
-    ) -> Dict[str, Any]:
+    ) -> Tuple[Any, Optional[Dict[str, int]]]:
         """Make API call to OpenAI."""
         try:
 
@@ -191,10 +191,11 @@ class OllamaClient(Client):
             # params = {'model': 'ollama/llama3.1:8b', 'messages': [{'role': 'user', 'content': 'List the files in the current directory'}], 'tools': [{'type': 'function', 'function': {'name': 'execute_command', 'description': 'Execute a shell command in the current working directory', 'parameters': {'type': 'object', 'properties': {'command': {'type': 'string', 'description': 'The command to execute'}}, 'required': ['command']}}}, {'type': 'function', 'function': {'name': 'run_tests', 'description': 'Run tests using a specified framework.', 'parameters': {'type': 'object', 'properties': {'path': {'type': 'string', 'description': 'Path to test file or directory.'}, 'framework': {'type': 'string', 'description': 'Test framework to use.', 'enum': ['pytest', 'jest']}}, 'required': ['framework', 'path']}}}]}
             try:
                 response = litellm.completion(**params)
-                return response.choices[0].message
+                usage = self._parse_usage(getattr(response, "usage", None))
+                return response.choices[0].message, usage
             except Exception as e:
                 print("ERROR: ", e)
-                return str(e)
+                return str(e), None
 
         except Exception as e:
             # Only wrap actual API errors
@@ -1,6 +1,6 @@
 """OpenAI API client implementation."""
 
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, Tuple
 from openai import OpenAI
 from .base_client import Client
 from ..types import (
@@ -162,7 +162,7 @@ class OpenAIClient(Client):
         tools: Optional[List[Dict[str, Any]]] = None,
         tool_choice: Optional[Dict[str, Any]] = None,
         extra_headers: Optional[Dict[str, str]] = None,
-    ) -> Dict[str, Any]:
+    ) -> Tuple[Any, Optional[Dict[str, int]]]:
         """Make API call to OpenAI."""
         # Add system message if provided
         if system_prompt:
@@ -189,7 +189,8 @@ class OpenAIClient(Client):
 
         # Make API call
         response = self.client.chat.completions.create(**params)
-        return response.choices[0].message
+        usage = self._parse_usage(getattr(response, "usage", None))
+        return response.choices[0].message, usage
 
     def _format_tool_response(self, response: str) -> MessageContent:
         """Format a tool response into a message.
@@ -7,6 +7,7 @@ from contextlib import contextmanager
 from typing import Optional, Dict, Any
 from .models import Conversation, Message, Log
 import json
+import threading
 
 # Import engine from shared config
 from .config import engine
@@ -20,19 +21,32 @@ def get_db():
 
     Returns a Flask-managed session if in app context, otherwise a thread-local session.
     The session is automatically managed:
-    - In Flask context: Session is stored in g and cleaned up when the request ends
+    - In Flask context: Session is stored in g and cleaned up when the request ends;
+      other threads sharing the context get their own session
     - Outside Flask context: Use get_session() context manager for automatic cleanup
     """
+    session = _app_session()
+    return session if session is not None else Session()
+
+
+def _app_session():
+    """The app context's session, if this thread may use it.
+
+    Worker threads that copied the request's context see the same g, but a
+    Session isn't thread-safe: only the thread that created g.db uses it.
+    """
     try:
         from flask import g, has_app_context
 
         if has_app_context():
             if "db" not in g:
                 g.db = Session()
-            return g.db
+                g.db_thread = threading.get_ident()
+            if g.get("db_thread") == threading.get_ident():
+                return g.db
     except ImportError:
         pass
-    return Session()
+    return None
 
 
 def initialize_database():
@@ -157,11 +171,6 @@ def get_session():
         session.rollback()
         raise
     finally:
-        # Only close if not in Flask context (Flask handles closing)
-        try:
-            from flask import has_app_context
-
-            if not has_app_context():
-                session.close()
-        except ImportError:
+        # Flask closes the app context's session when the request ends
+        if session is not _app_session():
             session.close()
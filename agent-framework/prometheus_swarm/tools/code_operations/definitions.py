@@ -0,0 +1,71 @@
+from prometheus_swarm.tools.code_operations.implementations import (
+    get_file_outline,
+    search_code,
+)
+
+DEFINITIONS = {
+    "search_code": {
+        "name": "search_code",
+        "description": "Search the contents of files in the repository for text or a regular expression. Returns matching lines with their file, line number and surrounding context. Use this to find where something is defined or used instead of reading files one by one.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "pattern": {
+                    "type": "string",
+                    "description": "Text to search for, or a regular expression if regex is true",
+                },
+                "regex": {
+                    "type": "boolean",
+                    "description": "Treat pattern as a regular expression. Defaults to false.",
+                },
+                "case_sensitive": {
+                    "type": "boolean",
+                    "description": "Match case. Defaults to true.",
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Directory to search in. Defaults to the repository root.",
+                },
+                "include": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only search files matching these globs, e.g. ['*.py', 'src/*']",
+                },
+                "exclude": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Skip files matching these globs, e.g. ['tests/*']",
+                },
+                "context_lines": {
+                    "type": "integer",
+                    "description": "Lines of context before and after each match (0-10). Defaults to 2.",
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum matching lines to return (up to 200). Defaults to 50.",
+                },
+            },
+            "required": ["pattern"],
+        },
+        "function": search_code,
+        "cacheable": True,
+        "path_args": ["path"],
+    },
+    "get_file_outline": {
+        "name": "get_file_outline",
+        "description": "Get an outline of a source file: its classes, functions and methods with their signatures, first docstring line and start/end line numbers. Use this to understand a large file, then read only the line ranges you need with read_file instead of reading the whole file.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string",
+                    "description": "Path to the file to outline",
+                },
+            },
+            "required": ["file_path"],
+        },
+        "function": get_file_outline,
+        "cacheable": True,
+        "path_args": ["file_path"],
+    },
+}
@@ -0,0 +1,295 @@
+"""Module for code search and navigation."""
+
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from prometheus_swarm.types import ToolOutput
+from prometheus_swarm.utils.workspace import current_workspace
+from prometheus_swarm.utils.workspace_index import (
+    MAX_CACHED_FILE_BYTES,
+    get_workspace_index,
+)
+from prometheus_swarm.tools.code_operations.outline import cached_outline
+from prometheus_swarm.tools.code_operations.search_index import (
+    get_search_index,
+    required_literals,
+)
+
+# Caps on what search_code returns, to keep results small
+MAX_SEARCH_RESULTS = 200
+MAX_CONTEXT_LINES = 10
+MAX_LINE_LENGTH = 300
+# Files larger than this are skipped by search_code
+MAX_SEARCH_FILE_BYTES = 5 * 1024 * 1024
+# Files larger than this are not outlined
+MAX_OUTLINE_FILE_BYTES = 5 * 1024 * 1024
+
+
+def _normalize_path(path: str) -> str:
+    """Helper function to normalize paths by stripping leading slashes."""
+    return path.lstrip("/")
+
+
+def _as_list(value: Union[str, List[str], None]) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return list(value)
+
+
+def _walk_files(directory: Path) -> List[str]:
+    """List files outside a git repository, skipping .git and node_modules."""
+    files = []
+    for root, dirs, filenames in os.walk(directory):
+        dirs[:] = [d for d in dirs if d not in (".git", "node_modules")]
+        rel_root = os.path.relpath(root, directory)
+        for filename in filenames:
+            rel = filename if rel_root == "." else os.path.join(rel_root, filename)
+            files.append(Path(rel).as_posix())
+    return sorted(files)
+
+
+def _clip(line: str) -> str:
+    line = line.rstrip("\n")
+    if len(line) > MAX_LINE_LENGTH:
+        return line[:MAX_LINE_LENGTH] + "..."
+    return line
+
+
+def _search_file(
+    root: Path, rel: str, regex: re.Pattern, context_lines: int, limit: int
+) -> List[Dict[str, Any]]:
+    """Find up to limit matching lines in one file."""
+    full_path = root / rel
+    try:
+        if full_path.stat().st_size > MAX_SEARCH_FILE_BYTES:
+            return []
+        with open(full_path, "r", errors="replace") as f:
+            text = f.read()
+    except OSError:
+        return []
+    if "\0" in text[:8192] or not regex.search(text):
+        return []
+
+    lines = text.splitlines()
+    matches = []
+    for number, line in enumerate(lines, 1):
+        if not regex.search(line):
+            continue
+        match = {"file": rel, "line": number, "text": _clip(line)}
+        if context_lines:
+            start = max(number - 1 - context_lines, 0)
+            after = lines[number : number + context_lines]
+            match["before"] = [_clip(l) for l in lines[start : number - 1]]
+            match["after"] = [_clip(l) for l in after]
+        matches.append(match)
+        if len(matches) >= limit:
+            break
+    return matches
+
+
+def search_code(
+    pattern: str,
+    regex: bool = False,
+    case_sensitive: bool = True,
+    path: str = ".",
+    include: Union[str, List[str]] = None,
+    exclude: Union[str, List[str]] = None,
+    context_lines: int = 2,
+    max_results: int = 50,
+    **kwargs,
+) -> ToolOutput:
+    """Search file contents in the repository.
+
+    Uses the repository's trigram index to narrow down which files can match,
+    then scans only those. Patterns with no usable literal text fall back to
+    scanning every file in parallel.
+
+    Args:
+        pattern: Text or regular expression to search for
+        regex: Treat pattern as a regular expression
+        case_sensitive: Match case
+        path: Directory to search in, relative to the repository root
+        include: Glob(s) of file paths to search (e.g. "*.py")
+        exclude: Glob(s) of file paths to skip
+        context_lines: Lines of context to include around each match
+        max_results: Maximum number of matching lines to return
+
+    Returns:
+        ToolOutput: A dictionary containing:
+            - success (bool): Whether the operation succeeded
+            - message (str): A human readable message
+            - data (dict): matches (file, line, text, before, after),
+              files_searched and truncated
+    """
+    try:
+        if not pattern:
+            return {"success": False, "message": "Pattern is empty", "data": None}
+        flags = 0 if case_sensitive else re.IGNORECASE
+        try:
+            compiled = re.compile(pattern if regex else re.escape(pattern), flags)
+        except re.error as e:
+            return {
+                "success": False,
+                "message": f"Invalid regular expression: {str(e)}",
+                "data": None,
+            }
+
+        root = Path(current_workspace(kwargs.get("repo_path")))
+        directory = root / _normalize_path(path)
+        if not directory.is_dir():
+            return {
+                "success": False,
+                "message": f"Directory does not exist: {path}",
+                "data": None,
+            }
+        max_results = min(max(int(max_results), 1), MAX_SEARCH_RESULTS)
+        context_lines = min(max(int(context_lines), 0), MAX_CONTEXT_LINES)
+        includes = _as_list(include)
+        excludes = _as_list(exclude)
+
+        workspace = get_workspace_index(directory)
+        used_index = False
+        if workspace is None:
+            root = directory
+            files = _walk_files(directory)
+        else:
+            root = workspace.root
+            files = workspace.files()
+            rel_dir = workspace.relative_path(directory)
+            if rel_dir != ".":
+                files = [f for f in files if f.startswith(rel_dir + "/")]
+
+            # Narrow to files whose trigrams contain the pattern's literal text
+            index = get_search_index(directory)
+            index.refresh()
+            candidates = index.candidates(required_literals(pattern, regex))
+            if candidates is not None:
+                used_index = True
+                files = [
+                    f for f in files if f in candidates or not index.is_indexed(f)
+                ]
+
+        if includes:
+            files = [f for f in files if any(fnmatch(f, g) for g in includes)]
+        if excludes:
+            files = [f for f in files if not any(fnmatch(f, g) for g in excludes)]
+
+        # Scan candidates in parallel, keeping results in file order
+        matches = []
+        workers = min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _search_file, root, rel, compiled, context_lines, max_results + 1
+                )
+                for rel in files
+            ]
+            for future in futures:
+                matches.extend(future.result())
+                if len(matches) > max_results:
+                    # Enough results: skip files not yet started
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+        truncated = len(matches) > max_results
+        matches = matches[:max_results]
+        message = f"Found {len(matches)} matches for {pattern!r}"
+        if truncated:
+            message += f" (showing first {max_results}; narrow the search for more)"
+        return {
+            "success": True,
+            "message": message,
+            "data": {
+                "matches": matches,
+                "files_searched": len(files),
+                "truncated": truncated,
+                "used_index": used_index,
+            },
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Error searching code: {str(e)}",
+            "data": None,
+        }
+
+
+def _count_symbols(symbols: List[Dict[str, Any]]) -> int:
+    return sum(1 + _count_symbols(s.get("children", [])) for s in symbols)
+
+
+def get_file_outline(file_path: str, **kwargs) -> ToolOutput:
+    """Get the classes and functions defined in a file.
+
+    Python files are parsed with ast; other files use a regex scan that handles
+    JS/TS style classes, functions and methods. Outlines are cached by content
+    hash, so asking again for an unchanged file is free.
+
+    Args:
+        file_path: Path to the file to outline
+
+    Returns:
+        ToolOutput: A dictionary containing:
+            - success (bool): Whether the operation succeeded
+            - message (str): A human readable message
+            - data (dict): symbols (kind, name, signature, start_line, end_line,
+              doc, children), total_lines and parser
+    """
+    try:
+        file_path = _normalize_path(file_path)
+        full_path = Path(current_workspace(kwargs.get("repo_path"))) / file_path
+        if not full_path.is_file():
+            return {
+                "success": False,
+                "message": f"File not found: {file_path}",
+                "data": None,
+            }
+        size = full_path.stat().st_size
+        if size > MAX_OUTLINE_FILE_BYTES:
+            return {
+                "success": False,
+                "message": f"File is too large to outline ({size} bytes): {file_path}",
+                "data": {"size": size},
+            }
+
+        index = get_workspace_index(full_path.parent)
+        if index is not None:
+            content_hash = index.file_hash(full_path)
+        else:
+            content_hash = hashlib.sha1(full_path.read_bytes()).hexdigest()
+
+        def load_source() -> str:
+            if index is not None and size <= MAX_CACHED_FILE_BYTES:
+                return index.read_text(full_path)
+            with open(full_path, "r") as f:
+                return f.read()
+
+        try:
+            outline = cached_outline(content_hash, full_path.suffix, load_source)
+        except UnicodeDecodeError:
+            return {
+                "success": False,
+                "message": f"File appears to be binary: {file_path}",
+                "data": {"size": size, "binary": True},
+            }
+
+        count = _count_symbols(outline["symbols"])
+        return {
+            "success": True,
+            "message": f"Found {count} symbols in {file_path}",
+            "data": {"file": file_path, **outline},
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Error outlining file: {str(e)}",
+            "data": None,
+        }
@@ -0,0 +1,278 @@
+"""Symbol outlines for source files.
+
+Python files are parsed with ast. Other languages (JS/TS and similar) use a
+line-based regex fallback that finds classes, functions and methods.
+"""
+
+import ast
+import io
+import re
+import threading
+import tokenize
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Number of outlines kept in memory, keyed by file content hash
+MAX_CACHED_OUTLINES = 512
+
+PYTHON_EXTENSIONS = {".py", ".pyi"}
+
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _first_doc_line(node: ast.AST) -> Optional[str]:
+    doc = ast.get_docstring(node, clean=True)
+    if not doc:
+        return None
+    return doc.strip().splitlines()[0]
+
+
+def _segment(lines: List[bytes], node: ast.AST) -> str:
+    """Source text of an expression, on one line.
+
+    Like ast.get_source_segment, without splitting the source on every call
+    (ast.unparse would do, but needs Python 3.9). Offsets are in UTF-8 bytes.
+    """
+    first, last = node.lineno - 1, node.end_lineno - 1
+    if first == last:
+        text = lines[first][node.col_offset : node.end_col_offset]
+    else:
+        text = lines[first][node.col_offset :].rstrip()
+        for part in [*lines[first + 1 : last], lines[last][: node.end_col_offset]]:
+            part = part.strip()
+            if not part:
+                continue
+            if text.endswith((b"(", b"[", b"{")) or part.startswith((b")", b"]", b"}")):
+                text += part
+            else:
+                text += b" " + part
+    return text.decode("utf-8", errors="replace")
+
+
+def _source_lines(source: str) -> List[bytes]:
+    """Source lines as ast numbers them, in UTF-8 and without comments."""
+    source = source.replace("\r\n", "\n").replace("\r", "\n")
+    lines = source.split("\n")
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type == tokenize.COMMENT:
+                # A comment runs to the end of its line
+                row, col = token.start
+                lines[row - 1] = lines[row - 1][:col]
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return [line.encode("utf-8") for line in lines]
+
+
+def _python_arg(lines: List[bytes], arg: ast.arg, default: Optional[ast.expr]) -> str:
+    text = arg.arg
+    if arg.annotation is not None:
+        text += f": {_segment(lines, arg.annotation)}"
+    if default is not None:
+        separator = " = " if arg.annotation is not None else "="
+        text += separator + _segment(lines, default)
+    return text
+
+
+def _python_arguments(lines: List[bytes], args: ast.arguments) -> str:
+    parts = []
+    positional = args.posonlyargs + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + args.defaults
+    for i, (arg, default) in enumerate(zip(positional, defaults)):
+        parts.append(_python_arg(lines, arg, default))
+        if i == len(args.posonlyargs) - 1:
+            parts.append("/")
+    if args.vararg:
+        parts.append("*" + _python_arg(lines, args.vararg, None))
+    elif args.kwonlyargs:
+        parts.append("*")
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        parts.append(_python_arg(lines, arg, default))
+    if args.kwarg:
+        parts.append("**" + _python_arg(lines, args.kwarg, None))
+    return ", ".join(parts)
+
+
+def _python_signature(lines: List[bytes], node: ast.AST) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = [_segment(lines, b) for b in node.bases]
+        for keyword in node.keywords:
+            value = _segment(lines, keyword.value)
+            bases.append(f"{keyword.arg}={value}" if keyword.arg else f"**{value}")
+        if bases:
+            return f"class {node.name}({', '.join(bases)})"
+        return f"class {node.name}"
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    signature = f"{prefix} {node.name}({_python_arguments(lines, node.args)})"
+    if node.returns is not None:
+        signature += f" -> {_segment(lines, node.returns)}"
+    return signature
+
+
+def _python_symbols(
+    lines: List[bytes], body: List[ast.stmt], depth: int
+) -> List[Dict[str, Any]]:
+    symbols = []
+    for node in body:
+        if isinstance(node, ast.ClassDef):
+            kind = "class"
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind = "method" if depth else "function"
+        else:
+            continue
+        start = node.lineno
+        if node.decorator_list:
+            start = min(d.lineno for d in node.decorator_list)
+        symbol = {
+            "kind": kind,
+            "name": node.name,
+            "signature": _python_signature(lines, node),
+            "start_line": start,
+            "end_line": node.end_lineno,
+        }
+        doc = _first_doc_line(node)
+        if doc:
+            symbol["doc"] = doc
+        if kind == "class":
+            symbol["children"] = _python_symbols(lines, node.body, depth + 1)
+        symbols.append(symbol)
+    return symbols
+
+
+def python_outline(source: str) -> List[Dict[str, Any]]:
+    """Outline Python source. Raises SyntaxError if it can't be parsed."""
+    tree = ast.parse(source)
+    return _python_symbols(_source_lines(source), tree.body, 0)
+
+
+_GENERIC_PATTERNS = [
+    (
+        "class",
+        re.compile(
+            r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?"
+            r"(?:class|interface)\s+([A-Za-z_$][\w$]*)"
+        ),
+    ),
+    (
+        "function",
+        re.compile(
+            r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?"
+            r"function\s*\*?\s*([A-Za-z_$][\w$]*)\s*[<(]"
+        ),
+    ),
+    (
+        "function",
+        re.compile(
+            r"^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)"
+            r"\s*(?::[^=]+)?=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>"
+            r"|[A-Za-z_$][\w$]*\s*=>)"
+        ),
+    ),
+    (
+        "method",
+        re.compile(
+            r"^\s+(?:(?:public|private|protected|static|readonly|async|get|set)\s+)*"
+            r"(?!(?:if|for|while|switch|catch|return|function)\b)"
+            r"([A-Za-z_$][\w$]*)\s*\([^;]*\)\s*(?::[^{;]+)?\{\s*$"
+        ),
+    ),
+]
+
+
+def _block_end(lines: List[str], start: int) -> int:
+    """Find the line closing the brace block opened on or after start."""
+    depth = 0
+    opened = False
+    for number in range(start, len(lines)):
+        for char in lines[number]:
+            if char == "{":
+                depth += 1
+                opened = True
+            elif char == "}":
+                depth -= 1
+        if opened and depth <= 0:
+            return number + 1
+        if not opened and number > start and lines[number].rstrip().endswith(";"):
+            return number + 1
+    return start + 1 if not opened else len(lines)
+
+
+def generic_outline(source: str) -> List[Dict[str, Any]]:
+    """Outline brace-delimited source (JS/TS and similar) with regexes.
+
+    This is a best-effort scan: it does not understand strings or comments, so
+    braces inside them can make line ranges inaccurate.
+    """
+    lines = source.splitlines()
+    symbols: List[Dict[str, Any]] = []
+    classes: List[Dict[str, Any]] = []
+    for number, line in enumerate(lines):
+        for kind, pattern in _GENERIC_PATTERNS:
+            match = pattern.match(line)
+            if not match:
+                continue
+            parent = next(
+                (c for c in reversed(classes) if c["end_line"] >= number + 1),
+                None,
+            )
+            if kind == "method" and parent is None:
+                break
+            symbol = {
+                "kind": kind,
+                "name": match.group(1),
+                "signature": line.strip().rstrip("{").strip(),
+                "start_line": number + 1,
+                "end_line": _block_end(lines, number),
+            }
+            if kind == "class":
+                symbol["children"] = []
+                classes.append(symbol)
+            if parent is not None and kind != "class":
+                symbol["kind"] = "method"
+                parent["children"].append(symbol)
+            else:
+                symbols.append(symbol)
+            break
+    return symbols
+
+
+def outline_source(source: str, suffix: str) -> Dict[str, Any]:
+    """Outline source text, choosing the parser from the file suffix.
+
+    Returns:
+        Dict[str, Any]: symbols, total_lines and the parser used ("python" or
+        "generic")
+    """
+    total_lines = len(source.splitlines())
+    if suffix.lower() in PYTHON_EXTENSIONS:
+        try:
+            symbols = python_outline(source)
+            return {"parser": "python", "symbols": symbols, "total_lines": total_lines}
+        except (SyntaxError, ValueError):
+            pass
+    symbols = generic_outline(source)
+    return {"parser": "generic", "symbols": symbols, "total_lines": total_lines}
+
+
+def cached_outline(content_hash: str, suffix: str, load_source) -> Dict[str, Any]:
+    """Get the outline for a file, reusing it while the content is unchanged.
+
+    Args:
+        content_hash: Hash of the file's contents
+        suffix: File suffix, used to choose the parser
+        load_source: Callable returning the file's text on a cache miss
+    """
+    key = f"{suffix.lower()}:{content_hash}"
+    with _cache_lock:
+        outline = _cache.get(key)
+        if outline is not None:
+            _cache.move_to_end(key)
+            return outline
+
+    outline = outline_source(load_source(), suffix)
+    with _cache_lock:
+        _cache[key] = outline
+        while len(_cache) > MAX_CACHED_OUTLINES:
+            _cache.popitem(last=False)
+    return outline
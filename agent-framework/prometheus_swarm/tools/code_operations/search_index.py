@@ -0,0 +1,209 @@
+"""Trigram index for fast code search.
+
+Each indexed file is reduced to the set of lowercase three-character substrings
+it contains. A search for text that must contain some literal only needs to scan
+files containing every trigram of that literal.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from prometheus_swarm.utils.logging import log_key_value, log_error
+from prometheus_swarm.utils.workspace_index import (
+    WorkspaceIndex,
+    get_workspace_index,
+)
+
+# Files larger than this are not indexed (they are still searched by scanning)
+MAX_INDEXED_FILE_BYTES = 1024 * 1024
+
+
+def trigrams(text: str) -> Set[str]:
+    """Get the lowercase trigrams of text."""
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def required_literals(pattern: str, is_regex: bool) -> List[str]:
+    """Get literal substrings any match of the pattern must contain.
+
+    Only literal runs at the top level of a regex are used; anything inside
+    groups, alternations or optional repeats is ignored. Returns an empty list if
+    nothing useful can be extracted.
+    """
+    if not is_regex:
+        return [pattern] if len(pattern) >= 3 else []
+
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return []
+
+    literals = []
+    run = []
+    for op, value in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(value))
+            continue
+        if run:
+            literals.append("".join(run))
+            run = []
+    if run:
+        literals.append("".join(run))
+    return [literal for literal in literals if len(literal) >= 3]
+
+
+class TrigramIndex:
+    """Trigram index over the files of one workspace."""
+
+    def __init__(self, workspace: WorkspaceIndex):
+        self.workspace = workspace
+        self._lock = threading.RLock()
+        # rel path -> (stat key, trigrams)
+        self._files: Dict[str, Tuple[Tuple[int, int, int], Set[str]]] = {}
+        # trigram -> rel paths
+        self._postings: Dict[str, Set[str]] = {}
+
+    def _stat_key(self, rel: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.workspace.root / rel)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _remove(self, rel: str) -> None:
+        entry = self._files.pop(rel, None)
+        if entry is None:
+            return
+        for gram in entry[1]:
+            paths = self._postings.get(gram)
+            if paths is not None:
+                paths.discard(rel)
+                if not paths:
+                    del self._postings[gram]
+
+    def _add(self, rel: str, key: Tuple[int, int, int]) -> None:
+        if key[1] > MAX_INDEXED_FILE_BYTES:
+            return
+        try:
+            # Read directly so indexing doesn't evict the read cache
+            with open(self.workspace.root / rel, "r") as f:
+                text = f.read()
+        except (UnicodeDecodeError, OSError):
+            return
+        if "\0" in text:
+            return
+        grams = trigrams(text)
+        self._files[rel] = (key, grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(rel)
+
+    def refresh(self) -> int:
+        """Bring the index up to date with the workspace.
+
+        Only files that were added, removed or changed since the last refresh
+        are re-read.
+
+        Returns:
+            int: Number of files re-indexed
+        """
+        with self._lock:
+            current = self.workspace.files()
+            current_set = set(current)
+            for rel in [rel for rel in self._files if rel not in current_set]:
+                self._remove(rel)
+
+            updated = 0
+            for rel in current:
+                key = self._stat_key(rel)
+                entry = self._files.get(rel)
+                if entry is not None and entry[0] == key:
+                    continue
+                self._remove(rel)
+                if key is not None:
+                    self._add(rel, key)
+                    updated += 1
+            return updated
+
+    def candidates(self, literals: Iterable[str]) -> Optional[Set[str]]:
+        """Get indexed files that may contain all of the literals.
+
+        Returns:
+            Optional[Set[str]]: Candidate files, or None if the literals give no
+            usable trigrams (every file must be scanned)
+        """
+        grams = set()
+        for literal in literals:
+            grams |= trigrams(literal)
+        if not grams:
+            return None
+        with self._lock:
+            result = None
+            # Intersect the rarest postings first
+            for gram in sorted(grams, key=lambda g: len(self._postings.get(g, ()))):
+                paths = self._postings.get(gram, set())
+                result = set(paths) if result is None else result & paths
+                if not result:
+                    break
+            return result or set()
+
+    def is_indexed(self, rel: str) -> bool:
+        """Whether the file is covered by the index (small text file)."""
+        return rel in self._files
+
+
+_indexes: Dict[Path, TrigramIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(path=None) -> Optional[TrigramIndex]:
+    """Get the trigram index for the repository containing path.
+
+    Returns:
+        Optional[TrigramIndex]: The index, or None if path is not in a git repo
+    """
+    workspace = get_workspace_index(path)
+    if workspace is None:
+        return None
+    with _indexes_lock:
+        index = _indexes.get(workspace.root)
+        if index is None or index.workspace is not workspace:
+            index = _indexes[workspace.root] = TrigramIndex(workspace)
+        return index
+
+
+def drop_search_index(path) -> None:
+    """Forget the index for a repository (e.g. when its checkout is deleted)."""
+    root = Path(path).resolve()
+    with _indexes_lock:
+        _indexes.pop(root, None)
+
+
+def build_search_index(path, background: bool = True) -> None:
+    """Build the search index for a repository ahead of the first search.
+
+    Args:
+        path: Path inside the repository
+        background: Build in a daemon thread instead of blocking
+    """
+
+    def build():
+        try:
+            index = get_search_index(path)
+            if index is not None:
+                count = index.refresh()
+                log_key_value("Search index built", f"{count} files in {path}")
+        except Exception as e:
+            log_error(e, "Failed to build search index")
+
+    if background:
+        threading.Thread(target=build, name="search-index", daemon=True).start()
+    else:
+        build()
@@ -9,14 +9,18 @@ from prometheus_swarm.tools.execute_command.implementations import (
 DEFINITIONS = {
     "execute_command": {
         "name": "execute_command",
-        "description": "Execute a shell command in the current working directory",
+        "description": "Execute a shell command in the current working directory. Long output is cut to its beginning and end. The command is killed after the timeout, along with any processes it started.",
         "parameters": {
             "type": "object",
             "properties": {
                 "command": {
                     "type": "string",
                     "description": "The command to execute",
-                }
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": "Seconds before the command is killed. Defaults to 300, at most 3600.",
+                },
             },
             "required": ["command"],
         },
@@ -24,19 +28,35 @@ DEFINITIONS = {
     },
     "run_tests": {
         "name": "run_tests",
-        "description": "Run tests using a specified framework.",
+        "description": "Run tests using a specified framework. Returns pass/fail counts and the failing tests with short tracebacks. After fixing failures, re-run just those tests with only_failed before running the full suite.",
         "parameters": {
             "type": "object",
             "properties": {
                 "path": {
                     "type": "string",
-                    "description": "Path to test file or directory.",
+                    "description": "Test files or directories, separated by spaces.",
                 },
                 "framework": {
                     "type": "string",
                     "description": "Test framework to use.",
                     "enum": ["pytest", "jest", "vitest"],
                 },
+                "only_failed": {
+                    "type": "boolean",
+                    "description": "Run only the tests that failed in the previous run (nothing if none failed).",
+                },
+                "last_failed": {
+                    "type": "boolean",
+                    "description": "Run the tests that failed in the previous run, or all tests if none failed.",
+                },
+                "parallel": {
+                    "type": "boolean",
+                    "description": "Run pytest tests in parallel with pytest-xdist. Defaults to true when pytest-xdist is installed.",
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": "Seconds before the test run is killed. Defaults to 300.",
+                },
             },
             "required": ["framework", "path"],
         },
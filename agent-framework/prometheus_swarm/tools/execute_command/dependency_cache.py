@@ -0,0 +1,161 @@
+"""Node-local cache for installed dependencies.
+
+Every task works in a fresh clone, so without a cache each round downloads the
+same packages again. This module keeps:
+
+- package manager download caches (pip, npm, yarn, pnpm) in one shared place,
+  passed to commands through environment variables;
+- a record of which requirements files were installed into this Python
+  environment, so an identical requirements file isn't resolved again;
+- node_modules trees keyed by a hash of package.json and the lockfile, which
+  are copied into new workspaces instead of being installed. Copies are
+  reflinks (copy-on-write) where the filesystem supports them; hardlinks
+  would let a package that rewrites its own files corrupt the cache.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from prometheus_swarm.utils.logging import log_key_value, log_error
+
+# node_modules trees kept in the cache; the least recently used are removed
+MAX_CACHED_NODE_MODULES = 5
+
+NODE_LOCKFILES = ("package-lock.json", "yarn.lock", "pnpm-lock.yaml")
+
+
+def cache_enabled() -> bool:
+    return os.getenv("DEPENDENCY_CACHE", "true").lower() not in ("0", "false", "no")
+
+
+def cache_root() -> Path:
+    root = os.getenv("DEPENDENCY_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "prometheus-swarm", "dependencies"
+    )
+    return Path(root)
+
+
+def cache_env() -> Dict[str, str]:
+    """Environment variables pointing package managers at the shared caches.
+
+    Variables already set in the environment are left alone.
+    """
+    if not cache_enabled():
+        return {}
+    root = cache_root()
+    settings = {
+        "PIP_CACHE_DIR": root / "pip",
+        "npm_config_cache": root / "npm",
+        "YARN_CACHE_FOLDER": root / "yarn",
+        "npm_config_store_dir": root / "pnpm-store",
+    }
+    return {key: str(value) for key, value in settings.items() if key not in os.environ}
+
+
+def hash_files(directory: str, names: Iterable[str], salt: str = "") -> Optional[str]:
+    """Hash the contents of the named files in directory (missing ones skipped).
+
+    Returns None if none of the files exist.
+    """
+    digest = hashlib.sha256(salt.encode())
+    found = False
+    for name in names:
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            continue
+        found = True
+        digest.update(name.encode() + b"\0")
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:32] if found else None
+
+
+def _marker(requirements_hash: str) -> Path:
+    # Keyed by the pip in use too, since installs go into its environment
+    pip = shutil.which("pip") or sys.executable
+    interpreter = hashlib.sha256(pip.encode()).hexdigest()[:12]
+    return cache_root() / "pip-installed" / interpreter / requirements_hash
+
+
+def pip_requirements_installed(requirements_hash: str) -> bool:
+    """Whether these exact requirements were already installed here."""
+    return cache_enabled() and _marker(requirements_hash).exists()
+
+
+def mark_pip_requirements_installed(requirements_hash: str) -> None:
+    if not cache_enabled():
+        return
+    marker = _marker(requirements_hash)
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.touch()
+
+
+def _copy_tree(source: Path, destination: Path) -> None:
+    """Copy a tree, as reflinks where cp and the filesystem support them."""
+    try:
+        subprocess.run(
+            ["cp", "-a", "--reflink=auto", str(source), str(destination)],
+            check=True,
+            capture_output=True,
+        )
+        return
+    except (OSError, subprocess.CalledProcessError):
+        # No GNU cp: copy file by file
+        shutil.rmtree(destination, ignore_errors=True)
+    shutil.copytree(source, destination, symlinks=True)
+
+
+def restore_node_modules(working_dir: str, key: str) -> bool:
+    """Copy a cached node_modules into working_dir. Returns True on a hit."""
+    if not cache_enabled():
+        return False
+    cached = cache_root() / "node_modules" / key / "node_modules"
+    target = Path(working_dir) / "node_modules"
+    if not cached.is_dir() or target.exists():
+        return False
+    try:
+        _copy_tree(cached, target)
+        os.utime(cached.parent)
+        log_key_value("Restored node_modules from cache", key)
+        return True
+    except OSError as e:
+        log_error(e, "Failed to restore node_modules from cache")
+        shutil.rmtree(target, ignore_errors=True)
+        return False
+
+
+def store_node_modules(working_dir: str, key: str) -> None:
+    """Save working_dir's node_modules in the cache under key."""
+    if not cache_enabled():
+        return
+    source = Path(working_dir) / "node_modules"
+    entries = cache_root() / "node_modules"
+    entry = entries / key
+    if not source.is_dir() or entry.exists():
+        return
+    entries.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=entries, prefix=f".{key}."))
+    try:
+        _copy_tree(source, staging / "node_modules")
+        os.replace(staging, entry)
+    except OSError as e:
+        log_error(e, "Failed to cache node_modules")
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    _prune(entries, MAX_CACHED_NODE_MODULES)
+
+
+def _prune(directory: Path, keep: int) -> None:
+    entries = sorted(
+        (p for p in directory.iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for stale in entries[keep:]:
+        shutil.rmtree(stale, ignore_errors=True)
@@ -1,22 +1,82 @@
-import subprocess
 import os
+import shlex
+import shutil
+import tempfile
+from typing import Dict, List, Tuple
 from prometheus_swarm.types import ToolOutput
+from prometheus_swarm.utils.workspace import current_workspace
+from prometheus_swarm.utils.workspace_index import mark_all_dirty
+from prometheus_swarm.tools.execute_command.runner import (
+    DEFAULT_MAX_OUTPUT_BYTES,
+    run_command,
+)
+from prometheus_swarm.tools.execute_command import dependency_cache
+from prometheus_swarm.tools.execute_command.test_results import (
+    parse_jest_json,
+    parse_junit_xml,
+)
+
+# Seconds before a command is killed, unless the call asks for another limit
+DEFAULT_COMMAND_TIMEOUT = int(os.getenv("COMMAND_TIMEOUT", "300"))
+# Longest timeout a single call may ask for
+MAX_COMMAND_TIMEOUT = 3600
+# Raw output returned by run_tests when no report could be parsed
+MAX_TEST_OUTPUT_CHARS = 8000
+# Raw output returned by run_tests alongside a parsed report
+MAX_SUMMARY_OUTPUT_CHARS = 1500
+
+# Files with failing tests from the last run, per (working directory, framework)
+_last_failures: Dict[Tuple[str, str], List[str]] = {}
+# Whether pytest-xdist is installed, per working directory
+_xdist_available: Dict[str, bool] = {}
+
+
+def execute_command(command: str, timeout: int = None, **kwargs) -> ToolOutput:
+    """Execute a shell command in the current working directory.
+
+    Output is streamed into bounded buffers: for long output only the beginning
+    and end of each stream are returned. The command runs in its own process
+    group, which is killed on timeout or if processes it left in the background
+    keep its output open.
 
-
-def execute_command(command: str, **kwargs) -> ToolOutput:
-    """Execute a shell command in the current working directory."""
+    Args:
+        command: The shell command to run
+        timeout: Seconds before the command is killed
+            (default DEFAULT_COMMAND_TIMEOUT, at most MAX_COMMAND_TIMEOUT)
+    """
     try:
-        cwd = os.getcwd()
+        cwd = current_workspace(kwargs.get("repo_path"))
+        timeout = min(int(timeout or DEFAULT_COMMAND_TIMEOUT), MAX_COMMAND_TIMEOUT)
         print(f"Executing command in {cwd}: {command}")
 
-        result = subprocess.run(
+        # Point package managers at the shared download caches
+        cache_env = dependency_cache.cache_env()
+        result = run_command(
             command,
-            shell=True,
             cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=300,  # Add a 5-minute timeout to prevent hanging
+            timeout=timeout,
+            max_output_bytes=DEFAULT_MAX_OUTPUT_BYTES,
+            env={**os.environ, **cache_env} if cache_env else None,
         )
+        output_data = {
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+            "duration": result.duration,
+            "output_bytes": result.stdout_bytes + result.stderr_bytes,
+            "truncated": result.truncated,
+        }
+
+        if result.timed_out:
+            return {
+                "success": False,
+                "message": f"Command timed out after {timeout} seconds",
+                "data": {
+                    **output_data,
+                    "returncode": -1,
+                    "timed_out": True,
+                    "command_succeeded": False,
+                },
+            }
 
         # For command execution, success means the command was executed without exceptions
         # The return code is provided separately and can be interpreted by the caller
@@ -27,25 +87,12 @@ def execute_command(command: str, **kwargs) -> ToolOutput:
             "success": True,  # Command executed without exceptions
             "message": message,
             "data": {
-                "stdout": result.stdout,
-                "stderr": result.stderr,
+                **output_data,
                 "returncode": result.returncode,
                 "command_succeeded": result.returncode
                 == 0,  # Separate flag for command's own success
             },
         }
-    except subprocess.TimeoutExpired as e:
-        return {
-            "success": False,
-            "message": f"Command timed out after 300 seconds: {str(e)}",
-            "data": {
-                "stdout": e.stdout if hasattr(e, "stdout") and e.stdout else "",
-                "stderr": e.stderr if hasattr(e, "stderr") and e.stderr else "",
-                "returncode": -1,
-                "timed_out": True,
-                "command_succeeded": False,
-            },
-        }
     except Exception as e:
         return {
             "success": False,
@@ -55,88 +102,194 @@ def execute_command(command: str, **kwargs) -> ToolOutput:
                 "command_succeeded": False,
             },
         }
+    finally:
+        # The command may have created or deleted any files
+        mark_all_dirty()
+
+
+def _has_xdist(cwd: str) -> bool:
+    """Whether pytest-xdist is importable by the python3 that runs the tests."""
+    if cwd not in _xdist_available:
+        result = run_command('python3 -c "import xdist"', cwd=cwd, timeout=60)
+        _xdist_available[cwd] = result.returncode == 0
+    return _xdist_available[cwd]
+
+
+def _tail(text: str, limit: int) -> str:
+    return text if len(text) <= limit else "..." + text[-limit:]
 
 
 def run_tests(
-    path: str, framework: str, **kwargs  # Default but can be overridden
+    path: str,
+    framework: str,
+    only_failed: bool = False,
+    last_failed: bool = False,
+    parallel: bool = None,
+    timeout: int = None,
+    **kwargs,
 ) -> ToolOutput:
-    """Run tests using the specified framework and command.
+    """Run tests and report parsed results.
 
-    If no command provided, uses project defaults based on framework:
-    - pytest: "pytest {path}"
-    - jest: "jest {path}"
-    - vitest: "npx vitest {path}"
-    etc.
-    """
+    Tests write a machine-readable report (JUnit XML for pytest, JSON for jest
+    and vitest) which is summarized into counts and a list of failures with
+    short tracebacks, instead of returning the full output.
 
-    commands = {
-        "pytest": f"python3 -m pytest {path if path else ''} -v",
-        "jest": f"jest {path if path else ''}",
-        "vitest": f"npx vitest {path if path else ''} --run",  # Add --run flag to ensure it doesn't start in watch mode
-    }
-    command = commands.get(framework)
-    if not command:
+    - pytest: "python3 -m pytest {path} --junitxml=..."
+    - jest: "jest {path} --json --outputFile=..."
+    - vitest: "npx vitest {path} --run --reporter=json --outputFile=..."
+
+    Args:
+        path: Test files or directories, separated by spaces (empty for the
+            framework's default)
+        framework: pytest, jest or vitest
+        only_failed: Run only the tests that failed in the previous run; if
+            nothing failed, run nothing
+        last_failed: Run the tests that failed in the previous run, or all
+            tests if nothing failed
+        parallel: Run pytest with pytest-xdist ("-n auto"). By default this is
+            used when pytest-xdist is installed.
+        timeout: Seconds before the test run is killed
+    """
+    if framework not in ("pytest", "jest", "vitest"):
         return {
             "success": False,
             "message": f"Unknown test framework: {framework}",
             "data": None,
         }
 
-    result = execute_command(command)
+    cwd = current_workspace(kwargs.get("repo_path"))
+    # Quote each path on its own so several can be given
+    target = " ".join(shlex.quote(p) for p in shlex.split(path or ""))
+    previous = _last_failures.get((cwd, framework))
+    report_dir = tempfile.mkdtemp(prefix="run-tests-")
+    try:
+        if framework == "pytest":
+            report = os.path.join(report_dir, "report.xml")
+            command = (
+                f"python3 -m pytest {target} -q --tb=short "
+                f"-o junit_family=xunit1 --junitxml={report}"
+            )
+            if only_failed:
+                command += " --lf --lfnf=none"
+            elif last_failed:
+                command += " --lf"
+            if parallel or (parallel is None and _has_xdist(cwd)):
+                command += " -n auto"
+        else:
+            report = os.path.join(report_dir, "report.json")
+            if (only_failed or last_failed) and framework == "vitest" and previous:
+                # vitest has no failure cache of its own; re-run the failed files
+                target = " ".join(shlex.quote(f) for f in previous)
+            elif only_failed and previous is not None and not previous:
+                return {
+                    "success": True,
+                    "message": "No failures from the previous run to re-run.",
+                    "data": {"tests_passed": True, "framework": framework},
+                }
+            if framework == "jest":
+                command = f"jest {target} --json --outputFile={report}"
+                if only_failed or last_failed:
+                    command += " --onlyFailures"
+            else:
+                command = (
+                    f"npx vitest {target} --run --reporter=json "
+                    f"--outputFile={report}"
+                )
+
+        result = execute_command(command, timeout=timeout, repo_path=cwd)
+
+        # Check if the command execution failed (not the tests)
+        if not result["success"] and not result.get("data", {}).get("timed_out"):
+            return {
+                "success": False,
+                "message": f"Failed to execute tests: {result['message']}",
+                "data": result.get("data", {}),
+            }
+
+        # Combine stdout and stderr for complete test output
+        output = []
+        if result["data"]["stdout"]:
+            output.append(result["data"]["stdout"])
+        if result["data"]["stderr"]:
+            output.append(result["data"]["stderr"])
+        output_str = "\n".join(output) if output else "No test output captured"
+
+        summary = None
+        if os.path.exists(report):
+            try:
+                if framework == "pytest":
+                    summary = parse_junit_xml(report)
+                else:
+                    summary = parse_jest_json(report, root=cwd)
+            except Exception as e:
+                output_str += f"\n(Could not parse test report: {str(e)})"
+
+        # Check if the command timed out
+        if result["data"].get("timed_out"):
+            return {
+                "success": False,
+                "message": "Tests timed out. This may be due to tests running in watch mode or waiting for user input.",
+                "data": {
+                    "output": _tail(output_str, MAX_TEST_OUTPUT_CHARS),
+                    "returncode": -1,
+                    "tests_passed": False,
+                    "timed_out": True,
+                },
+            }
 
-    # Check if the command execution failed (not the tests)
-    if not result["success"]:
-        return {
-            "success": False,
-            "message": f"Failed to execute tests: {result['message']}",
-            "data": result.get("data", {}),
+        returncode = result["data"]["returncode"]
+        # For test frameworks, a non-zero return code usually means tests failed, not that the command failed
+        tests_passed = returncode == 0
+        if framework == "pytest" and only_failed and returncode == 5:
+            # No previously failed tests were selected
+            tests_passed = True
+
+        data = {
+            "returncode": returncode,
+            "tests_passed": tests_passed,
+            "framework": framework,
+            "command": command,
         }
+        if summary is not None:
+            _last_failures[(cwd, framework)] = summary["failed_files"]
+            counts = {
+                key: summary[key]
+                for key in ("total", "passed", "failed", "errors", "skipped")
+            }
+            message = (
+                f"Tests completed: {counts['passed']} passed, "
+                f"{counts['failed']} failed, {counts['errors']} errors, "
+                f"{counts['skipped']} skipped."
+            )
+            if summary["failures"]:
+                message += " See failures for details."
+            data.update(
+                {
+                    "summary": counts,
+                    "failures": summary["failures"],
+                    # The end of the output has the framework's own summary
+                    "output": _tail(output_str, MAX_SUMMARY_OUTPUT_CHARS),
+                }
+            )
+        else:
+            # Determine message based on test results
+            message = (
+                "Tests completed successfully."
+                if tests_passed
+                else "Tests completed with failures."
+            )
+            message += " See output for details."
+            data["output"] = _tail(output_str, MAX_TEST_OUTPUT_CHARS)
 
-    # Check if the command timed out
-    if result.get("data", {}).get("timed_out"):
+        # For tests, success means the command ran successfully
+        # The actual test results are in the output
         return {
-            "success": False,
-            "message": "Tests timed out. This may be due to tests running in watch mode or waiting for user input.",
-            "data": {
-                "output": result.get("message", ""),
-                "returncode": -1,
-                "tests_passed": False,
-                "timed_out": True,
-            },
+            "success": True,  # True if we got test results, even if tests failed
+            "message": message,
+            "data": data,
         }
-
-    # Combine stdout and stderr for complete test output
-    output = []
-    if result["data"]["stdout"]:
-        output.append(result["data"]["stdout"])
-    if result["data"]["stderr"]:
-        output.append(result["data"]["stderr"])
-
-    output_str = "\n".join(output) if output else "No test output captured"
-
-    # For test frameworks, a non-zero return code usually means tests failed, not that the command failed
-    tests_passed = result["data"]["returncode"] == 0
-
-    # Determine message based on test results
-    message = (
-        "Tests completed successfully."
-        if tests_passed
-        else "Tests completed with failures."
-    )
-    message += " See output for details."
-
-    # For tests, success means the command ran successfully
-    # The actual test results are in the output
-    return {
-        "success": True,  # True if we got test results, even if tests failed
-        "message": message,
-        "data": {
-            "output": output_str,
-            "returncode": result["data"]["returncode"],
-            "tests_passed": tests_passed,
-            "framework": framework,
-        },
-    }
+    finally:
+        shutil.rmtree(report_dir, ignore_errors=True)
 
 
 def install_dependency(
@@ -150,7 +303,7 @@ def install_dependency(
 
     Supports common package managers with appropriate flags to prevent hanging:
     - npm: Uses --no-fund --no-audit flags
-    - pip: Uses --no-cache-dir flag
+    - pip: Uses the shared download cache
     - yarn: Uses --non-interactive flag
     - pnpm: Uses --no-fund flag
 
@@ -173,8 +326,8 @@ def install_dependency(
             "dev": f"npm install --no-fund --no-audit --save-dev {package_spec}",
         },
         "pip": {
-            "prod": f"pip install --no-cache-dir {package_spec}",
-            "dev": f"pip install --no-cache-dir {package_spec}",  # pip doesn't have dev dependencies
+            "prod": f"pip install {package_spec}",
+            "dev": f"pip install {package_spec}",  # pip doesn't have dev dependencies
         },
         "yarn": {
             "prod": f"yarn add --non-interactive {package_spec}",
@@ -196,7 +349,7 @@ def install_dependency(
     dep_type = "dev" if is_dev_dependency else "prod"
     command = commands[package_manager][dep_type]
 
-    result = execute_command(command)
+    result = execute_command(command, repo_path=kwargs.get("repo_path"))
 
     # Check if the command execution failed
     if not result["success"]:
@@ -241,6 +394,11 @@ def setup_dependencies(
 ) -> ToolOutput:
     """Install dependencies from requirements.txt or package.json.
 
+    Installs reuse the node-local dependency cache: downloads are cached, a
+    requirements.txt identical to one already installed is skipped, and
+    node_modules for a known package.json and lockfile is copied from the
+    cache instead of being installed.
+
     Args:
         repo_path: Path to the repository root. If None, uses current directory.
 
@@ -248,7 +406,7 @@ def setup_dependencies(
         ToolOutput: Standardized tool output with installation status
     """
     try:
-        working_dir = repo_path or os.getcwd()
+        working_dir = current_workspace(repo_path)
         print(f"Installing dependencies in {working_dir}")
 
         if package_manager == "pip":
@@ -259,22 +417,15 @@ def setup_dependencies(
                     "message": "Requirements.txt not found",
                     "data": None,
                 }
-
-            result = execute_command(
-                f"pip install --no-cache-dir -r {requirements_path}"
-            )
-        elif package_manager == "npm":
-            package_json_path = os.path.join(working_dir, "package.json")
-            if not os.path.exists(package_json_path):
+            cache_key = dependency_cache.hash_files(working_dir, ["requirements.txt"])
+            if dependency_cache.pip_requirements_installed(cache_key):
                 return {
-                    "success": False,
-                    "message": "package.json not found",
-                    "data": None,
+                    "success": True,
+                    "message": "Dependencies already installed (cached)",
+                    "data": {"cached": True, "returncode": 0},
                 }
-            result = execute_command(
-                f"npm install --no-fund --no-audit -r {requirements_path}"
-            )
-        elif package_manager == "yarn":
+            command = f"pip install -r {shlex.quote(requirements_path)}"
+        elif package_manager in ("npm", "yarn", "pnpm"):
             package_json_path = os.path.join(working_dir, "package.json")
             if not os.path.exists(package_json_path):
                 return {
@@ -282,18 +433,37 @@ def setup_dependencies(
                     "message": "package.json not found",
                     "data": None,
                 }
-            result = execute_command(
-                f"yarn add --non-interactive -r {requirements_path}"
+            cache_key = dependency_cache.hash_files(
+                working_dir,
+                ["package.json", *dependency_cache.NODE_LOCKFILES],
+                salt=package_manager,
             )
-        elif package_manager == "pnpm":
-            package_json_path = os.path.join(working_dir, "package.json")
-            if not os.path.exists(package_json_path):
+            if dependency_cache.restore_node_modules(working_dir, cache_key):
                 return {
-                    "success": False,
-                    "message": "package.json not found",
-                    "data": None,
+                    "success": True,
+                    "message": "Dependencies installed from cache",
+                    "data": {"cached": True, "returncode": 0},
                 }
-            result = execute_command(f"pnpm add --no-fund -r {requirements_path}")
+            command = {
+                "npm": "npm install --no-fund --no-audit",
+                "yarn": "yarn install --non-interactive",
+                "pnpm": "pnpm install",
+            }[package_manager]
+            command = f"cd {shlex.quote(working_dir)} && {command}"
+        else:
+            return {
+                "success": False,
+                "message": f"Unsupported package manager: {package_manager}",
+                "data": None,
+            }
+
+        result = execute_command(command, repo_path=working_dir)
+        if not result["success"]:
+            return {
+                "success": False,
+                "message": f"Failed to install dependencies: {result['message']}",
+                "data": result.get("data", {}),
+            }
 
         success = result["data"]["command_succeeded"]
         stdout = result["data"]["stdout"]
@@ -302,6 +472,10 @@ def setup_dependencies(
 
         if success:
             message = "Dependencies installed successfully"
+            if package_manager == "pip":
+                dependency_cache.mark_pip_requirements_installed(cache_key)
+            else:
+                dependency_cache.store_node_modules(working_dir, cache_key)
         else:
             message = "Failed to install dependencies"
 
@@ -312,6 +486,7 @@ def setup_dependencies(
                 "stdout": stdout,
                 "stderr": stderr,
                 "returncode": returncode,
+                "cached": False,
             },
         }
 
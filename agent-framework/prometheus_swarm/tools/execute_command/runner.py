@@ -0,0 +1,171 @@
+"""Run shell commands with bounded, streamed output capture.
+
+Output is read as it is produced and only the beginning and end of each stream
+are kept, so a noisy command can't exhaust memory or flood the model's context.
+Commands run in their own process group so a timeout also stops any processes
+they started.
+"""
+
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+# Bytes kept per stream: the first quarter from the start, the rest from the end
+DEFAULT_MAX_OUTPUT_BYTES = 64 * 1024
+# Seconds to wait after SIGTERM before sending SIGKILL
+KILL_GRACE_SECONDS = 5
+# Seconds to wait for output pipes to close after the command exits
+PIPE_DRAIN_SECONDS = 2
+
+_CHUNK_BYTES = 8192
+
+
+class OutputBuffer:
+    """Keeps the head and tail of a byte stream within a size cap."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_OUTPUT_BYTES):
+        self.head_limit = max_bytes // 4
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail: Deque[bytes] = deque()
+        self.tail_size = 0
+        self.total = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += chunk[:room]
+            chunk = chunk[room:]
+        if not chunk:
+            return
+        self.tail.append(chunk)
+        self.tail_size += len(chunk)
+        while self.tail_size - len(self.tail[0]) >= self.tail_limit:
+            self.tail_size -= len(self.tail.popleft())
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + self.tail_limit
+
+    def text(self) -> str:
+        tail = b"".join(self.tail)
+        if self.truncated:
+            tail = tail[-self.tail_limit :]
+            omitted = self.total - len(self.head) - len(tail)
+            marker = f"\n... [{omitted} bytes of output omitted] ...\n".encode()
+            data = bytes(self.head) + marker + tail
+        else:
+            data = bytes(self.head) + tail
+        return data.decode("utf-8", errors="replace")
+
+
+@dataclass
+class CommandResult:
+    stdout: str
+    stderr: str
+    returncode: int
+    timed_out: bool
+    duration: float
+    stdout_bytes: int
+    stderr_bytes: int
+    truncated: bool
+
+
+def _pump(stream, buffer: OutputBuffer) -> None:
+    try:
+        for chunk in iter(lambda: stream.read1(_CHUNK_BYTES), b""):
+            buffer.write(chunk)
+    except (OSError, ValueError):
+        pass
+
+
+def _signal_group(process: subprocess.Popen, sig: int) -> bool:
+    """Signal the command's process group. Returns False if it no longer exists."""
+    try:
+        os.killpg(process.pid, sig)
+        return True
+    except (ProcessLookupError, PermissionError):
+        return False
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    """Stop the command and everything it started: SIGTERM, then SIGKILL."""
+    if not _signal_group(process, signal.SIGTERM):
+        return
+    try:
+        process.wait(timeout=KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        _signal_group(process, signal.SIGKILL)
+
+
+def run_command(
+    command: str,
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+    env: Optional[dict] = None,
+) -> CommandResult:
+    """Run a shell command, capturing the head and tail of its output.
+
+    Args:
+        command: Shell command to run
+        cwd: Working directory
+        timeout: Seconds before the command's process group is killed
+        max_output_bytes: Bytes of output kept per stream
+        env: Environment for the command (default: inherit)
+    """
+    start = time.monotonic()
+    process = subprocess.Popen(
+        command,
+        shell=True,
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    stdout = OutputBuffer(max_output_bytes)
+    stderr = OutputBuffer(max_output_bytes)
+    readers = [
+        threading.Thread(target=_pump, args=(process.stdout, stdout), daemon=True),
+        threading.Thread(target=_pump, args=(process.stderr, stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = False
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        _kill_group(process)
+        process.wait()
+
+    for sig in (None, signal.SIGTERM, signal.SIGKILL):
+        if sig is not None:
+            # Background processes still hold the pipes open
+            _signal_group(process, sig)
+        for reader in readers:
+            reader.join(PIPE_DRAIN_SECONDS)
+        if not any(reader.is_alive() for reader in readers):
+            break
+    process.stdout.close()
+    process.stderr.close()
+
+    return CommandResult(
+        stdout=stdout.text(),
+        stderr=stderr.text(),
+        returncode=process.returncode,
+        timed_out=timed_out,
+        duration=round(time.monotonic() - start, 3),
+        stdout_bytes=stdout.total,
+        stderr_bytes=stderr.total,
+        truncated=stdout.truncated or stderr.truncated,
+    )
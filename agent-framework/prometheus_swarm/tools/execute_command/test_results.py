@@ -0,0 +1,157 @@
+"""Parse machine-readable test reports into a compact summary.
+
+Supports JUnit XML (as written by pytest --junitxml) and the JSON report shared
+by jest --json and vitest --reporter=json.
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+
+# Failures listed in full; the rest are only counted
+MAX_REPORTED_FAILURES = 30
+# Lines kept from the end of each failure's traceback
+MAX_TRACEBACK_LINES = 25
+MAX_TRACEBACK_CHARS = 2000
+
+
+def short_traceback(text: Optional[str]) -> str:
+    """Keep the end of a traceback, where the assertion and error are."""
+    if not text:
+        return ""
+    lines = text.strip().splitlines()
+    if len(lines) > MAX_TRACEBACK_LINES:
+        lines = ["..."] + lines[-MAX_TRACEBACK_LINES:]
+    text = "\n".join(lines)
+    if len(text) > MAX_TRACEBACK_CHARS:
+        text = "..." + text[-MAX_TRACEBACK_CHARS:]
+    return text
+
+
+def _summary() -> Dict[str, Any]:
+    return {
+        "total": 0,
+        "passed": 0,
+        "failed": 0,
+        "errors": 0,
+        "skipped": 0,
+        "failures": [],
+        "failed_files": [],
+    }
+
+
+def _add_failure(summary: Dict[str, Any], failure: Dict[str, Any]) -> None:
+    if failure.get("file") and failure["file"] not in summary["failed_files"]:
+        summary["failed_files"].append(failure["file"])
+    if len(summary["failures"]) < MAX_REPORTED_FAILURES:
+        summary["failures"].append(failure)
+
+
+def parse_junit_xml(path: str) -> Dict[str, Any]:
+    """Summarize a JUnit XML report.
+
+    Raises:
+        ET.ParseError, OSError: If the report can't be read
+    """
+    summary = _summary()
+    root = ET.parse(path).getroot()
+    for case in root.iter("testcase"):
+        summary["total"] += 1
+        file_path = case.get("file")
+        name = case.get("name", "")
+        classname = case.get("classname", "")
+        if file_path:
+            # classname is the dotted module path, optionally followed by a class
+            module = file_path.replace("/", ".").rsplit(".py", 1)[0]
+            cls = classname[len(module) + 1 :] if classname.startswith(module) else ""
+            test_id = "::".join(p for p in (file_path, cls, name) if p)
+        else:
+            test_id = f"{classname}::{name}" if classname else name
+
+        outcome = "passed"
+        detail = None
+        for child in case:
+            if child.tag in ("failure", "error"):
+                outcome = "failed" if child.tag == "failure" else "error"
+                detail = child
+                break
+            if child.tag == "skipped":
+                outcome = "skipped"
+
+        if outcome == "passed":
+            summary["passed"] += 1
+        elif outcome == "skipped":
+            summary["skipped"] += 1
+        else:
+            summary["failed" if outcome == "failed" else "errors"] += 1
+            _add_failure(
+                summary,
+                {
+                    "id": test_id,
+                    "file": file_path,
+                    "line": int(case.get("line")) + 1 if case.get("line") else None,
+                    "outcome": outcome,
+                    "message": (detail.get("message") or "")[:500],
+                    "traceback": short_traceback(detail.text),
+                },
+            )
+    return summary
+
+
+def parse_jest_json(path: str, root: Optional[str] = None) -> Dict[str, Any]:
+    """Summarize a jest/vitest JSON report.
+
+    Args:
+        path: Path to the report
+        root: Directory to make test file paths relative to
+
+    Raises:
+        ValueError, OSError: If the report can't be read
+    """
+    with open(path, "r") as f:
+        report = json.load(f)
+
+    summary = _summary()
+    for suite in report.get("testResults", []):
+        file_path = suite.get("name") or suite.get("testFilePath")
+        if file_path and root and file_path.startswith(root.rstrip("/") + "/"):
+            file_path = file_path[len(root.rstrip("/")) + 1 :]
+        assertions = suite.get("assertionResults") or []
+        for test in assertions:
+            summary["total"] += 1
+            status = test.get("status")
+            if status == "passed":
+                summary["passed"] += 1
+            elif status == "failed":
+                summary["failed"] += 1
+                title = test.get("fullName") or test.get("title")
+                _add_failure(
+                    summary,
+                    {
+                        "id": f"{file_path} > {title}",
+                        "file": file_path,
+                        "line": (test.get("location") or {}).get("line"),
+                        "outcome": "failed",
+                        "message": "",
+                        "traceback": short_traceback(
+                            "\n".join(test.get("failureMessages") or [])
+                        ),
+                    },
+                )
+            else:
+                summary["skipped"] += 1
+        if suite.get("status") == "failed" and not assertions:
+            # The file itself failed to load or compile
+            summary["errors"] += 1
+            _add_failure(
+                summary,
+                {
+                    "id": file_path,
+                    "file": file_path,
+                    "line": None,
+                    "outcome": "error",
+                    "message": "",
+                    "traceback": short_traceback(suite.get("message")),
+                },
+            )
+    return summary
@@ -1,6 +1,9 @@
 from prometheus_swarm.tools.file_operations.implementations import (
     read_file,
+    read_files,
     write_file,
+    write_files,
+    edit_file,
     copy_file,
     move_file,
     rename_file,
@@ -12,7 +15,7 @@ from prometheus_swarm.tools.file_operations.implementations import (
 DEFINITIONS = {
     "read_file": {
         "name": "read_file",
-        "description": "Read the contents of a file.",
+        "description": "Read the contents of a file. Large files are returned in pages: the result includes total_lines and whether it was truncated, so use start_line and end_line to read the rest.",
         "parameters": {
             "type": "object",
             "properties": {
@@ -20,10 +23,24 @@ DEFINITIONS = {
                     "type": "string",
                     "description": "Path to the file to read",
                 },
+                "start_line": {
+                    "type": "integer",
+                    "description": "First line to read (1-based). Defaults to 1.",
+                },
+                "end_line": {
+                    "type": "integer",
+                    "description": "Last line to read, inclusive. Defaults to the end of the file.",
+                },
+                "max_bytes": {
+                    "type": "integer",
+                    "description": "Maximum bytes of content to return. Defaults to 262144.",
+                },
             },
             "required": ["file_path"],
         },
         "function": read_file,
+        "cacheable": True,
+        "path_args": ["file_path"],
     },
     "write_file": {
         "name": "write_file",
@@ -47,6 +64,105 @@ DEFINITIONS = {
             "required": ["file_path", "content", "commit_message"],
         },
         "function": write_file,
+        "path_args": ["file_path"],
+    },
+    "edit_file": {
+        "name": "edit_file",
+        "description": "Change part of an existing file without resending all of it, and commit the change. Give either edits, a list of search/replace blocks, or diff, a unified diff of the file. Each search text should be copied from the file with enough surrounding lines to be unique; small whitespace differences are tolerated. If any block can't be located the file is left unchanged and the failed blocks are reported. Use write_file for new files or complete rewrites.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "file_path": {
+                    "type": "string",
+                    "description": "Path to the file to edit",
+                },
+                "edits": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "search": {
+                                "type": "string",
+                                "description": "Existing text to replace",
+                            },
+                            "replace": {
+                                "type": "string",
+                                "description": "Text to put in its place",
+                            },
+                        },
+                        "required": ["search", "replace"],
+                    },
+                    "description": "Search/replace blocks, applied in order",
+                },
+                "diff": {
+                    "type": "string",
+                    "description": "Unified diff of the file (@@ hunks with -/+/space prefixed lines)",
+                },
+                "commit_message": {
+                    "type": "string",
+                    "description": "Commit message describing the change",
+                },
+            },
+            "required": ["file_path", "commit_message"],
+        },
+        "function": edit_file,
+        "path_args": ["file_path"],
+    },
+    "read_files": {
+        "name": "read_files",
+        "description": "Read several files in one call. Prefer this over repeated read_file calls when you already know which files you need. Each file is reported separately; once the total byte limit is reached, remaining files are skipped and must be read separately.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "paths": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Paths of the files to read",
+                },
+                "max_bytes": {
+                    "type": "integer",
+                    "description": "Maximum total bytes of content to return. Defaults to 524288.",
+                },
+            },
+            "required": ["paths"],
+        },
+        "function": read_files,
+        "cacheable": True,
+        "path_args": ["paths"],
+    },
+    "write_files": {
+        "name": "write_files",
+        "description": "Write several files in one call and commit the change. Either all files are written or none are. Prefer this over repeated write_file calls when a change spans several files.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "files": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "path": {
+                                "type": "string",
+                                "description": "Path to the file to write",
+                            },
+                            "content": {
+                                "type": "string",
+                                "description": "Content to write to the file",
+                            },
+                        },
+                        "required": ["path", "content"],
+                    },
+                    "description": "Files to write",
+                },
+                "commit_message": {
+                    "type": "string",
+                    "description": "Commit message describing the change",
+                },
+            },
+            "required": ["files", "commit_message"],
+        },
+        "function": write_files,
+        "path_args": ["files"],
     },
     "create_directory": {
         "name": "create_directory",
@@ -62,6 +178,7 @@ DEFINITIONS = {
             "required": ["path"],
         },
         "function": create_directory,
+        "path_args": ["path"],
     },
     "copy_file": {
         "name": "copy_file",
@@ -82,6 +199,7 @@ DEFINITIONS = {
             "required": ["source", "destination", "commit_message"],
         },
         "function": copy_file,
+        "path_args": ["source", "destination"],
     },
     "move_file": {
         "name": "move_file",
@@ -102,6 +220,7 @@ DEFINITIONS = {
             "required": ["source", "destination", "commit_message"],
         },
         "function": move_file,
+        "path_args": ["source", "destination"],
     },
     "rename_file": {
         "name": "rename_file",
@@ -119,6 +238,7 @@ DEFINITIONS = {
             "required": ["source", "destination", "commit_message"],
         },
         "function": rename_file,
+        "path_args": ["source", "destination"],
     },
     "delete_file": {
         "name": "delete_file",
@@ -138,6 +258,7 @@ DEFINITIONS = {
             "required": ["file_path", "commit_message"],
         },
         "function": delete_file,
+        "path_args": ["file_path"],
     },
     "list_files": {
         "name": "list_files",
@@ -153,5 +274,7 @@ DEFINITIONS = {
             "required": ["directory"],
         },
         "function": list_files,
+        "cacheable": True,
+        "path_args": ["directory"],
     },
 }
@@ -2,10 +2,31 @@
 
 import os
 import shutil
+import tempfile
 from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from prometheus_swarm.tools.file_operations.patch import (
+    PatchError,
+    apply_hunks,
+    parse_unified_diff,
+    search_replace_hunks,
+)
 from prometheus_swarm.tools.git_operations.implementations import commit_and_push
-from git import Repo
 from prometheus_swarm.types import ToolOutput
+from prometheus_swarm.utils.workspace import current_workspace
+from prometheus_swarm.utils.workspace_index import (
+    get_workspace_index,
+    MAX_CACHED_FILE_BYTES,
+)
+
+# Default cap on content returned by read_file
+DEFAULT_READ_MAX_BYTES = 256 * 1024
+# Bytes inspected to decide whether a file is binary
+BINARY_SNIFF_BYTES = 8192
+# Default cap on total content returned by read_files
+DEFAULT_BATCH_READ_MAX_BYTES = 512 * 1024
+# Cap on total content accepted by write_files
+MAX_BATCH_WRITE_BYTES = 8 * 1024 * 1024
 
 
 def _normalize_path(path: str) -> str:
@@ -13,29 +34,163 @@ def _normalize_path(path: str) -> str:
     return path.lstrip("/")
 
 
-def read_file(file_path: str, **kwargs) -> ToolOutput:
+def _workspace(kwargs: Dict[str, Any]) -> Path:
+    """Directory a tool call works in: its repo_path, or the current workspace."""
+    return Path(current_workspace(kwargs.get("repo_path")))
+
+
+def _notify_written(path: Path, content: str = None) -> None:
+    """Update the workspace index after creating or changing a file."""
+    index = get_workspace_index(path.parent)
+    if index:
+        index.notify_written(path, content)
+
+
+def _notify_removed(path: Path) -> None:
+    """Update the workspace index after deleting or moving away a file."""
+    index = get_workspace_index(path.parent)
+    if index:
+        index.notify_removed(path)
+
+
+def _is_binary(full_path: Path) -> bool:
+    """Guess whether a file is binary from a NUL byte in its first block."""
+    with open(full_path, "rb") as f:
+        return b"\0" in f.read(BINARY_SNIFF_BYTES)
+
+
+def _read_window(
+    lines: Iterable[str], start_line: int, end_line: Optional[int], max_bytes: int
+) -> Dict[str, Any]:
+    """Collect lines start_line..end_line (1-based) up to max_bytes.
+
+    Consumes the whole iterable so the total line count is known.
+    """
+    window = []
+    size = 0
+    last_line = start_line - 1
+    truncated = False
+    total_lines = 0
+    for total_lines, line in enumerate(lines, 1):
+        if total_lines < start_line or truncated:
+            continue
+        if end_line is not None and total_lines > end_line:
+            continue
+        line_bytes = len(line.encode("utf-8", errors="replace"))
+        if size + line_bytes > max_bytes:
+            if not window:
+                # A single line longer than the limit: return its beginning
+                window.append(line.encode()[:max_bytes].decode(errors="ignore"))
+                last_line = total_lines
+            truncated = True
+            continue
+        window.append(line)
+        size += line_bytes
+        last_line = total_lines
+    return {
+        "content": "".join(window),
+        "last_line": last_line,
+        "total_lines": total_lines,
+        "truncated": truncated,
+    }
+
+
+def read_file(
+    file_path: str,
+    start_line: int = None,
+    end_line: int = None,
+    max_bytes: int = None,
+    **kwargs,
+) -> ToolOutput:
     """
-    Read the contents of a file.
+    Read the contents of a file, or a window of its lines.
+
+    Large files are streamed rather than loaded whole, and at most max_bytes of
+    content is returned. The total line count and size are always reported so
+    the caller can page through the rest.
 
     Args:
         file_path (str): Path to the file to read
+        start_line (int): First line to return (1-based, default 1)
+        end_line (int): Last line to return, inclusive (default: end of file)
+        max_bytes (int): Maximum bytes of content to return
+            (default DEFAULT_READ_MAX_BYTES)
 
     Returns:
         ToolOutput: A dictionary containing:
             - success (bool): Whether the operation succeeded
             - message (str): A human readable message
-            - data (dict): The file contents if successful
+            - data (dict): The file contents if successful, with start_line,
+              end_line, total_lines, size and truncated
     """
     try:
         file_path = _normalize_path(file_path)
-        full_path = Path(os.getcwd()) / file_path
-        with open(full_path, "r") as f:
-            content = f.read()
+        full_path = _workspace(kwargs) / file_path
+        start_line = max(int(start_line or 1), 1)
+        end_line = int(end_line) if end_line else None
+        max_bytes = int(max_bytes or DEFAULT_READ_MAX_BYTES)
+        size = full_path.stat().st_size
+
+        binary_result = {
+            "success": False,
+            "message": f"File appears to be binary ({size} bytes): {file_path}",
+            "data": {"size": size, "binary": True},
+        }
+
+        index = get_workspace_index(full_path.parent)
+        if index and size <= MAX_CACHED_FILE_BYTES:
+            # Small files are served from the workspace index's read cache,
+            # decoded the same way as the streamed read below
+            content = index.read_text(full_path, errors="replace")
+            if "\0" in content[:BINARY_SNIFF_BYTES]:
+                return binary_result
+            lines = content.splitlines(keepends=True)
+            result = _read_window(lines, start_line, end_line, max_bytes)
+        else:
+            if _is_binary(full_path):
+                return binary_result
+            with open(full_path, "r", errors="replace") as f:
+                result = _read_window(f, start_line, end_line, max_bytes)
+
+        total_lines = result["total_lines"]
+        if start_line > max(total_lines, 1):
             return {
-                "success": True,
-                "message": f"Successfully read file {file_path}",
-                "data": {"content": content},
+                "success": False,
+                "message": (
+                    f"start_line {start_line} is past the end of {file_path} "
+                    f"({total_lines} lines)"
+                ),
+                "data": {"total_lines": total_lines, "size": size},
             }
+        whole_file = (
+            start_line == 1
+            and result["last_line"] >= total_lines
+            and not result["truncated"]
+        )
+        if whole_file:
+            message = f"Successfully read file {file_path}"
+        else:
+            message = (
+                f"Read lines {start_line}-{result['last_line']} of {total_lines} "
+                f"from {file_path}"
+            )
+            if result["truncated"]:
+                message += (
+                    f" (truncated at {max_bytes} bytes; continue from line "
+                    f"{result['last_line'] + 1})"
+                )
+        return {
+            "success": True,
+            "message": message,
+            "data": {
+                "content": result["content"],
+                "start_line": start_line,
+                "end_line": result["last_line"],
+                "total_lines": total_lines,
+                "size": size,
+                "truncated": result["truncated"],
+            },
+        }
     except FileNotFoundError:
         return {
             "success": False,
@@ -56,15 +211,18 @@ def write_file(
     """Write file with directory creation and optional commit"""
     try:
         file_path = _normalize_path(file_path)
-        full_path = Path(os.getcwd()) / file_path
+        full_path = _workspace(kwargs) / file_path
         full_path.parent.mkdir(parents=True, exist_ok=True)
 
         with open(full_path, "w") as f:
             f.write(content)
+        _notify_written(full_path, content)
 
         # If commit message provided, commit and push changes
         if commit_message:
-            commit_result = commit_and_push(commit_message)
+            commit_result = commit_and_push(
+                commit_message, repo_path=kwargs.get("repo_path")
+            )
             if not commit_result["success"]:
                 return commit_result
 
@@ -81,6 +239,321 @@ def write_file(
         }
 
 
+def edit_file(
+    file_path: str,
+    edits: List[Dict[str, str]] = None,
+    diff: str = None,
+    commit_message: str = None,
+    **kwargs,
+) -> ToolOutput:
+    """
+    Change part of a file with search/replace blocks or a unified diff.
+
+    Each search block (or diff hunk) is located exactly if possible, then with
+    whitespace differences ignored, then by fuzzy matching. The edit is all or
+    nothing: if any block can't be located, the file is left unchanged and the
+    failed blocks are reported so they can be corrected and retried.
+
+    Args:
+        file_path (str): Path to the file to edit
+        edits (List[Dict[str, str]]): Blocks with search and replace text
+        diff (str): Unified diff of the file, as an alternative to edits
+        commit_message (str): Optional commit message for the change
+
+    Returns:
+        ToolOutput: A dictionary containing:
+            - success (bool): Whether every edit was applied
+            - message (str): A human readable message
+            - data (dict): path, applied and failed, listing each block with its
+              line and how it was matched
+    """
+    try:
+        file_path = _normalize_path(file_path)
+        full_path = _workspace(kwargs) / file_path
+        if not full_path.is_file():
+            return {
+                "success": False,
+                "message": f"File not found: {file_path}",
+                "data": None,
+            }
+        if bool(edits) == bool(diff):
+            return {
+                "success": False,
+                "message": "Provide either edits or diff",
+                "data": None,
+            }
+        try:
+            hunks = search_replace_hunks(edits) if edits else parse_unified_diff(diff)
+        except PatchError as e:
+            return {"success": False, "message": str(e), "data": None}
+
+        with open(full_path, "r", newline="") as f:
+            original = f.read()
+        result = apply_hunks(original, hunks)
+        if result.failed:
+            return {
+                "success": False,
+                "message": (
+                    f"{len(result.failed)} of {len(hunks)} edits could not be "
+                    f"applied; {file_path} was not changed"
+                ),
+                "data": {
+                    "path": file_path,
+                    "applied": result.applied,
+                    "failed": result.failed,
+                },
+            }
+
+        if result.text != original:
+            temp_path = _stage_file(full_path, result.text)
+            os.replace(temp_path, full_path)
+            _notify_written(full_path, result.text)
+
+            if commit_message:
+                commit_result = commit_and_push(
+                    commit_message, repo_path=kwargs.get("repo_path")
+                )
+                if not commit_result["success"]:
+                    return commit_result
+
+        return {
+            "success": True,
+            "message": f"Applied {len(result.applied)} edits to {file_path}",
+            "data": {"path": file_path, "applied": result.applied, "failed": []},
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Error editing file: {str(e)}",
+            "data": None,
+        }
+
+
+def read_files(paths: List[str], max_bytes: int = None, **kwargs) -> ToolOutput:
+    """
+    Read several files in one call.
+
+    Files are read in order until the total byte budget is used up; a file that
+    doesn't fit is truncated and any files after it are skipped. Each file gets
+    its own result, so one missing file doesn't fail the others.
+
+    Args:
+        paths (List[str]): Paths of the files to read
+        max_bytes (int): Maximum total bytes of content to return
+            (default DEFAULT_BATCH_READ_MAX_BYTES)
+
+    Returns:
+        ToolOutput: A dictionary containing:
+            - success (bool): Whether any file was read
+            - message (str): A human readable message
+            - data (dict): files, a list with path, success, message and
+              read_file's data (content, total_lines, truncated...) per file
+    """
+    try:
+        if not paths:
+            return {"success": False, "message": "No paths given", "data": None}
+        remaining = int(max_bytes or DEFAULT_BATCH_READ_MAX_BYTES)
+        files = []
+        for path in paths:
+            if remaining <= 0:
+                files.append(
+                    {
+                        "path": path,
+                        "success": False,
+                        "message": "Skipped: byte limit reached",
+                        "skipped": True,
+                    }
+                )
+                continue
+            result = read_file(
+                path, max_bytes=remaining, repo_path=kwargs.get("repo_path")
+            )
+            entry = {
+                "path": path,
+                "success": result["success"],
+                "message": result["message"],
+            }
+            if result["success"]:
+                entry.update(result["data"])
+                remaining -= len(result["data"]["content"].encode("utf-8"))
+                if result["data"]["truncated"]:
+                    remaining = 0
+            files.append(entry)
+
+        read = sum(1 for f in files if f["success"])
+        message = f"Read {read} of {len(files)} files"
+        skipped = sum(1 for f in files if f.get("skipped"))
+        if skipped:
+            message += f" ({skipped} skipped at the byte limit; read them separately)"
+        return {"success": read > 0, "message": message, "data": {"files": files}}
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Error reading files: {str(e)}",
+            "data": None,
+        }
+
+
+def _validate_batch(
+    files: List[Dict[str, Any]], root: Path
+) -> List[Dict[str, Any]]:
+    """Check write_files entries, returning a per-file list of problems."""
+    problems = []
+    seen = set()
+    total = 0
+    for number, entry in enumerate(files):
+        path = entry.get("path") if isinstance(entry, dict) else None
+        content = entry.get("content") if isinstance(entry, dict) else None
+        error = None
+        if not isinstance(path, str) or not path.strip("/"):
+            error = "Missing path"
+        elif not isinstance(content, str):
+            error = "Missing content"
+        else:
+            path = _normalize_path(path)
+            if os.path.normpath(path) in seen:
+                error = "Duplicate path in batch"
+            seen.add(os.path.normpath(path))
+            total += len(content.encode("utf-8"))
+            if (root / path).is_dir():
+                error = "Path is a directory"
+        if error:
+            problems.append({"index": number, "path": path, "error": error})
+    if total > MAX_BATCH_WRITE_BYTES:
+        problems.append(
+            {
+                "index": None,
+                "path": None,
+                "error": f"Batch is {total} bytes; the limit is "
+                f"{MAX_BATCH_WRITE_BYTES}",
+            }
+        )
+    return problems
+
+
+def _stage_file(full_path: Path, content: str) -> str:
+    """Write content to a temporary file next to full_path, returning its path."""
+    fd, temp_path = tempfile.mkstemp(
+        dir=full_path.parent, prefix=f".{full_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        if full_path.exists():
+            shutil.copymode(full_path, temp_path)
+        else:
+            # mkstemp creates files readable only by the owner
+            os.chmod(temp_path, 0o644)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return temp_path
+
+
+def write_files(
+    files: List[Dict[str, str]], commit_message: str = None, **kwargs
+) -> ToolOutput:
+    """
+    Write several files in one call, all or nothing.
+
+    Every file is first written to a temporary file next to its destination, and
+    the temporary files are then renamed into place. If anything fails, files
+    already replaced are restored and new files are removed, so the working tree
+    is left as it was. Changes are committed once, after all files are written.
+
+    Args:
+        files (List[Dict[str, str]]): Files to write, each with path and content
+        commit_message (str): Optional commit message for the change
+
+    Returns:
+        ToolOutput: A dictionary containing:
+            - success (bool): Whether all files were written
+            - message (str): A human readable message
+            - data (dict): files, with path, bytes and created per file, or the
+              problems found if nothing was written
+    """
+    try:
+        if not files:
+            return {"success": False, "message": "No files given", "data": None}
+        root = _workspace(kwargs)
+        problems = _validate_batch(files, root)
+        if problems:
+            return {
+                "success": False,
+                "message": f"No files written: {len(problems)} problem(s) in batch",
+                "data": {"problems": problems},
+            }
+
+        targets = []
+        for entry in files:
+            path = _normalize_path(entry["path"])
+            targets.append((path, root / path, entry["content"]))
+
+        staged = []  # (full path, temp path, backup path or None)
+        replaced = []
+        try:
+            for path, full_path, content in targets:
+                full_path.parent.mkdir(parents=True, exist_ok=True)
+                staged.append((full_path, _stage_file(full_path, content), None))
+
+            for number, (full_path, temp_path, _) in enumerate(staged):
+                backup = None
+                if full_path.exists():
+                    backup = f"{temp_path}.orig"
+                    try:
+                        os.link(full_path, backup)
+                    except OSError:
+                        shutil.copy2(full_path, backup)
+                staged[number] = (full_path, temp_path, backup)
+                os.replace(temp_path, full_path)
+                replaced.append(number)
+        except BaseException:
+            # Put back what was already replaced, then drop temporary files
+            for number in reversed(replaced):
+                full_path, _, backup = staged[number]
+                if backup:
+                    os.replace(backup, full_path)
+                elif full_path.exists():
+                    os.unlink(full_path)
+            for full_path, temp_path, backup in staged:
+                for leftover in (temp_path, backup):
+                    if leftover and os.path.exists(leftover):
+                        os.unlink(leftover)
+            raise
+
+        written = []
+        for (path, full_path, content), (_, _, backup) in zip(targets, staged):
+            if backup:
+                os.unlink(backup)
+            _notify_written(full_path, content)
+            written.append(
+                {
+                    "path": path,
+                    "bytes": len(content.encode("utf-8")),
+                    "created": backup is None,
+                }
+            )
+
+        if commit_message:
+            commit_result = commit_and_push(
+                commit_message, repo_path=kwargs.get("repo_path")
+            )
+            if not commit_result["success"]:
+                return commit_result
+
+        return {
+            "success": True,
+            "message": f"Successfully wrote {len(written)} files",
+            "data": {"files": written},
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Error writing files, no changes were made: {str(e)}",
+            "data": None,
+        }
+
+
 def copy_file(
     source: str, destination: str, commit_message: str = None, **kwargs
 ) -> ToolOutput:
@@ -88,8 +561,8 @@ def copy_file(
     try:
         source = _normalize_path(source)
         destination = _normalize_path(destination)
-        source_path = Path(os.getcwd()) / source
-        dest_path = Path(os.getcwd()) / destination
+        source_path = _workspace(kwargs) / source
+        dest_path = _workspace(kwargs) / destination
 
         if not source_path.exists():
             return {
@@ -102,10 +575,13 @@ def copy_file(
         dest_path.parent.mkdir(parents=True, exist_ok=True)
 
         shutil.copy2(source_path, dest_path)
+        _notify_written(dest_path)
 
         # If commit message provided, commit and push changes
         if commit_message:
-            commit_result = commit_and_push(commit_message)
+            commit_result = commit_and_push(
+                commit_message, repo_path=kwargs.get("repo_path")
+            )
             if not commit_result["success"]:
                 return commit_result
 
@@ -129,8 +605,8 @@ def move_file(
     try:
         source = _normalize_path(source)
         destination = _normalize_path(destination)
-        source_path = Path(os.getcwd()) / source
-        dest_path = Path(os.getcwd()) / destination
+        source_path = _workspace(kwargs) / source
+        dest_path = _workspace(kwargs) / destination
 
         if not source_path.exists():
             return {
@@ -143,10 +619,14 @@ def move_file(
         dest_path.parent.mkdir(parents=True, exist_ok=True)
 
         shutil.move(str(source_path), str(dest_path))
+        _notify_removed(source_path)
+        _notify_written(dest_path)
 
         # If commit message provided, commit and push changes
         if commit_message:
-            commit_result = commit_and_push(commit_message)
+            commit_result = commit_and_push(
+                commit_message, repo_path=kwargs.get("repo_path")
+            )
             if not commit_result["success"]:
                 return commit_result
 
@@ -164,14 +644,14 @@ def move_file(
 
 
 def rename_file(
-    source: str, destination: str, commit_message: str = None
+    source: str, destination: str, commit_message: str = None, **kwargs
 ) -> ToolOutput:
     """Rename a file and optionally commit the change."""
     try:
         source = _normalize_path(source)
         destination = _normalize_path(destination)
-        source_path = Path(os.getcwd()) / source
-        dest_path = Path(os.getcwd()) / destination
+        source_path = _workspace(kwargs) / source
+        dest_path = _workspace(kwargs) / destination
 
         if not source_path.exists():
             return {
@@ -182,10 +662,14 @@ def rename_file(
 
         dest_path.parent.mkdir(parents=True, exist_ok=True)
         os.rename(source_path, dest_path)
+        _notify_removed(source_path)
+        _notify_written(dest_path)
 
         # If commit message provided, commit and push changes
         if commit_message:
-            commit_result = commit_and_push(commit_message)
+            commit_result = commit_and_push(
+                commit_message, repo_path=kwargs.get("repo_path")
+            )
             if not commit_result["success"]:
                 return commit_result
 
@@ -206,7 +690,7 @@ def delete_file(file_path: str, commit_message: str = None, **kwargs) -> ToolOut
     """Delete a file and optionally commit the change."""
     try:
         file_path = _normalize_path(file_path)
-        full_path = Path(os.getcwd()) / file_path
+        full_path = _workspace(kwargs) / file_path
 
         if not full_path.exists():
             return {
@@ -216,10 +700,13 @@ def delete_file(file_path: str, commit_message: str = None, **kwargs) -> ToolOut
             }
 
         os.remove(full_path)
+        _notify_removed(full_path)
 
         # If commit message provided, commit and push changes
         if commit_message:
-            commit_result = commit_and_push(commit_message)
+            commit_result = commit_and_push(
+                commit_message, repo_path=kwargs.get("repo_path")
+            )
             if not commit_result["success"]:
                 return commit_result
 
@@ -252,7 +739,7 @@ def list_files(directory: str, **kwargs) -> ToolOutput:
     """
     try:
         directory = _normalize_path(directory)
-        directory = Path(os.getcwd()) / directory
+        directory = _workspace(kwargs) / directory
 
         if not directory.exists():
             return {
@@ -268,10 +755,10 @@ def list_files(directory: str, **kwargs) -> ToolOutput:
                 "data": None,
             }
 
-        # Use git to list all tracked and untracked files, respecting .gitignore
-        try:
-            repo = Repo(directory)
-        except Exception as e:
+        # Use the workspace index (built from git) to list all tracked and
+        # untracked files, respecting .gitignore
+        index = get_workspace_index(directory)
+        if index is None:
             # If not a git repo, just list files normally
             files = []
             for root, _, filenames in os.walk(directory):
@@ -290,22 +777,17 @@ def list_files(directory: str, **kwargs) -> ToolOutput:
                 "data": {"files": sorted(files)},
             }
 
-        # Get tracked files
-        tracked_files = set(repo.git.ls_files().splitlines())
-
-        # Get untracked files (excluding .gitignored)
-        untracked_files = set(
-            repo.git.ls_files("--others", "--exclude-standard").splitlines()
-        )
-
-        # Combine and filter out .git directory and node_modules
-        all_files = tracked_files.union(untracked_files)
-        files = sorted([f for f in all_files if not f.startswith(".git/") and not "node_modules" in f.split("/")])
+        files = index.files()
+        rel_dir = index.relative_path(directory)
+        if rel_dir != ".":
+            # List files relative to the requested subdirectory
+            prefix = rel_dir + "/"
+            files = [f[len(prefix) :] for f in files if f.startswith(prefix)]
 
         return {
             "success": True,
             "message": f"Found {len(files)} files in {directory}",
-            "data": {"files": files},
+            "data": {"files": list(files)},
         }
 
     except Exception as e:
@@ -330,7 +812,7 @@ def create_directory(path: str, **kwargs) -> ToolOutput:
     """
     try:
         path = _normalize_path(path)
-        full_path = Path(os.getcwd()) / path
+        full_path = _workspace(kwargs) / path
         full_path.mkdir(parents=True, exist_ok=True)
         return {
             "success": True,
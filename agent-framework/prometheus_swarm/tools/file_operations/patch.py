@@ -0,0 +1,243 @@
+"""Apply search/replace blocks and unified diffs to file contents.
+
+Edits are located exactly where possible, then by comparing lines with
+whitespace ignored, then by fuzzy similarity, so small drift in the model's copy
+of the file doesn't make an edit fail.
+"""
+
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+# Minimum similarity for a fuzzy match of a hunk's original lines
+FUZZY_THRESHOLD = 0.9
+# Skip fuzzy matching when it would compare more than this many line pairs
+MAX_FUZZY_COMPARISONS = 200_000
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(Exception):
+    """Raised when edits can't be parsed."""
+
+
+@dataclass
+class Hunk:
+    """One change: replace the old lines with the new lines."""
+
+    old: List[str]
+    new: List[str]
+    # 0-based line where the change is expected, if known
+    hint: Optional[int] = None
+    # Original search/replace text, for exact substring replacement
+    search: Optional[str] = None
+    replace: Optional[str] = None
+
+
+@dataclass
+class PatchResult:
+    """Outcome of applying hunks to a text."""
+
+    text: str
+    applied: List[Dict[str, Any]] = field(default_factory=list)
+    failed: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def parse_unified_diff(diff: str) -> List[Hunk]:
+    """Parse the hunks of a single-file unified diff.
+
+    File headers (---/+++) are optional. Raises PatchError if the diff has no
+    hunks or covers more than one file.
+    """
+    hunks: List[Hunk] = []
+    current: Optional[Hunk] = None
+    files = 0
+    lines = diff.splitlines()
+    for number, line in enumerate(lines):
+        following = lines[number + 1] if number + 1 < len(lines) else ""
+        if line.startswith("--- ") and following.startswith("+++ "):
+            files += 1
+            if files > 1:
+                raise PatchError("Diff changes more than one file")
+            current = None
+            continue
+        if line.startswith("+++ ") and number and lines[number - 1].startswith("--- "):
+            continue
+        match = _HUNK_HEADER.match(line)
+        if match:
+            start = int(match.group(1))
+            # An empty old side ("-N,0") inserts after line N, i.e. before
+            # 0-based line N; otherwise the change starts at line N
+            hint = start if match.group(2) == "0" else max(start - 1, 0)
+            current = Hunk(old=[], new=[], hint=hint)
+            hunks.append(current)
+            continue
+        if line.startswith("@@"):
+            # Header without line numbers, as models often write
+            current = Hunk(old=[], new=[])
+            hunks.append(current)
+            continue
+        if current is None or line.startswith("\\"):
+            continue
+        if line.startswith("-"):
+            current.old.append(line[1:])
+        elif line.startswith("+"):
+            current.new.append(line[1:])
+        else:
+            text = line[1:] if line.startswith(" ") else line
+            current.old.append(text)
+            current.new.append(text)
+    hunks = [h for h in hunks if h.old != h.new]
+    if not hunks:
+        raise PatchError("Diff contains no changes")
+    return hunks
+
+
+def search_replace_hunks(edits: List[Dict[str, str]]) -> List[Hunk]:
+    """Convert search/replace blocks into hunks."""
+    hunks = []
+    for number, edit in enumerate(edits, 1):
+        if not isinstance(edit, dict) or not isinstance(edit.get("search"), str):
+            raise PatchError(f"Edit {number} has no search text")
+        if not isinstance(edit.get("replace"), str):
+            raise PatchError(f"Edit {number} has no replace text")
+        if not edit["search"]:
+            raise PatchError(f"Edit {number} has empty search text")
+        hunks.append(
+            Hunk(
+                old=edit["search"].splitlines(),
+                new=edit["replace"].splitlines(),
+                search=edit["search"],
+                replace=edit["replace"],
+            )
+        )
+    return hunks
+
+
+def _squash(line: str) -> str:
+    return " ".join(line.split())
+
+
+def _indent(line: str) -> str:
+    return line[: len(line) - len(line.lstrip())]
+
+
+def _closest(positions: List[int], hint: Optional[int]) -> int:
+    if hint is None:
+        return positions[0]
+    return min(positions, key=lambda p: (abs(p - hint), p))
+
+
+def find_block(
+    lines: List[str], old: List[str], hint: Optional[int] = None
+) -> Tuple[Optional[int], str, float]:
+    """Find where old lines occur in lines.
+
+    Returns:
+        Tuple of (0-based start or None, match kind, similarity). Exact and
+        whitespace matches closest to hint win; without a hint, more than one
+        candidate is ambiguous and returns None with kind "ambiguous".
+    """
+    size = len(old)
+    starts = range(len(lines) - size + 1)
+
+    for kind, normalize in (("exact", None), ("whitespace", _squash)):
+        if normalize is None:
+            positions = [i for i in starts if lines[i : i + size] == old]
+        else:
+            target = [normalize(line) for line in old]
+            squashed = [normalize(line) for line in lines]
+            positions = [i for i in starts if squashed[i : i + size] == target]
+        if len(positions) == 1 or (positions and hint is not None):
+            return _closest(positions, hint), kind, 1.0
+        if positions:
+            return None, "ambiguous", 1.0
+
+    if size * len(lines) > MAX_FUZZY_COMPARISONS:
+        return None, "none", 0.0
+    target = "\n".join(_squash(line) for line in old)
+    squashed = [_squash(line) for line in lines]
+    best: Tuple[float, int] = (0.0, -1)
+    for i in starts:
+        matcher = SequenceMatcher(None, "\n".join(squashed[i : i + size]), target)
+        if matcher.real_quick_ratio() < FUZZY_THRESHOLD:
+            continue
+        if matcher.quick_ratio() < FUZZY_THRESHOLD:
+            continue
+        ratio = matcher.ratio()
+        better = ratio > best[0] or (
+            ratio == best[0]
+            and hint is not None
+            and abs(i - hint) < abs(best[1] - hint)
+        )
+        if better:
+            best = (ratio, i)
+    if best[0] >= FUZZY_THRESHOLD:
+        return best[1], "fuzzy", round(best[0], 3)
+    return None, "none", round(best[0], 3)
+
+
+def _reindent(new: List[str], model_old: List[str], file_old: List[str]) -> List[str]:
+    """Shift replacement lines by the indentation difference of the match."""
+    model_first = next((line for line in model_old if line.strip()), None)
+    file_first = next((line for line in file_old if line.strip()), None)
+    if model_first is None or file_first is None:
+        return new
+    model_indent, file_indent = _indent(model_first), _indent(file_first)
+    if model_indent == file_indent:
+        return new
+    shifted = []
+    for line in new:
+        if line.strip() and line.startswith(model_indent):
+            line = file_indent + line[len(model_indent) :]
+        shifted.append(line)
+    return shifted
+
+
+def apply_hunks(text: str, hunks: List[Hunk]) -> PatchResult:
+    """Apply hunks in order. Failed hunks are reported and skipped."""
+    newline = "\r\n" if "\r\n" in text else "\n"
+    result = PatchResult(text=text)
+    # Unified diff line numbers refer to the original text
+    offset = 0
+    for number, hunk in enumerate(hunks, 1):
+        current = result.text
+        if hunk.search is not None and current.count(hunk.search) == 1:
+            start = current[: current.index(hunk.search)].count("\n")
+            result.text = current.replace(hunk.search, hunk.replace, 1)
+            result.applied.append({"hunk": number, "line": start + 1, "match": "exact"})
+            continue
+
+        lines = current.splitlines()
+        hint = hunk.hint + offset if hunk.hint is not None else None
+        if not hunk.old:
+            start, kind, score = min(hint or 0, len(lines)), "insert", 1.0
+        elif hunk.search is not None and hunk.search in current:
+            start, kind, score = None, "ambiguous", 1.0
+        else:
+            start, kind, score = find_block(lines, hunk.old, hint)
+        if start is None:
+            reason = (
+                "search text matches more than one place; include more context"
+                if kind == "ambiguous"
+                else "could not find the original lines"
+            )
+            result.failed.append(
+                {"hunk": number, "reason": reason, "similarity": score}
+            )
+            continue
+
+        end = start + len(hunk.old)
+        new = _reindent(hunk.new, hunk.old, lines[start:end])
+        lines[start:end] = new
+        trailing = newline if current.endswith(("\n", "\r")) or not current else ""
+        result.text = newline.join(lines) + trailing
+        if hunk.hint is not None:
+            # Later hunks move by however far this one was from its position
+            offset = start - hunk.hint + len(new) - len(hunk.old)
+        entry = {"hunk": number, "line": start + 1, "match": kind}
+        if kind == "fuzzy":
+            entry["similarity"] = score
+        result.applied.append(entry)
+    return result
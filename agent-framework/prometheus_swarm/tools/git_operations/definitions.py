@@ -4,6 +4,7 @@ from prometheus_swarm.tools.git_operations.implementations import (
     create_branch,
     checkout_branch,
     commit_and_push,
+    flush_commits,
     get_current_branch,
     list_branches,
     add_remote,
@@ -13,6 +14,7 @@ from prometheus_swarm.tools.git_operations.implementations import (
     check_for_conflicts,
     get_conflict_info,
     resolve_conflict,
+    submit_hunk_resolution,
     create_merge_commit,
 )
 
@@ -109,6 +111,15 @@ DEFINITIONS = {
         },
         "function": commit_and_push,
     },
+    "flush_commits": {
+        "name": "flush_commits",
+        "description": "Commit and push changes now instead of at the end of the phase. File changes are normally committed together when the phase ends; call this only if later steps need the changes pushed.",
+        "parameters": {
+            "type": "object",
+            "properties": {},
+        },
+        "function": flush_commits,
+    },
     "get_current_branch": {
         "name": "get_current_branch",
         "description": "Get the current branch name in the working directory.",
@@ -219,6 +230,22 @@ DEFINITIONS = {
         },
         "function": resolve_conflict,
     },
+    "submit_hunk_resolution": {
+        "name": "submit_hunk_resolution",
+        "description": "Submit the resolved text of a conflicting hunk.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "resolution": {
+                    "type": "string",
+                    "description": "Text replacing the hunk, without conflict markers",
+                },
+            },
+            "required": ["resolution"],
+        },
+        "final_tool": True,
+        "function": submit_hunk_resolution,
+    },
     "create_merge_commit": {
         "name": "create_merge_commit",
         "description": "Create a merge commit after resolving conflicts.",
@@ -2,13 +2,26 @@
 
 import os
 import shutil
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 from git import Repo, GitCommandError
 from prometheus_swarm.utils.logging import log_key_value, log_error
+from prometheus_swarm.utils.tracing import traced
 from prometheus_swarm.types import ToolOutput
+from prometheus_swarm.utils.workspace import current_workspace
+from prometheus_swarm.utils.conflict_hunks import validate_resolution
+from prometheus_swarm.utils.workspace_index import get_workspace_index
 
 import time
 
+# Commit messages deferred by batch_commits(), per repository root. None when
+# commits are not being batched.
+_pending_commits: ContextVar[Optional[Dict[str, List[str]]]] = ContextVar(
+    "pending_commits", default=None
+)
+
 
 def _get_repo(repo_path: str) -> Repo:
     """
@@ -63,6 +76,7 @@ def init_repository(
         }
 
 
+@traced("git.clone_repository")
 def clone_repository(
     url: str,
     path: str,
@@ -212,7 +226,7 @@ def create_branch(branch_base: str, repo_path: str, **kwargs) -> ToolOutput:
 def checkout_branch(branch_name: str, **kwargs) -> ToolOutput:
     """Check out an existing branch in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = current_workspace(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         log_key_value("Checking out branch", branch_name)
         branch = repo.heads[branch_name]
@@ -232,26 +246,104 @@ def checkout_branch(branch_name: str, **kwargs) -> ToolOutput:
         }
 
 
-def commit_and_push(message: str, **kwargs) -> ToolOutput:
-    """Commit all changes and push to remote."""
+def commit_batching_enabled() -> bool:
+    """Whether workflow phases should batch commits (COMMIT_BATCHING, default on)."""
+    return os.getenv("COMMIT_BATCHING", "true").lower() not in ("0", "false", "no")
+
+
+@contextmanager
+def batch_commits():
+    """Defer commit_and_push calls until the end of the block.
+
+    Inside the block, commit_and_push only records its message. Changes are
+    committed and pushed once when the block exits, or earlier if flush_commits
+    is called. Nested blocks share the outer batch.
+
+    Yields a dict that holds the final flush_commits result once the block
+    exits (it stays empty for nested blocks), so callers can tell whether the
+    changes reached the remote.
+    """
+    outcome: Dict[str, Any] = {}
+    if _pending_commits.get() is not None:
+        yield outcome
+        return
+    token = _pending_commits.set({})
+    try:
+        yield outcome
+    finally:
+        try:
+            result = flush_commits()
+            outcome.update(result)
+            if not result["success"]:
+                log_error(Exception(result["message"]), "Deferred commits not pushed")
+        finally:
+            _pending_commits.reset(token)
+
+
+def _combine_messages(messages: List[str]) -> str:
+    """Make one commit message from several deferred ones."""
+    unique = list(dict.fromkeys(m.strip() for m in messages if m and m.strip()))
+    if not unique:
+        return "Update files"
+    if len(unique) == 1:
+        return unique[0]
+    return unique[0] + "\n\n" + "\n".join(f"- {m}" for m in unique[1:])
+
+
+def _push(repo: Repo) -> None:
+    """Push the current branch, pulling first if the remote has moved on."""
     try:
-        repo = Repo(os.getcwd())
-        log_key_value("Committing changes", message)
+        repo.git.push("origin", repo.active_branch.name)
+    except GitCommandError:
+        # If push failed, pull and try again
+        repo.git.pull("origin", repo.active_branch.name)
+        repo.git.push("origin", repo.active_branch.name)
+
+
+def _commit_and_push_now(repo: Repo, message: str, allow_empty: bool = True):
+    """Stage everything, commit and push. Returns the new commit, if any."""
+    log_key_value("Committing changes", message)
+    index = get_workspace_index(repo.working_tree_dir)
+    stamp = index.git_stamp() if index else None
 
+    commit = None
+    if allow_empty or repo.is_dirty(untracked_files=True):
         # Stage all changes
         repo.git.add(A=True)
 
         # Create commit
         commit = repo.index.commit(message)
+        if index:
+            # Staging and committing doesn't change which files exist
+            index.acknowledge_git_change(stamp)
 
-        # Try to push, with automatic pull if needed
-        try:
-            repo.git.push("origin", repo.active_branch.name)
-        except GitCommandError:
-            # If push failed, pull and try again
-            repo.git.pull("origin", repo.active_branch.name)
-            repo.git.push("origin", repo.active_branch.name)
+    _push(repo)
+    return commit
+
+
+@traced("git.commit_and_push")
+def commit_and_push(message: str, **kwargs) -> ToolOutput:
+    """Commit all changes and push to remote.
 
+    Inside batch_commits(), the message is recorded and the commit deferred.
+    """
+    try:
+        repo = Repo(
+            current_workspace(kwargs.get("repo_path")), search_parent_directories=True
+        )
+        pending = _pending_commits.get()
+        if pending is not None:
+            pending.setdefault(repo.working_tree_dir, []).append(message)
+            return {
+                "success": True,
+                "message": (
+                    f"Change recorded: {message}. It will be committed and pushed "
+                    "at the end of the phase, or when flush_commits is called"
+                ),
+                "data": {"deferred": True, "message": message},
+            }
+
+        commit = _commit_and_push_now(repo, message)
         return {
             "success": True,
             "message": f"Changes committed and pushed: {message}",
@@ -267,10 +359,70 @@ def commit_and_push(message: str, **kwargs) -> ToolOutput:
         }
 
 
+@traced("git.flush_commits")
+def flush_commits(repo_path: Optional[str] = None, **kwargs) -> ToolOutput:
+    """Commit and push changes deferred by batch_commits().
+
+    Each repository with deferred changes gets a single commit, whose message
+    combines the deferred messages, and a single push.
+
+    Args:
+        repo_path: Only push the repository containing this path (default: all
+            repositories with deferred changes)
+    """
+    pending = _pending_commits.get() or {}
+    roots = list(pending)
+    if repo_path is not None:
+        path = os.path.realpath(repo_path)
+        roots = [
+            root
+            for root in roots
+            if path == os.path.realpath(root)
+            or path.startswith(os.path.realpath(root) + os.sep)
+        ]
+    if not roots:
+        return {
+            "success": True,
+            "message": "No deferred commits to push",
+            "data": {"commits": []},
+        }
+
+    commits = []
+    for root in roots:
+        messages = pending[root]
+        try:
+            repo = Repo(root)
+            commit = _commit_and_push_now(
+                repo, _combine_messages(messages), allow_empty=False
+            )
+        except GitCommandError as e:
+            error_msg = f"Failed to commit and push: {str(e)}"
+            log_error(e, error_msg)
+            return {
+                "success": False,
+                "message": error_msg,
+                "data": {"commits": commits},
+            }
+        del pending[root]
+        commits.append(
+            {
+                "commit_hash": commit.hexsha if commit else None,
+                "changes": len(messages),
+            }
+        )
+
+    changes = sum(c["changes"] for c in commits)
+    return {
+        "success": True,
+        "message": f"Committed and pushed {changes} deferred changes",
+        "data": {"commits": commits},
+    }
+
+
 def get_current_branch(**kwargs) -> ToolOutput:
     """Get the current branch name in the working directory"""
     try:
-        repo = Repo(os.getcwd())
+        repo = Repo(current_workspace(kwargs.get("repo_path")))
         branch = repo.active_branch.name
         log_key_value("Current branch", branch)
         return {
@@ -291,7 +443,7 @@ def get_current_branch(**kwargs) -> ToolOutput:
 def list_branches(**kwargs) -> ToolOutput:
     """List all branches in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = current_workspace(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         branches = [head.name for head in repo.heads]
         log_key_value("Branches", ", ".join(branches))
@@ -313,7 +465,7 @@ def list_branches(**kwargs) -> ToolOutput:
 def add_remote(name: str, url: str, **kwargs) -> ToolOutput:
     """Add a remote to the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = current_workspace(kwargs.get("repo_path"))
         # Insert GitHub token authentication logic
         repo = _get_repo(repo_path)
         log_key_value("Adding remote", f"{name} -> {url}")
@@ -333,6 +485,7 @@ def add_remote(name: str, url: str, **kwargs) -> ToolOutput:
         }
 
 
+@traced("git.fetch_remote")
 def fetch_remote(repo_path: str, remote_name: str, **kwargs) -> ToolOutput:
     """Fetch from a remote repository.
 
@@ -362,12 +515,13 @@ def fetch_remote(repo_path: str, remote_name: str, **kwargs) -> ToolOutput:
         }
 
 
+@traced("git.pull_remote")
 def pull_remote(
     remote_name: str = "origin", branch: str = None, **kwargs
 ) -> ToolOutput:
     """Pull changes with explicit branch specification."""
     try:
-        repo_path = os.getcwd()
+        repo_path = current_workspace(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         branch = branch or repo.active_branch.name
         log_key_value("Pulling from remote", f"{remote_name}/{branch}")
@@ -375,7 +529,7 @@ def pull_remote(
         repo.git.pull(remote_name, branch, "--allow-unrelated-histories")
 
         # Check for conflicts after pull
-        if check_for_conflicts(**kwargs)["has_conflicts"]:
+        if check_for_conflicts(**kwargs)["data"]["has_conflicts"]:
             return {
                 "success": False,
                 "message": "Merge conflict detected after pull",
@@ -402,7 +556,7 @@ def can_access_repository(repo_url: str, **kwargs) -> ToolOutput:
     try:
         log_key_value("Checking access to", repo_url)
         # Use GitPython to check remote URLs
-        repo = Repo(os.getcwd())
+        repo = Repo(current_workspace(kwargs.get("repo_path")))
         for remote in repo.remotes:
             if any(repo_url in url for url in remote.urls):
                 return {
@@ -426,7 +580,7 @@ def can_access_repository(repo_url: str, **kwargs) -> ToolOutput:
 def check_for_conflicts(**kwargs) -> ToolOutput:
     """Check for merge conflicts in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = current_workspace(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         unmerged = repo.index.unmerged_blobs()
         conflicting_files = sorted(list(unmerged.keys()))
@@ -455,7 +609,7 @@ def check_for_conflicts(**kwargs) -> ToolOutput:
 def get_conflict_info(**kwargs) -> ToolOutput:
     """Get details about current conflicts from Git's index in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = current_workspace(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         conflicts = {}
         unmerged = repo.index.unmerged_blobs()
@@ -490,7 +644,7 @@ def get_conflict_info(**kwargs) -> ToolOutput:
 def resolve_conflict(file_path: str, resolution: str, **kwargs) -> ToolOutput:
     """Resolve a conflict in a specific file and commit the resolution in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = current_workspace(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         log_key_value("Resolving conflict in", file_path)
         full_path = Path(repo.working_dir) / file_path
@@ -511,13 +665,28 @@ def resolve_conflict(file_path: str, resolution: str, **kwargs) -> ToolOutput:
         }
 
 
+def submit_hunk_resolution(resolution: str, **kwargs) -> ToolOutput:
+    """Submit the resolved text of a single conflicting hunk."""
+    if validate_resolution("", resolution):
+        return {
+            "success": False,
+            "message": "Resolution still contains conflict markers",
+            "data": None,
+        }
+    return {
+        "success": True,
+        "message": "Hunk resolution submitted",
+        "data": {"resolution": resolution},
+    }
+
+
 def create_merge_commit(message: str, **kwargs) -> ToolOutput:
     """Create a merge commit after resolving conflicts in the current repository."""
     try:
-        repo_path = os.getcwd()
+        repo_path = current_workspace(kwargs.get("repo_path"))
         repo = _get_repo(repo_path)
         log_key_value("Creating merge commit", message)
-        if check_for_conflicts(**kwargs)["has_conflicts"]:
+        if check_for_conflicts(**kwargs)["data"]["has_conflicts"]:
             return {
                 "success": False,
                 "message": "Cannot create merge commit with unresolved conflicts",
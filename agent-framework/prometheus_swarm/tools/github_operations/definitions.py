@@ -2,6 +2,7 @@ from prometheus_swarm.tools.github_operations.implementations import (
     create_worker_pull_request,
     create_leader_pull_request,
     review_pull_request,
+    post_pull_request_comments,
     review_pull_request_legacy,
     validate_implementation,
     generate_analysis,
@@ -155,6 +156,43 @@ DEFINITIONS = {
         "final_tool": True,
         "function": review_pull_request,
     },
+    "post_pull_request_comments": {
+        "name": "post_pull_request_comments",
+        "description": "Post comments on several pull requests at once.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "repo_owner": {
+                    "type": "string",
+                    "description": "Owner of the repository",
+                },
+                "repo_name": {
+                    "type": "string",
+                    "description": "Name of the repository",
+                },
+                "comments": {
+                    "type": "array",
+                    "description": "Comments to post",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "pr_number": {
+                                "type": "integer",
+                                "description": "Pull request number",
+                            },
+                            "body": {
+                                "type": "string",
+                                "description": "Comment text (markdown)",
+                            },
+                        },
+                        "required": ["pr_number", "body"],
+                    },
+                },
+            },
+            "required": ["repo_owner", "repo_name", "comments"],
+        },
+        "function": post_pull_request_comments,
+    },
     "validate_implementation": {
         "name": "validate_implementation",
         "description": "Validate that an implementation meets its requirements.",
@@ -1,14 +1,20 @@
 """Module for GitHub operations."""
 
+import hashlib
 import os
-from typing import Dict, List, Any
-from github import Github, Auth, GithubException
+import re
+from typing import Dict, List, Any, Optional
+from github import GithubException
 from dotenv import load_dotenv
 from prometheus_swarm.tools.git_operations.implementations import (
     fetch_remote,
+    flush_commits,
     pull_remote,
 )
 from prometheus_swarm.utils.logging import log_key_value, log_error
+from prometheus_swarm.utils.github_budget import LOW
+from prometheus_swarm.utils.github_gateway import GitHubGateway, get_gateway
+from prometheus_swarm.utils.github_outbox import get_outbox, idempotency_key, key_marker
 from prometheus_swarm.types import ToolOutput
 from prometheus_swarm.workflows.utils import get_fork_name
 
@@ -23,22 +29,96 @@ import uuid
 load_dotenv()
 
 
-def _get_github_client(github_token: str) -> Github:
+def _get_github_client(github_token: str) -> GitHubGateway:
     """
-    Get an authenticated GitHub client.
+    Get the shared, authenticated GitHub client for a token.
 
     Args:
         github_token: GitHub token for authentication
 
     Returns:
-        Github: Authenticated GitHub client
+        GitHubGateway: Authenticated GitHub client with cached lookups
 
     Raises:
         ValueError: If github_token is not provided
     """
     if not github_token:
         raise ValueError("GitHub token is required")
-    return Github(auth=Auth.Token(github_token))
+    return get_gateway(github_token)
+
+
+def _defer_low_priority(gh: GitHubGateway, name: str) -> Optional[ToolOutput]:
+    """Result for a low-priority call deferred while the rate limit is low."""
+    if gh.budget.allow(LOW):
+        return None
+    retry_after = round(gh.budget.defer(name))
+    log_key_value("GitHub rate limit budget low, deferring", name)
+    return {
+        "success": False,
+        "message": (
+            f"Deferred {name}: GitHub rate limit budget is low. "
+            f"Retry after {retry_after} seconds."
+        ),
+        "data": {"deferred": True, "retry_after": retry_after},
+    }
+
+
+def _find_pull_request(repo, head: str, base: str) -> Optional[Dict[str, Any]]:
+    """An open PR from head (owner:branch) into base, if there is one."""
+    for pr in repo.get_pulls(state="open", head=head, base=base):
+        return {"pr_url": pr.html_url}
+    return None
+
+
+def _create_pull(
+    gh: GitHubGateway,
+    repo_full_name: str,
+    title: str,
+    body: str,
+    head: str,
+    base: str,
+    kind: str,
+    context: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Create a PR once per task round, reusing an open PR from the same head."""
+    repo = gh.get_repo(repo_full_name)
+    key = idempotency_key(
+        context.get("task_id"),
+        context.get("round_number"),
+        kind,
+        f"{repo_full_name}:{head}",
+    )
+    return get_outbox().send(
+        key,
+        lambda: {
+            "pr_url": repo.create_pull(
+                title=title, body=body, head=head, base=base
+            ).html_url
+        },
+        find_existing=lambda: _find_pull_request(repo, head, base),
+        check_first=True,
+        gateway=gh,
+    )
+
+
+def _find_comment(pr, key: str) -> Optional[Dict[str, Any]]:
+    marker = key_marker(key).strip()
+    for comment in pr.get_issue_comments():
+        if marker in (comment.body or ""):
+            return {"comment_url": comment.html_url}
+    return None
+
+
+def _comment_write(gh: GitHubGateway, pr, body: str, key: Optional[str]) -> dict:
+    """Arguments for GitHubOutbox.send() posting a comment on a PR once per key."""
+    return {
+        "key": key,
+        "write": lambda: {
+            "comment_url": pr.create_issue_comment(body + key_marker(key)).html_url
+        },
+        "find_existing": (lambda: _find_comment(pr, key)) if key else None,
+        "gateway": gh,
+    }
 
 
 def create_pull_request_legacy(
@@ -155,6 +235,11 @@ def create_pull_request(
         ToolOutput: Standardized tool output with PR URL on success
     """
     try:
+        # Make sure this repo's changes deferred by commit batching are pushed
+        flushed = flush_commits(repo_path=kwargs.get("repo_path"))
+        if not flushed["success"]:
+            return flushed
+
         gh = _get_github_client(github_token)
         repo_full_name = f"{repo_owner}/{repo_name}"
 
@@ -167,12 +252,13 @@ def create_pull_request(
 
         body = pr_template.format(**data)
 
-        repo = gh.get_repo(repo_full_name)
-        pr = repo.create_pull(title=title, body=body, head=head, base=base_branch)
+        created = _create_pull(
+            gh, repo_full_name, title, body, head, base_branch, "pull_request", kwargs
+        )
         return {
             "success": True,
             "message": f"Successfully created PR: {title}",
-            "data": {"pr_url": pr.html_url},
+            "data": {"pr_url": created["pr_url"]},
         }
     except GithubException as e:
         log_error(e, f"GitHub API error: {str(e.data)}")
@@ -211,6 +297,11 @@ def create_worker_pull_request(
 ) -> ToolOutput:
     """Create a pull request with worker information."""
     try:
+        # Make sure this repo's changes deferred by commit batching are pushed
+        flushed = flush_commits(repo_path=kwargs.get("repo_path"))
+        if not flushed["success"]:
+            return flushed
+
         # Get GitHub client
         gh = _get_github_client(github_token)
 
@@ -233,20 +324,23 @@ def create_worker_pull_request(
             "public_signature": public_signature,
         }
 
-        # Create the pull request
-        repo = gh.get_repo(f"{repo_owner}/{repo_name}")
+        # Create the pull request, unless this round already did
         head = f"{github_username}:{head_branch}"  # Format head with username prefix
-        pr = repo.create_pull(
-            title=title,
-            body=TEMPLATES["worker_pr_template"].format(**data),
-            head=head,
-            base=base_branch,
+        created = _create_pull(
+            gh,
+            f"{repo_owner}/{repo_name}",
+            title,
+            TEMPLATES["worker_pr_template"].format(**data),
+            head,
+            base_branch,
+            "worker_pull_request",
+            kwargs,
         )
 
         return {
             "success": True,
             "message": f"Successfully created PR: {title}",
-            "data": {"pr_url": pr.html_url},
+            "data": {"pr_url": created["pr_url"]},
         }
     except Exception as e:
         print(f"Failed to create worker pull request: {str(e)}")
@@ -330,13 +424,59 @@ def create_leader_pull_request(
     )
 
 
+def _merge_upstream(
+    repo_path: str, branch: str, github_token: Optional[str] = None
+) -> Optional[ToolOutput]:
+    """Sync a fork's branch on GitHub, then fetch only the new commits.
+
+    Returns None if the fork can't be synced this way (e.g. the branch conflicts
+    with upstream, or origin isn't on GitHub), so the caller can sync locally.
+    """
+    token = github_token or os.environ.get("GITHUB_TOKEN")
+    repo = Repo(repo_path)
+    match = re.search(
+        r"github\.com[/:]([^/]+)/([^/]+?)(?:\.git)?/?$", repo.remotes.origin.url
+    )
+    if not token or not match:
+        return None
+    fork_full_name = f"{match.group(1)}/{match.group(2)}"
+
+    try:
+        gh = _get_github_client(token)
+        merged = gh.get_repo(fork_full_name).merge_upstream(branch)
+    except GithubException as e:
+        # 409: conflicts with upstream, 422: the branch can't be synced
+        log_key_value("Server-side fork sync failed, syncing locally", e.status)
+        return None
+
+    try:
+        repo.git.pull("origin", branch)
+        # Publish any local commits, as the local sync does
+        repo.git.push("origin", branch)
+    except GitCommandError as e:
+        log_error(e, "Failed to update clone after server-side fork sync")
+        return None
+
+    print(f"Synced fork on GitHub ({merged.merge_type})")
+    return {
+        "success": True,
+        "message": f"Successfully synced branch {branch} with upstream",
+        "data": {"branch": branch, "merge_type": merged.merge_type},
+    }
+
+
 def sync_fork(repo_path: str, branch: str = "main", **kwargs) -> ToolOutput:
     """
     Sync a fork with its upstream repository.
 
+    The fork is synced on GitHub through the merge-upstream API where possible,
+    so only new commits are fetched. If GitHub can't sync it, upstream is pulled
+    into the local clone and pushed.
+
     Args:
         repo_path: Path to the git repository
         branch: Branch to sync (default: main)
+        github_token: GitHub token (default: GITHUB_TOKEN)
 
     Returns:
         ToolOutput: Standardized tool output with sync status
@@ -344,6 +484,10 @@ def sync_fork(repo_path: str, branch: str = "main", **kwargs) -> ToolOutput:
     try:
         print(f"Syncing fork with upstream, branch: {branch}")
 
+        synced = _merge_upstream(repo_path, branch, kwargs.get("github_token"))
+        if synced is not None:
+            return synced
+
         # Fetch from upstream
         fetch_result = fetch_remote(repo_path, "upstream")
         if not fetch_result["success"]:
@@ -354,7 +498,7 @@ def sync_fork(repo_path: str, branch: str = "main", **kwargs) -> ToolOutput:
             }
 
         # Pull from upstream
-        pull_result = pull_remote(repo_path, "upstream", branch)
+        pull_result = pull_remote("upstream", branch, repo_path=repo_path)
         if not pull_result["success"]:
             return {
                 "success": False,
@@ -498,8 +642,7 @@ def review_pull_request(
     """
     try:
         gh = _get_github_client(os.environ.get("GITHUB_TOKEN"))
-        repo = gh.get_repo(f"{repo_owner}/{repo_name}")
-        pr = repo.get_pull(pr_number)
+        pr = gh.get_pull(f"{repo_owner}/{repo_name}", pr_number)
 
         # Format lists into markdown bullet points
         def format_list(items: List[str], empty_message: str = "None") -> str:
@@ -529,8 +672,14 @@ def review_pull_request(
             public_signature=public_signature,
         )
 
-        # Post the review
-        pr.create_issue_comment(review_body)
+        # Post the review, once per PR and task round
+        key = idempotency_key(
+            kwargs.get("task_id"),
+            kwargs.get("round_number"),
+            "review",
+            f"{repo_owner}/{repo_name}#{pr_number}",
+        )
+        get_outbox().send(**_comment_write(gh, pr, review_body, key))
         validated = recommendation.upper() == "APPROVE"
         return {
             "success": True,
@@ -551,6 +700,60 @@ def review_pull_request(
         }
 
 
+def post_pull_request_comments(
+    repo_owner: str,
+    repo_name: str,
+    comments: List[Dict[str, Any]],
+    github_token: str = None,
+    **kwargs,
+) -> ToolOutput:
+    """
+    Post comments on several pull requests concurrently.
+
+    Each comment is posted once per task round, however often this is retried.
+
+    Args:
+        repo_owner (str): Owner of the repository
+        repo_name (str): Name of the repository
+        comments (List[Dict[str, Any]]): Comments, each with pr_number and body
+        github_token (str): GitHub token (default: GITHUB_TOKEN)
+
+    Returns:
+        ToolOutput: Standardized tool output with one result per comment
+    """
+    try:
+        gh = _get_github_client(github_token or os.environ.get("GITHUB_TOKEN"))
+        repo_full_name = f"{repo_owner}/{repo_name}"
+        writes = []
+        for comment in comments:
+            pr_number = comment["pr_number"]
+            digest = hashlib.sha256(comment["body"].encode()).hexdigest()[:16]
+            key = idempotency_key(
+                kwargs.get("task_id"),
+                kwargs.get("round_number"),
+                "comment",
+                f"{repo_full_name}#{pr_number}:{digest}",
+            )
+            pr = gh.get_pull(repo_full_name, pr_number)
+            writes.append(_comment_write(gh, pr, comment["body"], key))
+
+        results = get_outbox().send_many(writes)
+        failed = sum(not result["success"] for result in results)
+        return {
+            "success": not failed,
+            "message": f"Posted {len(results) - failed} of {len(results)} comments",
+            "data": {"comments": results},
+        }
+    except Exception as e:
+        error_msg = f"Error posting comments: {str(e)}"
+        print(error_msg)
+        return {
+            "success": False,
+            "message": f"Failed to post comments: {error_msg}",
+            "data": None,
+        }
+
+
 def validate_implementation(
     validated: bool,
     test_results: dict,
@@ -811,6 +1014,7 @@ def create_github_issue(
     title: str,
     description: str,
     github_token: str,
+    **kwargs,
 ) -> ToolOutput:
     """Create a GitHub issue.
 
@@ -825,11 +1029,36 @@ def create_github_issue(
     try:
         gh = _get_github_client(github_token)
         repo = gh.get_repo(repo_full_name)
-        issue = repo.create_issue(title=title, body=description)
+        key = idempotency_key(
+            kwargs.get("task_id"),
+            kwargs.get("round_number"),
+            "issue",
+            f"{repo_full_name}:{title}",
+        )
+
+        def issue_data(issue):
+            return {"issue_url": issue.html_url, "issue_number": issue.number}
+
+        def find_issue():
+            marker = key_marker(key).strip()
+            creator = gh.get_user().login
+            for issue in repo.get_issues(state="all", creator=creator):
+                if marker in (issue.body or ""):
+                    return issue_data(issue)
+            return None
+
+        created = get_outbox().send(
+            key,
+            lambda: issue_data(
+                repo.create_issue(title=title, body=description + key_marker(key))
+            ),
+            find_existing=find_issue if key else None,
+            gateway=gh,
+        )
         return {
             "success": True,
             "message": f"Successfully created issue: {title}",
-            "data": {"issue_url": issue.html_url, "issue_number": issue.number},
+            "data": created,
         }
     except GithubException as e:
         return {
@@ -868,9 +1097,7 @@ def get_pull_request(
     """Get a pull request by number."""
     try:
         gh = _get_github_client(github_token)
-        repo = gh.get_repo(f"{repo_owner}/{repo_name}")
-        pr = repo.get_pull(pr_number)
-        return pr
+        return gh.get_pull(f"{repo_owner}/{repo_name}", pr_number)
     except Exception as e:
         print(f"Failed to get pull request: {str(e)}")
         return None
@@ -891,6 +1118,9 @@ def star_repository(owner: str, repo_name: str, github_token: str, **kwargs) ->
         log_key_value("Starring repository", repo_full_name)
 
         gh = _get_github_client(github_token)
+        deferred = _defer_low_priority(gh, "star_repository")
+        if deferred:
+            return deferred
         repo = gh.get_repo(repo_full_name)
 
         # Star the repository
@@ -932,7 +1162,12 @@ def get_user_starred_repos(username: str = None, **kwargs) -> ToolOutput:
         ToolOutput: Standardized tool output with list of starred repos
     """
     try:
-        gh = _get_github_client()
+        gh = _get_github_client(
+            kwargs.get("github_token") or os.environ.get("GITHUB_TOKEN")
+        )
+        deferred = _defer_low_priority(gh, "get_user_starred_repos")
+        if deferred:
+            return deferred
 
         # Get user object
         user = gh.get_user(username) if username else gh.get_user()
@@ -990,9 +1225,7 @@ def review_pull_request_legacy(
     """
     try:
         gh = _get_github_client(github_token)
-        repo = gh.get_repo(repo_full_name)
-        # Convert pr_number to integer
-        pr = repo.get_pull(int(pr_number))
+        pr = gh.get_pull(repo_full_name, int(pr_number))
 
         # Format lists into markdown bullet points
         def format_list(items: List[str], empty_message: str = "None", **kwargs) -> str:
@@ -1,8 +1,50 @@
 """Module for parsing GitHub PR descriptions."""
 
 import re
+from functools import lru_cache
 from typing import Dict, List, Union, Optional
 
+# Matches every section in one scan. The lookahead consumes nothing, so sections
+# nested inside other sections are found as well.
+SECTION_PATTERN = re.compile(
+    r"(?=<!-- BEGIN_(\w+) -->\s*(.+?)\s*<!-- END_\1 -->)", re.DOTALL
+)
+NAME_PATTERN = re.compile(r"\w+")
+
+# PR bodies whose sections are kept; audit and distribution parse the same
+# bodies several times per round
+SECTION_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=SECTION_CACHE_SIZE)
+def _parse_sections(content: str) -> Dict[str, str]:
+    sections = {}
+    for match in SECTION_PATTERN.finditer(content):
+        # Like re.search, the first occurrence of a section wins
+        sections.setdefault(match.group(1), match.group(2).strip())
+    return sections
+
+
+@lru_cache(maxsize=256)
+def _section_pattern(section: str) -> re.Pattern:
+    return re.compile(
+        f"<!-- BEGIN_{section} -->\\s*(.+?)\\s*<!-- END_{section} -->", re.DOTALL
+    )
+
+
+def parse_sections(content: str) -> Dict[str, str]:
+    """Extract all sections from content in a single pass.
+
+    Results are cached per content, so parsing the same PR body again is free.
+
+    Args:
+        content: The content to parse
+
+    Returns:
+        Dict mapping section names (e.g. 'TODO') to their content
+    """
+    return dict(_parse_sections(content))
+
 
 def extract_section(content: str, section: str) -> Optional[str]:
     """Extract a section from content using markers.
@@ -14,8 +56,9 @@ def extract_section(content: str, section: str) -> Optional[str]:
     Returns:
         The content between the markers, or None if not found
     """
-    pattern = f"<!-- BEGIN_{section} -->\\s*(.+?)\\s*<!-- END_{section} -->"
-    match = re.search(pattern, content, re.DOTALL)
+    if NAME_PATTERN.fullmatch(section):
+        return _parse_sections(content).get(section)
+    match = _section_pattern(section).search(content)
     return match.group(1).strip() if match else None
 
 
@@ -55,12 +98,13 @@ def parse_pr_description(description: str) -> Dict[str, Union[str, List[str]]]:
             - tests: List of tests
     """
     # Extract each section
+    found = parse_sections(description)
     sections = {
-        "todo": extract_section(description, "TODO"),
-        "title": extract_section(description, "TITLE"),
-        "description": extract_section(description, "DESCRIPTION"),
-        "acceptance_criteria": extract_section(description, "ACCEPTANCE_CRITERIA"),
-        "tests": extract_section(description, "TESTS"),
+        "todo": found.get("TODO"),
+        "title": found.get("TITLE"),
+        "description": found.get("DESCRIPTION"),
+        "acceptance_criteria": found.get("ACCEPTANCE_CRITERIA"),
+        "tests": found.get("TESTS"),
     }
 
     # Parse lists for acceptance criteria and tests
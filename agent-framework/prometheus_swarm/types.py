@@ -10,6 +10,8 @@ class ToolDefinition(TypedDict):
     required: List[str]
     final_tool: bool
     function: Callable
+    cacheable: bool  # Read-only tool whose results can be reused within a loop
+    path_args: List[str]  # Arguments holding the paths the tool reads or writes
 
 
 class ToolCall(TypedDict):
@@ -49,6 +51,7 @@ class PhaseResult(TypedDict):
     success: bool
     data: Dict[str, Any]
     error: Optional[str]
+    stop_reason: Optional[str]  # Set if the tool loop budget was exhausted
 
 
 class ToolChoice(TypedDict):
@@ -0,0 +1,124 @@
+"""Budget limits for the tool-use loop."""
+
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class ToolLoopBudget:
+    """Limits for a single handle_tool_response loop.
+
+    A limit of None disables that check.
+
+    Attributes:
+        max_turns: Maximum number of agent responses to process
+        max_seconds: Maximum wall-clock time for the loop
+        max_input_tokens: Maximum input tokens summed over all API calls in the loop
+        max_repeated_calls: Maximum times an identical tool call (same name and
+            arguments) may be made
+    """
+
+    max_turns: Optional[int] = 500
+    max_seconds: Optional[float] = None
+    max_input_tokens: Optional[int] = None
+    max_repeated_calls: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "ToolLoopBudget":
+        """Create a budget from environment variables.
+
+        Reads TOOL_LOOP_MAX_TURNS, TOOL_LOOP_MAX_SECONDS, TOOL_LOOP_MAX_INPUT_TOKENS
+        and TOOL_LOOP_MAX_REPEATED_CALLS. Unset variables keep the defaults.
+        """
+        budget = cls()
+        env_vars = {
+            "max_turns": ("TOOL_LOOP_MAX_TURNS", int),
+            "max_seconds": ("TOOL_LOOP_MAX_SECONDS", float),
+            "max_input_tokens": ("TOOL_LOOP_MAX_INPUT_TOKENS", int),
+            "max_repeated_calls": ("TOOL_LOOP_MAX_REPEATED_CALLS", int),
+        }
+        for field, (var, cast) in env_vars.items():
+            value = os.getenv(var)
+            if value:
+                setattr(budget, field, cast(value))
+        return budget
+
+    def start(self) -> "BudgetTracker":
+        """Start tracking usage against this budget."""
+        return BudgetTracker(self)
+
+
+class BudgetTracker:
+    """Tracks usage of a ToolLoopBudget during one tool loop."""
+
+    def __init__(self, budget: ToolLoopBudget):
+        self.budget = budget
+        self.started_at = time.monotonic()
+        self.turns = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.call_counts = Counter()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since tracking started."""
+        return time.monotonic() - self.started_at
+
+    def record_response(self, response: Dict[str, Any]) -> None:
+        """Record an agent response and its token usage, if reported."""
+        self.turns += 1
+        usage = response.get("usage") or {}
+        self.input_tokens += usage.get("input_tokens") or 0
+        self.output_tokens += usage.get("output_tokens") or 0
+
+    def record_tool_call(self, name: str, arguments: Dict[str, Any]) -> int:
+        """Record a tool call and return how many times it has now been made."""
+        key = (name, json.dumps(arguments, sort_keys=True, default=str))
+        self.call_counts[key] += 1
+        return self.call_counts[key]
+
+    def check(self) -> Optional[str]:
+        """Check the loop-level limits.
+
+        Returns:
+            Optional[str]: Reason the budget is exhausted, or None
+        """
+        budget = self.budget
+        if budget.max_turns is not None and self.turns > budget.max_turns:
+            return f"exceeded {budget.max_turns} turns"
+        if budget.max_seconds is not None and self.elapsed > budget.max_seconds:
+            return f"exceeded {budget.max_seconds}s time limit"
+        if (
+            budget.max_input_tokens is not None
+            and self.input_tokens > budget.max_input_tokens
+        ):
+            return (
+                f"used {self.input_tokens} input tokens "
+                f"(limit {budget.max_input_tokens})"
+            )
+        return None
+
+    def check_tool_call(self, name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Record a tool call and check the repeated-call limit.
+
+        Returns:
+            Optional[str]: Reason the budget is exhausted, or None
+        """
+        count = self.record_tool_call(name, arguments)
+        limit = self.budget.max_repeated_calls
+        if limit is not None and count > limit:
+            return f"{name} called {count} times with identical arguments"
+        return None
+
+    def summary(self) -> Dict[str, Any]:
+        """Usage so far, for logging and results."""
+        return {
+            "turns": self.turns,
+            "elapsed_seconds": round(self.elapsed, 2),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
@@ -0,0 +1,272 @@
+"""Resolving merge conflicts one hunk at a time.
+
+Handing every conflicting file to a single conversation makes the agent read
+all of them, ancestor, ours and theirs, before resolving anything. Instead,
+each conflicting file is rewritten with diff3 markers and split into hunks:
+
+- trivial hunks are resolved locally: identical changes, changes made on one
+  side only, and changes that differ only in whitespace;
+- every other hunk, with a few lines of surrounding code, is passed to a
+  resolver (e.g. a small LLM call), with hunks from all files resolved
+  concurrently;
+- each file is reassembled from its resolved hunks and validated before it is
+  written and staged.
+
+Files that can't be split (binary files, deletions) or whose hunks aren't all
+resolved keep their conflict markers and are returned for the caller to
+resolve some other way.
+"""
+
+import ast
+import contextvars
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from git import GitCommandError, Repo
+
+from prometheus_swarm.utils.logging import log_error, log_key_value
+
+# Lines of unconflicted code shown around a hunk
+CONTEXT_LINES = 20
+
+OURS_MARKER = re.compile(r"^<{7}(?: |$)")
+BASE_MARKER = re.compile(r"^\|{7}(?: |$)")
+SPLIT_MARKER = re.compile(r"^={7}$")
+THEIRS_MARKER = re.compile(r"^>{7}(?: |$)")
+
+
+@dataclass
+class ConflictHunk:
+    """One conflicted region of a file."""
+
+    path: str
+    base: str
+    ours: str
+    theirs: str
+    before: str = ""  # Unconflicted lines just before the hunk
+    after: str = ""  # Unconflicted lines just after it
+    resolution: Optional[str] = None
+
+
+Segment = Union[str, ConflictHunk]
+
+
+def parse_conflicts(
+    path: str, text: str, context_lines: int = CONTEXT_LINES
+) -> List[Segment]:
+    """Split a file with diff3 conflict markers into text and hunks.
+
+    Raises:
+        ValueError: If the markers are unbalanced
+    """
+    segments: List[Segment] = []
+    text_lines: List[str] = []
+    sides: Optional[Dict[str, List[str]]] = None
+    side = None
+
+    for line in text.splitlines(keepends=True):
+        bare = line.rstrip("\r\n")
+        if OURS_MARKER.match(bare):
+            if sides is not None:
+                raise ValueError(f"{path}: nested conflict markers")
+            segments.append("".join(text_lines))
+            text_lines = []
+            sides = {"ours": [], "base": [], "theirs": []}
+            side = "ours"
+        elif sides is None:
+            text_lines.append(line)
+        elif BASE_MARKER.match(bare) and side == "ours":
+            side = "base"
+        elif SPLIT_MARKER.match(bare) and side in ("ours", "base"):
+            side = "theirs"
+        elif THEIRS_MARKER.match(bare) and side == "theirs":
+            segments.append(
+                ConflictHunk(
+                    path=path,
+                    base="".join(sides["base"]),
+                    ours="".join(sides["ours"]),
+                    theirs="".join(sides["theirs"]),
+                )
+            )
+            sides = side = None
+        else:
+            sides[side].append(line)
+
+    if sides is not None:
+        raise ValueError(f"{path}: unterminated conflict")
+    segments.append("".join(text_lines))
+
+    for i, segment in enumerate(segments):
+        if isinstance(segment, ConflictHunk):
+            segment.before = "".join(
+                segments[i - 1].splitlines(keepends=True)[-context_lines:]
+            )
+            segment.after = "".join(
+                segments[i + 1].splitlines(keepends=True)[:context_lines]
+            )
+    return [s for s in segments if s != ""]
+
+
+def _normalize(text: str) -> List[str]:
+    """Lines without trailing or repeated whitespace, keeping indentation."""
+    lines = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        indent = line[: len(line) - len(line.lstrip())]
+        lines.append(indent + " ".join(line.split()))
+    return lines
+
+
+def auto_resolve(hunk: ConflictHunk) -> Optional[str]:
+    """Resolve a hunk whose sides don't really disagree, else return None."""
+    if hunk.ours == hunk.theirs or hunk.theirs == hunk.base:
+        return hunk.ours
+    if hunk.ours == hunk.base:
+        return hunk.theirs
+
+    ours, base, theirs = (
+        _normalize(hunk.ours),
+        _normalize(hunk.base),
+        _normalize(hunk.theirs),
+    )
+    # Keep the side whose change is more than whitespace
+    if ours == theirs or theirs == base:
+        return hunk.ours
+    if ours == base:
+        return hunk.theirs
+    return None
+
+
+def restore_line_ending(hunk: ConflictHunk, resolution: str) -> str:
+    """Add back the final line ending a resolver dropped.
+
+    Without it the resolution would run into the first line after the hunk.
+    """
+    ending = next(
+        (
+            end
+            for end in ("\r\n", "\n")
+            if hunk.ours.endswith(end) or hunk.theirs.endswith(end)
+        ),
+        None,
+    )
+    if ending and resolution and not resolution.endswith("\n"):
+        return resolution + ending
+    return resolution
+
+
+def _validate_python(text: str) -> None:
+    ast.parse(text)
+
+
+VALIDATORS: Dict[str, Callable[[str], Any]] = {
+    ".py": _validate_python,
+    ".json": json.loads,
+}
+
+
+def validate_resolution(path: str, text: str) -> Optional[str]:
+    """Why a resolved file isn't acceptable, or None if it is."""
+    for number, line in enumerate(text.splitlines(), 1):
+        if OURS_MARKER.match(line) or THEIRS_MARKER.match(line):
+            return f"conflict marker left on line {number}"
+    validator = VALIDATORS.get(os.path.splitext(path)[1])
+    if validator is not None:
+        try:
+            validator(text)
+        except (SyntaxError, ValueError) as e:
+            return f"invalid {os.path.splitext(path)[1]} file: {e}"
+    return None
+
+
+def resolve_conflicts(
+    repo_path: str,
+    resolve_hunk: Callable[[ConflictHunk], Optional[str]],
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Resolve a repository's merge conflicts hunk by hunk.
+
+    Args:
+        repo_path: Repository in the middle of a conflicted merge
+        resolve_hunk: Returns the resolved text of a hunk, or None
+        workers: Hunks resolved concurrently (default:
+            CONFLICT_RESOLUTION_WORKERS or 4)
+
+    Returns:
+        Dict with the resolved and unresolved files, and the number of hunks
+        found and of those resolved locally
+    """
+    workers = workers or int(os.getenv("CONFLICT_RESOLUTION_WORKERS") or 4)
+    repo = Repo(repo_path)
+
+    files: Dict[str, List[Segment]] = {}
+    unresolved: List[str] = []
+    for path in sorted(repo.index.unmerged_blobs()):
+        try:
+            # Rewrite the file with the ancestor's lines between the sides
+            repo.git.checkout("--conflict=diff3", "--", path)
+            # newline="" keeps the file's line endings
+            with open(Path(repo.working_dir) / path, newline="") as f:
+                files[path] = parse_conflicts(path, f.read())
+        except (GitCommandError, UnicodeDecodeError, ValueError) as e:
+            log_error(e, f"Can't split conflicts in {path}", include_traceback=False)
+            unresolved.append(path)
+
+    hunks = [
+        s for segments in files.values() for s in segments if not isinstance(s, str)
+    ]
+    for hunk in hunks:
+        hunk.resolution = auto_resolve(hunk)
+    pending = [hunk for hunk in hunks if hunk.resolution is None]
+    log_key_value(
+        "Conflicting hunks",
+        f"{len(hunks)} in {len(files)} files, {len(hunks) - len(pending)} trivial",
+    )
+
+    def resolve(hunk):
+        try:
+            resolution = resolve_hunk(hunk)
+            if resolution is not None:
+                hunk.resolution = restore_line_ending(hunk, resolution)
+        except Exception as e:
+            log_error(e, f"Failed to resolve a hunk in {hunk.path}")
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each hunk is resolved in a copy of the caller's context; database
+            # sessions still aren't shared between threads (see get_db)
+            futures = [
+                executor.submit(contextvars.copy_context().run, resolve, hunk)
+                for hunk in pending
+            ]
+            for future in futures:
+                future.result()
+
+    resolved = []
+    for path, segments in files.items():
+        if any(not isinstance(s, str) and s.resolution is None for s in segments):
+            unresolved.append(path)
+            continue
+        text = "".join(s if isinstance(s, str) else s.resolution for s in segments)
+        error = validate_resolution(path, text)
+        if error:
+            log_key_value(f"Rejected resolution of {path}", error)
+            unresolved.append(path)
+            continue
+        with open(Path(repo.working_dir) / path, "w", newline="") as f:
+            f.write(text)
+        repo.git.add(path)
+        resolved.append(path)
+
+    return {
+        "resolved": resolved,
+        "unresolved": sorted(unresolved),
+        "hunks": len(hunks),
+        "auto_resolved": len(hunks) - len(pending),
+    }
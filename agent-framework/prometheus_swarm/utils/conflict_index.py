@@ -0,0 +1,211 @@
+"""Predicting which PRs will conflict before merging any of them.
+
+Merging PRs one after another only reveals that a late PR conflicts with
+several earlier ones once it is reached, after they have all been merged (and
+their own conflicts resolved). The index instead reads each PR's diff against
+the common base (`git diff -U0`, so no GitHub calls) and records the files and
+base line ranges it touches:
+
+- an inverted index from file to PRs means only PRs sharing a file are
+  compared, rather than every pair;
+- two PRs touching the same file overlap; if their line ranges overlap or are
+  adjacent, git would most likely report a conflict;
+- PRs connected by predicted conflicts form groups: PRs in different groups
+  should merge cleanly with each other;
+- PRs are ordered so those predicted to conflict with the fewest others are
+  merged first.
+
+Ranges are in base coordinates, so predictions assume the PRs branch from the
+same base; changes with no line ranges (binary files, mode changes) count as
+touching the whole file.
+"""
+
+import codecs
+import re
+import sys
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+from git import Repo
+
+Range = Tuple[int, int]  # First and last line, inclusive
+
+WHOLE_FILE: Range = (1, sys.maxsize)
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+
+QUOTED_PATH = re.compile(r'^"((?:[^"\\]|\\.)*)"')
+
+
+def _diff_path(names: str) -> str:
+    """The path in a "diff --git a/<path> b/<path>" header (no renames).
+
+    Git quotes paths with special characters C-style, e.g. "a/t\\303\\251.py".
+    """
+    quoted = QUOTED_PATH.match(names)
+    if quoted:
+        path = codecs.escape_decode(quoted.group(1))[0].decode("utf-8", "replace")
+        return path[2:]
+    # "a/<path> b/<path>", the same path twice
+    return names[2 : 2 + (len(names) - 5) // 2]
+
+
+def parse_diff(diff: str) -> Dict[str, List[Range]]:
+    """Base line ranges changed per file in a `git diff -U0 --no-renames`."""
+    changes: Dict[str, List[Range]] = {}
+    path = None
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            path = _diff_path(line[len("diff --git ") :])
+            changes[path] = []
+            continue
+        match = HUNK_HEADER.match(line)
+        if match and path is not None:
+            start = int(match.group(1))
+            count = int(match.group(2) if match.group(2) is not None else 1)
+            if count:
+                changes[path].append((start, start + count - 1))
+            else:
+                # Lines inserted after line start sit between it and the next
+                changes[path].append((start, start + 1))
+    return {path: ranges or [WHOLE_FILE] for path, ranges in changes.items()}
+
+
+def ranges_overlap(a: Iterable[Range], b: Iterable[Range]) -> bool:
+    """Whether any two ranges overlap or touch, as git would conflict on."""
+    b = list(b)
+    return any(
+        start <= other_end + 1 and other_start <= end + 1
+        for start, end in a
+        for other_start, other_end in b
+    )
+
+
+class ConflictIndex:
+    """Files and line ranges touched by a set of PRs, and how they overlap."""
+
+    def __init__(self, changes: Mapping[Any, Mapping[str, List[Range]]]):
+        """Index PR changes.
+
+        Args:
+            changes: Per PR key, in merge order, the line ranges changed per file
+        """
+        self.changes = dict(changes)
+        self.files: Dict[str, List[Any]] = defaultdict(list)
+        for key, files in self.changes.items():
+            for path in files:
+                self.files[path].append(key)
+
+        # key -> other key -> files both touch, and those where lines overlap
+        self.graph: Dict[Any, Dict[Any, Dict[str, List[str]]]] = {
+            key: {} for key in self.changes
+        }
+        for path, keys in self.files.items():
+            for i, key in enumerate(keys):
+                for other in keys[i + 1 :]:
+                    edge = self.graph[key].setdefault(
+                        other, {"files": [], "lines": []}
+                    )
+                    edge["files"].append(path)
+                    if ranges_overlap(
+                        self.changes[key][path], self.changes[other][path]
+                    ):
+                        edge["lines"].append(path)
+                    self.graph[other][key] = edge
+
+    @classmethod
+    def from_repo(
+        cls, repo: Repo, base: str, refs: Mapping[Any, str]
+    ) -> "ConflictIndex":
+        """Index the changes of refs since they diverged from base.
+
+        Args:
+            repo: Repository containing base and the refs
+            base: Branch the refs will be merged into
+            refs: Ref per PR key, in merge order
+        """
+        return cls(
+            {
+                key: parse_diff(
+                    repo.git.diff(
+                        "-U0", "--no-renames", "--no-color", f"{base}...{ref}"
+                    )
+                )
+                for key, ref in refs.items()
+            }
+        )
+
+    def conflicts(self, key: Any) -> List[Any]:
+        """PRs predicted to conflict with a PR."""
+        return [other for other, edge in self.graph[key].items() if edge["lines"]]
+
+    def groups(self) -> List[List[Any]]:
+        """PRs connected by predicted conflicts, largest group first."""
+        position = {key: i for i, key in enumerate(self.changes)}
+        groups, seen = [], set()
+        for key in self.changes:
+            if key in seen:
+                continue
+            group, stack = [], [key]
+            seen.add(key)
+            while stack:
+                current = stack.pop()
+                group.append(current)
+                for other in self.conflicts(current):
+                    if other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+            groups.append(sorted(group, key=position.get))
+        return sorted(groups, key=len, reverse=True)
+
+    def merge_order(self, last: Iterable[Any] = ()) -> List[Any]:
+        """PR keys, those predicted to conflict with the fewest others first.
+
+        Args:
+            last: Keys to merge after all others, e.g. PRs already known to
+                conflict with the base
+        """
+        last = set(last)
+        position = {key: i for i, key in enumerate(self.changes)}
+        return sorted(
+            self.changes,
+            key=lambda key: (
+                key in last,
+                len(self.conflicts(key)),
+                len(self.graph[key]),
+                position[key],
+            ),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts of PRs, files, overlaps and groups, and the most shared files."""
+        # Both PRs of a pair share the same edge
+        pairs = {
+            id(edge): edge for edges in self.graph.values() for edge in edges.values()
+        }.values()
+        groups = self.groups()
+        touched = Counter({path: len(keys) for path, keys in self.files.items()})
+        return {
+            "prs": len(self.changes),
+            "files": len(self.files),
+            "overlapping_pairs": len(pairs),
+            "predicted_conflicts": sum(1 for edge in pairs if edge["lines"]),
+            "groups": len(groups),
+            "largest_group": len(groups[0]) if groups else 0,
+            "shared_files": [
+                {"path": path, "prs": count}
+                for path, count in touched.most_common(5)
+                if count > 1
+            ],
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The stats, groups and overlap graph, as JSON-serializable data."""
+        return {
+            "stats": self.stats(),
+            "groups": [[str(key) for key in group] for group in self.groups()],
+            "graph": {
+                str(key): {str(other): edge for other, edge in edges.items()}
+                for key, edges in self.graph.items()
+            },
+        }
@@ -1,13 +1,17 @@
 """Distribution list filtering utilities."""
 
-import re
-from typing import Dict, Tuple
-from github import Github
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from prometheus_swarm.utils.github_batch import PullRequestInfo, fetch_pull_requests
+from prometheus_swarm.utils.github_gateway import get_gateway
+from prometheus_swarm.utils.github_budget import github_subsystem
 from prometheus_swarm.workflows.utils import verify_pr_signatures
 from prometheus_swarm.tools.github_operations.parser import extract_section
 
 
+@github_subsystem("distribution")
 def remove_leaders(
     distribution_list: Dict[str, Dict[str, str]],
     repo_owner: str,
@@ -20,7 +24,7 @@ def remove_leaders(
     filtered_distribution_list = {}
 
     # Get source repo and its upstream
-    gh = Github(os.environ.get("GITHUB_TOKEN"))
+    gh = get_gateway()
     target_repo = gh.get_repo(f"{repo_owner}/{repo_name}")
     # Get parent's owner if it exists (repo is a fork), otherwise use repo's owner
     upstream_owner = getattr(target_repo.parent, "owner", target_repo.owner).login
@@ -68,10 +72,73 @@ def remove_leaders(
     return filtered_distribution_list
 
 
+def _check_staking_key(
+    node_data: Dict[str, str], pull_requests: Dict[str, Optional[PullRequestInfo]]
+) -> Optional[str]:
+    """Get a node's PR body if its PR names the node's staking key, else None."""
+    pr_url = node_data["prUrl"]
+    staking_key = node_data["stakingKey"]
+
+    print(f"\nValidating PR: {pr_url}")
+    print(f"Expected staking key: {staking_key}")
+
+    # Parse PR URL and get PR
+    match = re.match(r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)", pr_url)
+    if not match:
+        print(f"Invalid PR URL format: {pr_url}")
+        return None
+
+    pr_number = match.group(3)
+    pr = pull_requests.get(pr_url)
+    if pr is None:
+        print(f"Could not fetch PR: {pr_url}")
+        return None
+
+    # First extract the actual staking key from the PR
+    staking_section = extract_section(pr.body, "STAKING_KEY")
+    if not staking_section:
+        print(f"No staking key section found in PR #{pr_number}")
+        return None
+
+    try:
+        pr_staking_key = staking_section.split(":")[0].strip()
+        print(f"Found staking key in PR: {pr_staking_key}")
+    except Exception as e:
+        print(f"Error parsing staking key section: {str(e)}")
+        return None
+
+    # Verify the PR's staking key matches the one in distribution list
+    if pr_staking_key != staking_key:
+        print(f"Staking key mismatch - PR: {pr_staking_key}, Expected: {staking_key}")
+        return None
+
+    return pr.body
+
+
+def _verify_node(node_data: Dict[str, str], pr_body: str) -> bool:
+    """Verify the signature in a node's PR.
+
+    May run in a worker thread; PyNaCl releases the GIL while verifying.
+    """
+    try:
+        return verify_pr_signatures(
+            pr_body,
+            node_data["taskId"],
+            node_data["roundNumber"],
+            expected_staking_key=node_data["stakingKey"],
+            expected_action="task",
+        )
+    except Exception as e:
+        print(f"Error verifying signature for {node_data.get('stakingKey')}: {str(e)}")
+        return False
+
+
+@github_subsystem("distribution")
 def validate_distribution_list(
     distribution_list: Dict[str, Dict[str, str]],
     repo_owner: str,
     repo_name: str,
+    workers: Optional[int] = None,
 ) -> Tuple[Dict[str, Dict[str, str]], str]:
     """Validate and filter distribution list.
 
@@ -79,6 +146,8 @@ def validate_distribution_list(
         distribution_list: Raw distribution list from request
         repo_owner: Owner of the repository
         repo_name: Name of the repository
+        workers: Threads verifying signatures (default: SIGNATURE_VERIFY_WORKERS
+            or the number of CPUs). With one, signatures are verified in turn.
 
     Returns:
         tuple: (filtered_list, error_message)
@@ -101,72 +170,43 @@ def validate_distribution_list(
         if not filtered_list:
             return None, "No eligible worker PRs after filtering leaders"
 
-        # Now validate signatures in each PR
-        gh = Github(os.environ.get("GITHUB_TOKEN"))
-        validated_list = {}
+        # Stage 1: fetch all PRs together (network)
+        pull_requests = fetch_pull_requests(
+            node_data.get("prUrl") for node_data in filtered_list.values()
+        )
 
+        # Stage 2: check each PR names the expected staking key
+        candidates = []
         for node_key, node_data in filtered_list.items():
             try:
-                pr_url = node_data["prUrl"]
-                task_id = node_data["taskId"]
-                round_number = node_data["roundNumber"]
-                staking_key = node_data["stakingKey"]
-
-                print(f"\nValidating PR: {pr_url}")
-                print(f"Expected staking key: {staking_key}")
-
-                # Parse PR URL and get PR
-                match = re.match(
-                    r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)", pr_url
-                )
-                if not match:
-                    print(f"Invalid PR URL format: {pr_url}")
-                    continue
-
-                pr_owner, pr_repo, pr_number = match.groups()
-                repo = gh.get_repo(f"{pr_owner}/{pr_repo}")
-                pr = repo.get_pull(int(pr_number))
-
-                # First extract the actual staking key from the PR
-                staking_section = extract_section(pr.body, "STAKING_KEY")
-                if not staking_section:
-                    print(f"No staking key section found in PR #{pr_number}")
-                    continue
-
-                try:
-                    pr_staking_key = staking_section.split(":")[0].strip()
-                    print(f"Found staking key in PR: {pr_staking_key}")
-                except Exception as e:
-                    print(f"Error parsing staking key section: {str(e)}")
-                    continue
-
-                # Verify the PR's staking key matches the one in distribution list
-                if pr_staking_key != staking_key:
-                    print(
-                        f"Staking key mismatch - PR: {pr_staking_key}, Expected: {staking_key}"
-                    )
-                    continue
-
-                # Now verify the signature
-                print(f"Verifying signature for key: {staking_key}")
-                is_valid = verify_pr_signatures(
-                    pr.body,
-                    task_id,
-                    round_number,
-                    expected_staking_key=staking_key,
-                    expected_action="task",
-                )
-
-                if is_valid:
-                    print(f"✓ Valid signature found for {staking_key}")
-                    validated_list[staking_key] = node_data
-                else:
-                    print(f"✗ Invalid signature for {staking_key}")
-
+                pr_body = _check_staking_key(node_data, pull_requests)
+                if pr_body is not None:
+                    candidates.append((node_data, pr_body))
             except Exception as e:
                 print(f"Error validating PR for {node_key}: {str(e)}")
                 continue
 
+        # Stage 3: verify the signatures (CPU), on a pool if there are CPUs to
+        # spare; a pool on one CPU is slower (see tests/benchmark_distribution.py)
+        print(f"\nVerifying {len(candidates)} signatures...")
+        workers = workers or int(
+            os.getenv("SIGNATURE_VERIFY_WORKERS") or os.cpu_count() or 1
+        )
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(lambda c: _verify_node(*c), candidates))
+        else:
+            results = [_verify_node(*candidate) for candidate in candidates]
+
+        validated_list = {}
+        for (node_data, _), is_valid in zip(candidates, results):
+            staking_key = node_data["stakingKey"]
+            if is_valid:
+                print(f"✓ Valid signature found for {staking_key}")
+                validated_list[staking_key] = node_data
+            else:
+                print(f"✗ Invalid signature for {staking_key}")
+
         if not validated_list:
             return None, "No PRs with valid signatures found"
 
@@ -0,0 +1,211 @@
+"""Fetch many pull requests at once.
+
+Validating a distribution list or an audit needs the body and author of one PR
+per submitter. Instead of two REST calls per PR, PRs are resolved in batches
+through GraphQL, one aliased repository/pullRequest lookup per PR. If GraphQL
+isn't available (e.g. no token) or a batch fails, the PRs it couldn't resolve
+are fetched over REST, concurrently.
+"""
+
+import contextvars
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from prometheus_swarm.utils.github_gateway import GitHubGateway, get_gateway
+from prometheus_swarm.utils.logging import log_error, log_key_value
+
+PR_URL_PATTERN = re.compile(r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)")
+
+# PRs per GraphQL query
+GRAPHQL_BATCH_SIZE = 50
+
+PR_FIELDS = """
+fragment pr on PullRequest {
+  number
+  body
+  state
+  merged
+  author { login }
+  headRefName
+  baseRefName
+  headRepository { nameWithOwner }
+  baseRepository { nameWithOwner }
+}
+"""
+
+
+@dataclass
+class PullRequestInfo:
+    """The parts of a pull request needed to validate a submission."""
+
+    url: str
+    number: int
+    body: str
+    author: Optional[str]
+    state: str
+    merged: bool
+    head_ref: str
+    head_repo: Optional[str]
+    base_ref: str
+    base_repo: Optional[str]
+
+
+def parse_pr_url(url: str) -> Optional[Tuple[str, str, int]]:
+    """Split a PR URL into (owner, repo, number), or None if it isn't one."""
+    match = PR_URL_PATTERN.match(url.strip()) if isinstance(url, str) else None
+    if not match:
+        return None
+    owner, repo, number = match.groups()
+    return owner, repo, int(number)
+
+
+def _from_graphql(url: str, node: Dict[str, Any]) -> PullRequestInfo:
+    state = node["state"].lower()
+    return PullRequestInfo(
+        url=url,
+        number=node["number"],
+        body=node.get("body") or "",
+        author=(node.get("author") or {}).get("login"),
+        state="closed" if state == "merged" else state,
+        merged=bool(node.get("merged")),
+        head_ref=node.get("headRefName"),
+        head_repo=(node.get("headRepository") or {}).get("nameWithOwner"),
+        base_ref=node.get("baseRefName"),
+        base_repo=(node.get("baseRepository") or {}).get("nameWithOwner"),
+    )
+
+
+def _from_rest(url: str, pr) -> PullRequestInfo:
+    return PullRequestInfo(
+        url=url,
+        number=pr.number,
+        body=pr.body or "",
+        author=pr.user.login if pr.user else None,
+        state=pr.state,
+        merged=bool(pr.merged),
+        head_ref=pr.head.ref,
+        head_repo=pr.head.repo.full_name if pr.head.repo else None,
+        base_ref=pr.base.ref,
+        base_repo=pr.base.repo.full_name if pr.base.repo else None,
+    )
+
+
+def _graphql_batch(
+    gh: GitHubGateway, batch: List[Tuple[str, Tuple[str, str, int]]]
+) -> Dict[str, PullRequestInfo]:
+    """Resolve one batch of PRs with a single GraphQL query.
+
+    PRs that don't exist or can't be read are left out of the result.
+    """
+    declarations = []
+    lookups = []
+    variables: Dict[str, Any] = {}
+    for i, (_, (owner, repo, number)) in enumerate(batch):
+        declarations.append(f"$o{i}: String!, $r{i}: String!, $n{i}: Int!")
+        lookups.append(
+            f"pr{i}: repository(owner: $o{i}, name: $r{i}) "
+            f"{{ pullRequest(number: $n{i}) {{ ...pr }} }}"
+        )
+        variables.update({f"o{i}": owner, f"r{i}": repo, f"n{i}": number})
+    query = (
+        f"query({', '.join(declarations)}) {{\n  "
+        + "\n  ".join(lookups)
+        + "\n}\n"
+        + PR_FIELDS
+    )
+
+    gh.throttle()
+    requester = gh.client.requester
+    # Partial results come back with errors for the missing PRs, which
+    # requester.graphql_query would turn into an exception for the whole batch
+    _, response = requester.requestJsonAndCheck(
+        "POST", requester.graphql_url, input={"query": query, "variables": variables}
+    )
+    gh.observe()
+    data = response.get("data")
+    if data is None:
+        raise ValueError(f"GraphQL query failed: {response.get('errors')}")
+
+    results = {}
+    for i, (url, _) in enumerate(batch):
+        node = (data.get(f"pr{i}") or {}).get("pullRequest")
+        if node:
+            results[url] = _from_graphql(url, node)
+    return results
+
+
+def _rest_fetch(
+    gh: GitHubGateway, targets: List[Tuple[str, Tuple[str, str, int]]], workers: int
+) -> Dict[str, PullRequestInfo]:
+    def fetch(target):
+        url, (owner, repo, number) = target
+        try:
+            return url, _from_rest(url, gh.get_pull(f"{owner}/{repo}", number))
+        except Exception as e:
+            log_error(e, f"Failed to fetch PR {url}")
+            return url, None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Each task runs in a copy of the caller's context, keeping its subsystem
+        futures = [
+            executor.submit(contextvars.copy_context().run, fetch, target)
+            for target in targets
+        ]
+        results = dict(future.result() for future in futures)
+    return {url: info for url, info in results.items() if info is not None}
+
+
+def fetch_pull_requests(
+    urls: Iterable[str],
+    gateway: Optional[GitHubGateway] = None,
+    use_graphql: bool = True,
+    workers: Optional[int] = None,
+) -> Dict[str, Optional[PullRequestInfo]]:
+    """Fetch pull requests by URL.
+
+    Args:
+        urls: PR URLs (https://github.com/owner/repo/pull/N); duplicates and
+            malformed URLs are allowed
+        gateway: GitHub gateway (default: the shared one for GITHUB_TOKEN)
+        use_graphql: Try batched GraphQL queries before REST
+        workers: Concurrent REST requests (default: GITHUB_FETCH_WORKERS or 8)
+
+    Returns:
+        Dict[str, Optional[PullRequestInfo]]: Info per URL as given, None for
+        URLs that are malformed or couldn't be fetched
+    """
+    gh = gateway or get_gateway()
+    workers = workers or int(os.getenv("GITHUB_FETCH_WORKERS", "8"))
+    results: Dict[str, Optional[PullRequestInfo]] = {}
+    targets = []
+    for url in dict.fromkeys(urls):
+        parsed = parse_pr_url(url)
+        results[url] = None
+        if parsed:
+            targets.append((url, parsed))
+
+    remaining = targets
+    # GraphQL needs authentication
+    if use_graphql and targets and gh.client.requester.auth is not None:
+        remaining = []
+        for start in range(0, len(targets), GRAPHQL_BATCH_SIZE):
+            batch = targets[start : start + GRAPHQL_BATCH_SIZE]
+            try:
+                found = _graphql_batch(gh, batch)
+            except Exception as e:
+                log_error(e, "GraphQL PR batch failed, falling back to REST")
+                found = {}
+            results.update(found)
+            # Missing PRs are retried over REST, which reports why they failed
+            remaining.extend(target for target in batch if target[0] not in found)
+
+    if remaining:
+        results.update(_rest_fetch(gh, remaining, workers))
+    log_key_value(
+        "Fetched pull requests",
+        f"{sum(info is not None for info in results.values())}/{len(results)}",
+    )
+    return results
@@ -0,0 +1,151 @@
+"""Sharing the GitHub rate limit between subsystems.
+
+The budget is fed by the X-RateLimit-* headers of responses: each decrease in
+the remaining count is charged to the subsystem active at the time, set with
+github_subsystem (usable as a context manager or decorator). Each subsystem has
+a share of the hourly limit; once a subsystem has used its share and the pool
+is running low, its requests are slowed so the rest is left for others.
+
+Audit requests are critical and are never held back by the budget, only by the
+gateway's general throttling near the limit. Low-priority calls (e.g. starring
+repositories) should check allow(LOW) and be deferred while the pool is low.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+CRITICAL = "critical"
+NORMAL = "normal"
+LOW = "low"
+
+# Share of the hourly limit for each subsystem
+DEFAULT_SHARES = {"audit": 0.5, "task": 0.3, "distribution": 0.2}
+SUBSYSTEM_PRIORITY = {"audit": CRITICAL}
+
+_subsystem: ContextVar[Optional[str]] = ContextVar("github_subsystem", default=None)
+
+
+@contextmanager
+def github_subsystem(name: str):
+    """Charge GitHub requests made within the block to a subsystem."""
+    token = _subsystem.set(name)
+    try:
+        yield
+    finally:
+        _subsystem.reset(token)
+
+
+def current_subsystem() -> Optional[str]:
+    return _subsystem.get()
+
+
+def _parse_shares(value: Optional[str]) -> Dict[str, float]:
+    """Parse "audit=0.5,task=0.3" into a dict."""
+    if not value:
+        return dict(DEFAULT_SHARES)
+    shares = {}
+    for item in value.split(","):
+        name, _, share = item.partition("=")
+        if name.strip() and share.strip():
+            shares[name.strip()] = float(share)
+    return shares
+
+
+class GitHubBudget:
+    """Tracks rate limit use per subsystem within the current limit window."""
+
+    def __init__(
+        self,
+        shares: Optional[Dict[str, float]] = None,
+        low_water: float = 0.25,
+    ):
+        """Create a budget.
+
+        Args:
+            shares: Fraction of the limit each subsystem may use freely
+            low_water: Fraction of the limit below which low-priority calls are
+                deferred and subsystems over their share are slowed down
+        """
+        self.shares = shares if shares is not None else dict(DEFAULT_SHARES)
+        self.low_water = low_water
+        self.remaining = -1
+        self.limit = -1
+        self.reset = 0
+        self.used: Dict[str, int] = {}
+        self.deferred: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "GitHubBudget":
+        return cls(
+            shares=_parse_shares(os.getenv("GITHUB_BUDGET_SHARES")),
+            low_water=float(os.getenv("GITHUB_BUDGET_LOW_WATER", "0.25")),
+        )
+
+    def observe(self, remaining: int, limit: int, reset: int) -> None:
+        """Record rate limit headers, charging used requests to the subsystem."""
+        if limit < 0:
+            return
+        subsystem = current_subsystem() or "other"
+        with self._lock:
+            if reset != self.reset:
+                # New window (or first response): start counting afresh
+                self.used = {}
+                self.deferred = {}
+                used = 0
+            else:
+                used = max(0, self.remaining - remaining)
+            if used:
+                self.used[subsystem] = self.used.get(subsystem, 0) + used
+            self.remaining, self.limit, self.reset = remaining, limit, reset
+
+    def quota(self, subsystem: Optional[str]) -> Optional[int]:
+        share = self.shares.get(subsystem or "")
+        if share is None or self.limit < 0:
+            return None
+        return int(share * self.limit)
+
+    def priority(self, subsystem: Optional[str] = None) -> str:
+        subsystem = subsystem or current_subsystem()
+        return SUBSYSTEM_PRIORITY.get(subsystem, NORMAL)
+
+    def is_low(self) -> bool:
+        return self.limit >= 0 and self.remaining < self.low_water * self.limit
+
+    def allow(self, priority: Optional[str] = None, subsystem: str = None) -> bool:
+        """Whether a request should go ahead now.
+
+        Args:
+            priority: CRITICAL, NORMAL or LOW (default: the subsystem's)
+            subsystem: Defaults to the current one
+        """
+        subsystem = subsystem or current_subsystem()
+        priority = priority or self.priority(subsystem)
+        if priority == CRITICAL or not self.is_low():
+            return True
+        if priority == LOW:
+            return False
+        quota = self.quota(subsystem)
+        return quota is None or self.used.get(subsystem, 0) < quota
+
+    def defer(self, name: str) -> float:
+        """Count a deferred call. Returns seconds until the limit resets."""
+        with self._lock:
+            self.deferred[name] = self.deferred.get(name, 0) + 1
+        return max(0.0, self.reset - time.time())
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "remaining": self.remaining,
+                "limit": self.limit,
+                "reset": self.reset,
+                "low": self.is_low(),
+                "used": dict(self.used),
+                "quotas": {name: self.quota(name) for name in self.shares},
+                "deferred": dict(self.deferred),
+            }
@@ -0,0 +1,206 @@
+"""Shared, cached access to the GitHub API.
+
+A gateway holds one Github client per token, so connections are pooled and
+reused instead of each call opening its own. Repositories, pull requests and
+users are cached:
+
+- within GITHUB_CACHE_TTL seconds of being fetched, the cached object is used;
+- after that it is revalidated with a conditional request (If-None-Match with
+  the object's ETag), which GitHub answers with 304 Not Modified, not counted
+  against the rate limit, when nothing changed.
+
+Lookups also slow down as the rate limit runs low, spreading the remaining
+requests until the reset time reported in the X-RateLimit-* headers. The same
+headers feed the gateway's budget (see github_budget), which slows subsystems
+that have used up their share sooner.
+
+Everything else is passed through to the underlying Github client, so a gateway
+can be used wherever a client was.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from github import Auth, Github, GithubException
+from github.NamedUser import NamedUser
+from github.PullRequest import PullRequest
+from github.Repository import Repository
+
+from prometheus_swarm.utils.github_budget import GitHubBudget
+from prometheus_swarm.utils.logging import log_key_value
+
+DEFAULT_BASE_URL = "https://api.github.com"
+# Longest single pause when throttling
+MAX_THROTTLE_SECONDS = 60
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+class GitHubGateway:
+    """A pooled GitHub client with cached, conditionally revalidated lookups."""
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = DEFAULT_BASE_URL,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        rate_limit_reserve: Optional[int] = None,
+        budget: Optional[GitHubBudget] = None,
+        **client_options,
+    ):
+        """Create a gateway.
+
+        Args:
+            token: GitHub token (None for unauthenticated access)
+            base_url: API URL
+            ttl: Seconds a cached object is used without revalidation
+            max_entries: Objects kept in the cache
+            rate_limit_reserve: Remaining requests below which lookups are spread
+                out until the rate limit resets
+            budget: Rate limit budget (default: GitHubBudget.from_env())
+            client_options: Passed to Github()
+        """
+        client_options.setdefault("pool_size", _env_int("GITHUB_POOL_SIZE", 10))
+        self.client = Github(
+            auth=Auth.Token(token) if token else None,
+            base_url=base_url,
+            **client_options,
+        )
+        self.ttl = ttl if ttl is not None else _env_int("GITHUB_CACHE_TTL", 60)
+        self.max_entries = max_entries or _env_int("GITHUB_CACHE_SIZE", 256)
+        self.rate_limit_reserve = (
+            rate_limit_reserve
+            if rate_limit_reserve is not None
+            else _env_int("GITHUB_RATE_LIMIT_RESERVE", 100)
+        )
+        self.budget = budget or GitHubBudget.from_env()
+        self._cache: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {"hits": 0, "revalidated": 0, "fetched": 0}
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes the gateway doesn't define
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    # Rate limiting
+
+    def rate_limit(self) -> Dict[str, int]:
+        """Rate limit state from the last response's headers, without a request.
+
+        Values are -1 (remaining, limit) or 0 (reset) until a response is seen.
+        """
+        requester = self.client.requester
+        remaining, limit = requester.rate_limiting
+        return {
+            "remaining": remaining,
+            "limit": limit,
+            "reset": requester.rate_limiting_resettime,
+        }
+
+    def observe(self) -> Dict[str, int]:
+        """Feed the latest rate limit headers to the budget."""
+        state = self.rate_limit()
+        self.budget.observe(**state)
+        return state
+
+    def throttle_delay(self) -> float:
+        """Seconds to wait before the next request, given the rate limit."""
+        state = self.observe()
+        remaining = state["remaining"]
+        if state["limit"] < 0:
+            return 0.0
+        if remaining > self.rate_limit_reserve and self.budget.allow():
+            return 0.0
+        until_reset = max(0.0, state["reset"] - time.time())
+        # Spread what's left evenly over the time until the reset
+        return min(MAX_THROTTLE_SECONDS, until_reset / max(remaining, 1))
+
+    def throttle(self) -> None:
+        delay = self.throttle_delay()
+        if delay > 0:
+            log_key_value("GitHub rate limit low, waiting seconds", round(delay, 1))
+            time.sleep(delay)
+
+    # Cache
+
+    def _cached(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+        if entry is not None:
+            obj, fetched_at = entry
+            if time.monotonic() - fetched_at < self.ttl:
+                self.stats["hits"] += 1
+                return obj
+            self.throttle()
+            try:
+                # Conditional request; 304 if unchanged
+                obj.update()
+            except GithubException:
+                self.invalidate(key)
+                raise
+            self.stats["revalidated"] += 1
+        else:
+            self.throttle()
+            obj = fetch()
+            self.stats["fetched"] += 1
+        self.observe()
+
+        with self._lock:
+            self._cache[key] = (obj, time.monotonic())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return obj
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Forget a cached object (or everything), e.g. after changing it."""
+        with self._lock:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+    def get_repo(self, full_name: str) -> Repository:
+        return self._cached(
+            ("repo", full_name.lower()), lambda: self.client.get_repo(full_name)
+        )
+
+    def get_pull(self, full_name: str, number: int) -> PullRequest:
+        return self._cached(
+            ("pull", full_name.lower(), int(number)),
+            lambda: self.get_repo(full_name).get_pull(int(number)),
+        )
+
+    def get_user(self, login: Optional[str] = None) -> NamedUser:
+        if login is None:
+            return self._cached(("user", None), self.client.get_user)
+        return self._cached(
+            ("user", login.lower()), lambda: self.client.get_user(login)
+        )
+
+    def close(self) -> None:
+        self.client.close()
+
+
+_gateways: Dict[Optional[str], GitHubGateway] = {}
+_gateways_lock = threading.Lock()
+
+
+def get_gateway(token: Optional[str] = None) -> GitHubGateway:
+    """The shared gateway for a token (default: GITHUB_TOKEN)."""
+    token = token or os.environ.get("GITHUB_TOKEN") or None
+    with _gateways_lock:
+        gateway = _gateways.get(token)
+        if gateway is None:
+            gateway = _gateways[token] = GitHubGateway(token)
+        return gateway
@@ -0,0 +1,261 @@
+"""Idempotent GitHub writes.
+
+Creating a pull request, comment or issue isn't safe to retry blindly: if a
+request times out after GitHub handled it, sending it again creates a duplicate
+that audits then have to deal with. Writes therefore go through an outbox, a
+small SQLite table of idempotency keys built from (task_id, round_number, kind,
+target):
+
+- before a write, its key is recorded as pending;
+- once it succeeds, the result (e.g. the PR URL) is stored with the key, and a
+  later write with the same key returns it without calling GitHub;
+- a write is retried with exponential backoff on transient errors, and before
+  each retry (or when an earlier process left the key pending) the caller's
+  find_existing check looks for what a lost response may have created.
+
+Comments and issues carry their key in a hidden marker so they can be found
+again. Writes without a task ID have no key and are only retried.
+"""
+
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import requests
+from github import GithubException
+
+from prometheus_swarm.utils.github_gateway import GitHubGateway
+from prometheus_swarm.utils.logging import log_error, log_key_value
+
+PENDING = "pending"
+DONE = "done"
+
+DEFAULT_PATH = os.path.join(
+    "~", ".local", "share", "prometheus-swarm", "github_outbox.db"
+)
+
+# GitHub statuses worth retrying; 403 only for secondary rate limits
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+
+def idempotency_key(
+    task_id: Optional[str], round_number: Any, kind: str, target: str = ""
+) -> Optional[str]:
+    """Key for a write, or None if there is no task to tie it to."""
+    if not task_id:
+        return None
+    return f"{task_id}:{round_number}:{kind}:{target}"
+
+
+def key_marker(key: Optional[str]) -> str:
+    """Hidden marker identifying a comment or issue body by its key."""
+    return f"\n\n<!-- IDEMPOTENCY_KEY {key} -->" if key else ""
+
+
+def outbox_path(path: Optional[str] = None) -> str:
+    """Absolute path of an outbox file (default: GITHUB_OUTBOX_PATH).
+
+    Resolved once, so a workflow changing directory into its clone doesn't
+    move the outbox (or get it committed).
+    """
+    path = path or os.getenv("GITHUB_OUTBOX_PATH") or DEFAULT_PATH
+    return os.path.abspath(os.path.expanduser(path))
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, GithubException):
+        if error.status in TRANSIENT_STATUSES:
+            return True
+        message = str(error.data).lower()
+        return error.status == 403 and "secondary rate limit" in message
+    return False
+
+
+class GitHubOutbox:
+    """Records GitHub writes by idempotency key and retries them safely."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_attempts: int = 4,
+        base_delay: float = 2.0,
+        max_delay: float = 30.0,
+    ):
+        """Create an outbox.
+
+        Args:
+            path: SQLite file (default: GITHUB_OUTBOX_PATH, or github_outbox.db
+                under ~/.local/share/prometheus-swarm)
+            max_attempts: Attempts per write, including the first
+            base_delay: Seconds before the first retry, doubled for each retry
+            max_delay: Longest wait between attempts
+        """
+        self.path = outbox_path(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "key TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT, "
+                "attempts INTEGER NOT NULL DEFAULT 0, updated REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per call, so worker threads never share one
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The stored entry for a key: status, result and attempts."""
+        with self._lock, self._connect() as db:
+            row = db.execute(
+                "SELECT status, result, attempts FROM outbox WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, result, attempts = row
+        return {
+            "status": status,
+            "result": json.loads(result) if result else None,
+            "attempts": attempts,
+        }
+
+    def _save(self, key: str, status: str, result: Any = None) -> None:
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT INTO outbox (key, status, result, attempts, updated) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "status = excluded.status, result = excluded.result, "
+                "attempts = outbox.attempts + excluded.attempts, "
+                "updated = excluded.updated",
+                (
+                    key,
+                    status,
+                    json.dumps(result) if result is not None else None,
+                    1 if status == PENDING else 0,
+                    time.time(),
+                ),
+            )
+
+    def send(
+        self,
+        key: Optional[str],
+        write: Callable[[], Dict[str, Any]],
+        find_existing: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+        check_first: bool = False,
+        gateway: Optional[GitHubGateway] = None,
+    ) -> Dict[str, Any]:
+        """Perform a write at most once per key.
+
+        Args:
+            key: Idempotency key (None to only retry)
+            write: Makes the write and returns its JSON-serializable result
+            find_existing: Returns the result of an earlier write that already
+                reached GitHub, or None
+            check_first: Call find_existing before the first attempt too
+            gateway: Throttles attempts while the rate limit is low
+
+        Returns:
+            The result of the write, or of the earlier one it duplicates
+
+        Raises:
+            The write's exception once it isn't transient or attempts run out
+        """
+        if key:
+            entry = self.get(key)
+            if entry and entry["status"] == DONE:
+                log_key_value("Skipping GitHub write already made", key)
+                return entry["result"]
+            # A pending key means an earlier attempt may have gone through
+            check_first = check_first or entry is not None
+
+        for attempt in range(1, self.max_attempts + 1):
+            if find_existing and (check_first or attempt > 1):
+                existing = find_existing()
+                if existing is not None:
+                    log_key_value("Found earlier GitHub write", key or existing)
+                    if key:
+                        self._save(key, DONE, existing)
+                    return existing
+            if key:
+                self._save(key, PENDING)
+            if gateway is not None:
+                gateway.throttle()
+            try:
+                result = write()
+                break
+            except Exception as e:
+                if attempt == self.max_attempts or not is_transient(e):
+                    raise
+                delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+                log_error(
+                    e,
+                    f"GitHub write failed (attempt {attempt}/{self.max_attempts}), "
+                    f"retrying in {delay}s",
+                    include_traceback=False,
+                )
+                time.sleep(delay)
+
+        if key:
+            self._save(key, DONE, result)
+        return result
+
+    def send_many(
+        self, writes: List[Dict[str, Any]], workers: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Perform several writes concurrently.
+
+        Args:
+            writes: Keyword arguments for send(), one dict per write
+            workers: Concurrent writes (default: GITHUB_WRITE_WORKERS or 4)
+
+        Returns:
+            One result per write, in order: {"success": True, "data": result}
+            or {"success": False, "error": message}
+        """
+        workers = workers or int(os.getenv("GITHUB_WRITE_WORKERS") or 4)
+
+        def send(write):
+            try:
+                return {"success": True, "data": self.send(**write)}
+            except Exception as e:
+                log_error(e, f"GitHub write {write.get('key')} failed")
+                return {"success": False, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Each write runs in a copy of the caller's context, keeping its subsystem
+            futures = [
+                executor.submit(contextvars.copy_context().run, send, write)
+                for write in writes
+            ]
+            return [future.result() for future in futures]
+
+
+_outboxes: Dict[str, GitHubOutbox] = {}
+_outboxes_lock = threading.Lock()
+
+
+def get_outbox(path: Optional[str] = None) -> GitHubOutbox:
+    """The shared outbox for a path (default: GITHUB_OUTBOX_PATH)."""
+    path = outbox_path(path)
+    with _outboxes_lock:
+        outbox = _outboxes.get(path)
+        if outbox is None:
+            outbox = _outboxes[path] = GitHubOutbox(path)
+        return outbox
@@ -0,0 +1,168 @@
+"""Merging many branches into one without touching the working tree.
+
+Consolidating PRs one `git merge` at a time checks out, merges, commits and
+pushes for every PR, and learns that a PR conflicts only after starting to merge
+it. The engine instead uses `git merge-tree --write-tree` (git 2.38+), which
+merges two commits entirely in the object database:
+
+- every candidate is checked against the target branch up front, and the lines
+  it changes are compared with the other candidates' (see conflict_index);
+- candidates are ordered so those predicted to conflict with the fewest others
+  go first, leaving PRs that touch the same code as many others for last;
+- each clean merge becomes a merge commit (target and candidate as parents) via
+  `git commit-tree`, and the branch is updated once at the end.
+
+Candidates that conflict with the merged result are returned for the caller to
+merge in the working tree and resolve.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence, Tuple
+
+from git import Repo
+
+from prometheus_swarm.utils.conflict_index import ConflictIndex
+from prometheus_swarm.utils.logging import log_key_value
+
+
+@dataclass
+class MergeCandidate:
+    """A commit to merge, with the message for its merge commit."""
+
+    ref: str
+    message: str
+    key: Any = None  # The caller's identifier, e.g. a PR URL
+
+
+@dataclass
+class MergeCheck:
+    """Result of merging a candidate into a commit in memory."""
+
+    candidate: MergeCandidate
+    clean: bool
+    tree: Optional[str] = None
+    conflicts: List[str] = field(default_factory=list)
+
+
+@dataclass
+class MergeResult:
+    merged: List[MergeCandidate]
+    conflicting: List[MergeCandidate]
+    head: str  # The branch's new tip
+    index: Optional[ConflictIndex] = None  # Overlaps between candidates, if ordered
+
+
+def _key(candidate: MergeCandidate) -> Any:
+    return candidate.key if candidate.key is not None else candidate.ref
+
+
+class MergeEngine:
+    """Merges candidates into a branch of a local repository."""
+
+    def __init__(self, repo_path: str):
+        self.repo = Repo(repo_path)
+
+    def _rev(self, ref: str) -> str:
+        return self.repo.git.rev_parse("--verify", f"{ref}^{{commit}}")
+
+    def check(self, base: str, candidate: MergeCandidate) -> MergeCheck:
+        """Merge a candidate into base in memory, without writing any ref.
+
+        Raises:
+            RuntimeError: If git can't attempt the merge (e.g. unknown ref)
+        """
+        status, output, error = self.repo.git.merge_tree(
+            "--write-tree",
+            "--name-only",
+            "--no-messages",
+            base,
+            candidate.ref,
+            with_extended_output=True,
+            with_exceptions=False,
+        )
+        # 0: clean, 1: conflicts, with the merged tree printed first; git also
+        # exits with 1 when it can't attempt the merge, but prints no tree
+        if status not in (0, 1) or not output:
+            raise RuntimeError(
+                f"git merge-tree {base} {candidate.ref} failed: {error.strip()}"
+            )
+        lines = output.splitlines()
+        return MergeCheck(
+            candidate=candidate,
+            clean=status == 0,
+            tree=lines[0] if lines else None,
+            conflicts=[line for line in lines[1:] if line],
+        )
+
+    def plan(
+        self, base: str, candidates: Sequence[MergeCandidate]
+    ) -> Tuple[List[MergeCandidate], ConflictIndex]:
+        """Order candidates to merge those predicted to conflict least first.
+
+        Candidates that already conflict with base go last.
+
+        Returns:
+            Tuple of the ordered candidates and the index of their changes,
+            keyed by candidate key (or ref)
+        """
+        by_key = {_key(c): c for c in candidates}
+        index = ConflictIndex.from_repo(
+            self.repo, base, {key: c.ref for key, c in by_key.items()}
+        )
+        conflicting = [
+            key for key, c in by_key.items() if not self.check(base, c).clean
+        ]
+        return [by_key[key] for key in index.merge_order(last=conflicting)], index
+
+    def merge(
+        self,
+        branch: str,
+        candidates: Sequence[MergeCandidate],
+        order: bool = True,
+    ) -> MergeResult:
+        """Merge every candidate that merges cleanly into branch.
+
+        The branch gets one merge commit per merged candidate and is updated
+        once; if it is checked out, the working tree is reset to it.
+
+        Args:
+            branch: Local branch to merge into
+            candidates: Commits to merge
+            order: Reorder candidates to minimize conflicts (see plan)
+        """
+        start = self._rev(branch)
+        index = None
+        if order:
+            candidates, index = self.plan(start, candidates)
+            log_key_value("Predicted conflicts", index.stats())
+
+        head = start
+        merged, conflicting = [], []
+        for candidate in candidates:
+            result = self.check(head, candidate)
+            if not result.clean:
+                log_key_value(
+                    f"Conflicts merging {candidate.ref}", ", ".join(result.conflicts)
+                )
+                conflicting.append(candidate)
+                continue
+            head = self.repo.git.commit_tree(
+                result.tree,
+                "-p",
+                head,
+                "-p",
+                self._rev(candidate.ref),
+                "-m",
+                candidate.message,
+            )
+            merged.append(candidate)
+
+        if head != start:
+            self.repo.git.update_ref(f"refs/heads/{branch}", head, start)
+            head_ref = self.repo.head
+            if not head_ref.is_detached and head_ref.ref.name == branch:
+                self.repo.git.reset("--hard", "-q", head)
+        log_key_value(
+            "Merged in memory", f"{len(merged)} clean, {len(conflicting)} conflicting"
+        )
+        return MergeResult(merged, conflicting, head, index)
@@ -0,0 +1,288 @@
+"""Local git mirrors and pre-cloned workspaces for faster repository setup.
+
+Instead of a full clone for every task, setup keeps a bare mirror per upstream
+repository, refreshed with git fetch. Workspaces are cloned with
+--reference/--dissociate against it, so only objects the mirror lacks (e.g. a
+fork's own commits) come over the network. Dissociating copies the borrowed
+objects, so a workspace can be deleted or the mirror updated independently.
+
+An optional pool keeps ready-made clones so setup only has to fetch and reset.
+"""
+
+import fcntl
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from git import Repo
+
+from prometheus_swarm.utils.logging import log_key_value, log_error
+
+# Seconds before a mirror is fetched again
+MIRROR_FETCH_INTERVAL = int(os.getenv("REPO_MIRROR_FETCH_INTERVAL", "60"))
+
+
+def cache_enabled() -> bool:
+    return os.getenv("REPO_CACHE", "true").lower() not in ("0", "false", "no")
+
+
+def cache_root() -> Path:
+    root = os.getenv("REPO_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "prometheus-swarm", "repos"
+    )
+    return Path(root)
+
+
+def pool_size() -> int:
+    return int(os.getenv("REPO_POOL_SIZE", "0"))
+
+
+def clone_filter() -> Optional[str]:
+    """Partial clone filter for direct clones, e.g. "blob:none"."""
+    return os.getenv("REPO_CLONE_FILTER") or None
+
+
+def _repo_key(url: str) -> str:
+    """Filesystem-safe key for a repository URL, without credentials."""
+    parts = urlsplit(url)
+    host = parts.hostname or "local"
+    path = (parts.path if parts.scheme else url).strip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    parts = (host, *path.split("/"))
+    return "/".join(p for p in parts if p not in ("", ".", ".."))
+
+
+def _redact(text: str, secret: Optional[str]) -> str:
+    return text.replace(secret, "***") if secret else text
+
+
+def _git(args: List[str], cwd=None, secret: str = None) -> None:
+    try:
+        subprocess.run(
+            ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+        )
+    except subprocess.CalledProcessError as e:
+        command = _redact(" ".join(args), secret)
+        raise RuntimeError(
+            f"git {command} failed: {_redact(e.stderr.strip(), secret)}"
+        ) from None
+
+
+@contextmanager
+def _locked(path: Path):
+    """Hold an exclusive lock on path, shared with other processes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def mirror_path(url: str) -> Path:
+    return cache_root() / "mirrors" / f"{_repo_key(url)}.git"
+
+
+def update_mirror(url: str, auth_url: str = None, secret: str = None) -> Path:
+    """Create or refresh the bare mirror of a repository.
+
+    Args:
+        url: Repository URL, stored as the mirror's remote (no credentials)
+        auth_url: URL to fetch from, if it needs credentials
+        secret: Credential in auth_url, hidden from error messages
+    """
+    auth_url = auth_url or url
+    mirror = mirror_path(url)
+    stamp = mirror / "prometheus-fetched"
+    with _locked(mirror):
+        if not (mirror / "HEAD").exists():
+            log_key_value("Creating repository mirror", url)
+            staging = mirror.with_name(mirror.name + ".tmp")
+            shutil.rmtree(staging, ignore_errors=True)
+            _git(
+                ["clone", "--mirror", "--quiet", auth_url, str(staging)],
+                secret=secret,
+            )
+            _git(["remote", "set-url", "origin", url], cwd=staging)
+            shutil.rmtree(mirror, ignore_errors=True)
+            os.replace(staging, mirror)
+        elif (
+            # No stamp: a crash after creating the mirror, before stamping it
+            not stamp.exists()
+            or time.time() - stamp.stat().st_mtime > MIRROR_FETCH_INTERVAL
+        ):
+            _git(
+                [
+                    "fetch",
+                    "--prune",
+                    "--quiet",
+                    auth_url,
+                    "+refs/heads/*:refs/heads/*",
+                    "+refs/tags/*:refs/tags/*",
+                ],
+                cwd=mirror,
+                secret=secret,
+            )
+        else:
+            return mirror
+        stamp.touch()
+    return mirror
+
+
+def _pool_dir(url: str, branch: Optional[str]) -> Path:
+    return cache_root() / "pool" / _repo_key(url) / (branch or "_default")
+
+
+def _pooled(pool: Path) -> List[Path]:
+    if not pool.is_dir():
+        return []
+    return sorted(
+        p for p in pool.iterdir() if p.is_dir() and not p.name.startswith(".")
+    )
+
+
+def _clone(
+    auth_url: str,
+    repo_path: str,
+    branch: Optional[str],
+    reference: Optional[Path],
+) -> Repo:
+    options = {}
+    if branch:
+        options["branch"] = branch
+    if reference is not None:
+        options["reference"] = str(reference)
+        options["dissociate"] = True
+    elif clone_filter():
+        options["filter"] = clone_filter()
+    return Repo.clone_from(auth_url, repo_path, **options)
+
+
+def _take_from_pool(
+    clone_url: str, auth_url: str, repo_path: str, branch: Optional[str]
+) -> Optional[Repo]:
+    """Move a pre-made clone to repo_path and bring it up to date."""
+    pool = _pool_dir(clone_url, branch)
+    with _locked(pool):
+        entries = _pooled(pool)
+        if not entries:
+            return None
+        if os.path.isdir(repo_path):
+            # An empty directory allocated for the workspace
+            os.rmdir(repo_path)
+        shutil.move(str(entries[0]), repo_path)
+
+    repo = Repo(repo_path)
+    origin = repo.remote("origin")
+    origin.set_url(auth_url)
+    origin.fetch(prune=True)
+    branch_name = repo.active_branch.name
+    repo.git.reset("--hard", f"origin/{branch_name}")
+    repo.git.clean("-fdx")
+    log_key_value("Using pre-cloned workspace", repo_path)
+    return repo
+
+
+def clone_repository_cached(
+    clone_url: str,
+    repo_path: str,
+    branch: str = None,
+    auth_url: str = None,
+    reference_url: str = None,
+    reference_auth_url: str = None,
+    secret: str = None,
+) -> Repo:
+    """Clone a repository, borrowing objects from the local mirror.
+
+    Falls back to a direct clone (partial if REPO_CLONE_FILTER is set) if the
+    cache is disabled or unusable.
+
+    Args:
+        clone_url: Repository to clone (e.g. the worker's fork)
+        repo_path: Where to put the clone
+        branch: Branch to check out (default: the remote's default branch)
+        auth_url: clone_url with credentials, if needed
+        reference_url: Repository to mirror, e.g. the upstream of a fork, which
+            shares most objects with clone_url (default: clone_url)
+        reference_auth_url: reference_url with credentials, if needed
+        secret: Credential in the URLs, hidden from error messages
+    """
+    auth_url = auth_url or clone_url
+    if cache_enabled():
+        try:
+            repo = _take_from_pool(clone_url, auth_url, repo_path, branch)
+            if repo is not None:
+                return repo
+            if reference_url:
+                mirror = update_mirror(
+                    reference_url, reference_auth_url or reference_url, secret
+                )
+            else:
+                mirror = update_mirror(clone_url, auth_url, secret)
+            return _clone(auth_url, repo_path, branch, mirror)
+        except Exception as e:
+            log_error(
+                RuntimeError(_redact(str(e), secret)),
+                "Repository cache unavailable, cloning directly",
+            )
+            shutil.rmtree(repo_path, ignore_errors=True)
+    return _clone(auth_url, repo_path, branch, None)
+
+
+def warm_pool(
+    clone_url: str,
+    branch: str = None,
+    auth_url: str = None,
+    reference_url: str = None,
+    reference_auth_url: str = None,
+    secret: str = None,
+    background: bool = True,
+) -> None:
+    """Top up the pool of pre-made clones to REPO_POOL_SIZE."""
+    size = pool_size()
+    if size <= 0 or not cache_enabled():
+        return
+
+    def fill():
+        pool = _pool_dir(clone_url, branch)
+        try:
+            if reference_url:
+                mirror = update_mirror(
+                    reference_url, reference_auth_url or reference_url, secret
+                )
+            else:
+                mirror = update_mirror(clone_url, auth_url or clone_url, secret)
+            while len(_pooled(pool)) < size:
+                pool.mkdir(parents=True, exist_ok=True)
+                staging = Path(tempfile.mkdtemp(dir=pool, prefix=".warming-"))
+                try:
+                    # Clone from the mirror directly: taking from the pool
+                    # would never let it grow
+                    _clone(
+                        auth_url or clone_url, str(staging / "repo"), branch, mirror
+                    )
+                    # Don't keep credentials on disk in the pool
+                    clone = staging / "repo"
+                    _git(["remote", "set-url", "origin", clone_url], cwd=clone)
+                    os.replace(clone, pool / uuid.uuid4().hex)
+                finally:
+                    shutil.rmtree(staging, ignore_errors=True)
+        except Exception as e:
+            log_error(
+                RuntimeError(_redact(str(e), secret)), "Failed to warm repository pool"
+            )
+
+    if background:
+        threading.Thread(target=fill, name="repo-pool", daemon=True).start()
+    else:
+        fill()
@@ -3,9 +3,19 @@
 import base58
 import nacl.signing
 import json
+from functools import lru_cache
 from typing import Dict, Optional, Any, Union
 from prometheus_swarm.utils.logging import log_error
 
+# Decoded public keys kept for reuse; a distribution list has one per node
+VERIFY_KEY_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=VERIFY_KEY_CACHE_SIZE)
+def get_verify_key(staking_key: str) -> nacl.signing.VerifyKey:
+    """Get the verify key for a base58 encoded public key, decoding it once."""
+    return nacl.signing.VerifyKey(base58.b58decode(staking_key))
+
 
 def verify_signature(signed_message: str, staking_key: str) -> Dict[str, Any]:
     """Verify a signature locally using PyNaCl.
@@ -23,12 +33,9 @@ def verify_signature(signed_message: str, staking_key: str) -> Dict[str, Any]:
             - error (str): Error message if verification fails
     """
     try:
-        # Decode base58 signature and public key
+        # Decode base58 signature and get the (cached) verify key
         signed_bytes = base58.b58decode(signed_message)
-        pubkey_bytes = base58.b58decode(staking_key)
-
-        # Create verify key from public key
-        verify_key = nacl.signing.VerifyKey(pubkey_bytes)
+        verify_key = get_verify_key(staking_key)
 
         # Verify and get message
         message = verify_key.verify(signed_bytes)
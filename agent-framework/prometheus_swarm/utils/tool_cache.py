@@ -0,0 +1,104 @@
+"""Memoization of read-only tool results within a tool loop."""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_swarm.types import ToolDefinition, ToolOutput
+
+
+def _normalize(path: Any) -> str:
+    return os.path.normpath(str(path)).lstrip("/") or "."
+
+
+def _overlaps(a: str, b: str) -> bool:
+    """Whether one path is the same as, or inside, the other."""
+    if a == "." or b == ".":
+        return True
+    return a == b or a.startswith(b + os.sep) or b.startswith(a + os.sep)
+
+
+class ToolResultCache:
+    """Caches results of read-only tools and invalidates them on writes.
+
+    Tool definitions control caching:
+        cacheable: The tool only reads; identical calls return a reference to
+            the first result until a path it read is written.
+        path_args: Names of arguments holding the paths the tool reads or writes.
+            An argument may hold a path, a list of paths, or a list of objects
+            with a "path" key.
+
+    Any other tool (e.g. git or shell commands) may change anything, so calling it
+    clears the cache.
+    """
+
+    def __init__(self):
+        # (tool name, arguments) -> (tool call ID, paths read)
+        self._entries: Dict[Tuple[str, str], Tuple[str, List[str]]] = {}
+
+    @staticmethod
+    def _key(tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+        return tool_name, json.dumps(arguments, sort_keys=True, default=str)
+
+    @staticmethod
+    def _paths(tool: ToolDefinition, arguments: Dict[str, Any]) -> List[str]:
+        paths = []
+        for arg in tool.get("path_args", []):
+            value = arguments.get(arg)
+            values = value if isinstance(value, list) else [value]
+            for item in values:
+                if isinstance(item, dict):
+                    item = item.get("path")
+                if item is not None:
+                    paths.append(_normalize(item))
+        return paths
+
+    def lookup(
+        self, tool: ToolDefinition, arguments: Dict[str, Any]
+    ) -> Optional[ToolOutput]:
+        """Return a reference to an earlier identical call, if still valid."""
+        if not tool.get("cacheable"):
+            return None
+        entry = self._entries.get(self._key(tool["name"], arguments))
+        if entry is None:
+            return None
+        call_id = entry[0]
+        return {
+            "success": True,
+            "message": (
+                f"Unchanged since call {call_id}; "
+                "refer to that result instead of repeating the call"
+            ),
+            "data": {"unchanged_since": call_id},
+        }
+
+    def record(
+        self,
+        tool: ToolDefinition,
+        arguments: Dict[str, Any],
+        call_id: str,
+        result: Any,
+    ) -> None:
+        """Record a tool call, caching reads and invalidating on writes."""
+        if tool.get("cacheable"):
+            if isinstance(result, dict) and result.get("success"):
+                # A read without a path argument may depend on any file
+                self._entries[self._key(tool["name"], arguments)] = (
+                    call_id,
+                    self._paths(tool, arguments) or ["."],
+                )
+            return
+
+        written = self._paths(tool, arguments)
+        if not written:
+            self.clear()
+            return
+        self._entries = {
+            key: (entry_id, paths)
+            for key, (entry_id, paths) in self._entries.items()
+            if not any(_overlaps(p, w) for p in paths for w in written)
+        }
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
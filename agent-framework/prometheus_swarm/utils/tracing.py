@@ -0,0 +1,237 @@
+"""Tracing utilities with optional OpenTelemetry export.
+
+Spans are created through the OpenTelemetry API when it is installed. Export is
+configured from environment variables:
+
+    OTEL_EXPORTER_OTLP_ENDPOINT: Send spans to an OTLP collector (requires
+        opentelemetry-sdk and opentelemetry-exporter-otlp)
+    TRACE_FILE: Append spans as JSON lines to a local file (requires
+        opentelemetry-sdk)
+    OTEL_SERVICE_NAME: Service name reported with every span
+
+If OpenTelemetry is not installed, or no exporter is configured, every helper in
+this module is a cheap no-op.
+"""
+
+import os
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Dict, Iterator, Optional
+
+from prometheus_swarm.utils.logging import log_key_value, log_error
+
+try:
+    from opentelemetry import trace, propagate
+    from opentelemetry import context as otel_context
+except ImportError:
+    trace = None
+    propagate = None
+    otel_context = None
+
+TRACER_NAME = "prometheus_swarm"
+
+# Track if tracing has been configured
+_tracing_configured = False
+
+
+def configure_tracing(service_name: Optional[str] = None) -> bool:
+    """Configure span export for this process.
+
+    Args:
+        service_name: Service name to report (defaults to OTEL_SERVICE_NAME or
+            "prometheus-swarm")
+
+    Returns:
+        bool: True if an exporter was installed
+    """
+    global _tracing_configured
+    if _tracing_configured:
+        return True
+
+    endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+    trace_file = os.getenv("TRACE_FILE")
+    if trace is None or not (endpoint or trace_file):
+        return False
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            ConsoleSpanExporter,
+        )
+    except ImportError as e:
+        log_error(e, "Tracing requested but opentelemetry-sdk is not installed")
+        return False
+
+    try:
+        service_name = service_name or os.getenv(
+            "OTEL_SERVICE_NAME", "prometheus-swarm"
+        )
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": service_name})
+        )
+
+        if endpoint:
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                    OTLPSpanExporter,
+                )
+            except ImportError:
+                from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+                    OTLPSpanExporter,
+                )
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            log_key_value("Tracing to OTLP endpoint", endpoint)
+
+        if trace_file:
+            out = open(trace_file, "a", buffering=1)
+            exporter = ConsoleSpanExporter(
+                out=out, formatter=lambda span: span.to_json(indent=None) + "\n"
+            )
+            provider.add_span_processor(BatchSpanProcessor(exporter))
+            log_key_value("Tracing to file", trace_file)
+
+        trace.set_tracer_provider(provider)
+        _tracing_configured = True
+        return True
+    except Exception as e:
+        log_error(e, "Failed to configure tracing")
+        return False
+
+
+def get_tracer():
+    """Get the framework tracer, or None if OpenTelemetry is not installed."""
+    if trace is None:
+        return None
+    return trace.get_tracer(TRACER_NAME)
+
+
+def _clean_attributes(attributes: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drop None values and stringify types OpenTelemetry can't record."""
+    cleaned = {}
+    for key, value in (attributes or {}).items():
+        if value is None:
+            continue
+        if not isinstance(value, (str, bool, int, float)):
+            value = str(value)
+        cleaned[key] = value
+    return cleaned
+
+
+@contextmanager
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator:
+    """Run a block inside a span that becomes the current span.
+
+    Exceptions raised inside the block are recorded on the span and re-raised.
+
+    Args:
+        name: Span name
+        attributes: Optional span attributes (None values are skipped)
+
+    Yields:
+        The span, or None if OpenTelemetry is not installed
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(
+        name, attributes=_clean_attributes(attributes)
+    ) as span:
+        yield span
+
+
+def traced(name: Optional[str] = None):
+    """Decorator to run a function inside a span.
+
+    Args:
+        name: Span name (defaults to the function's qualified name)
+    """
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def begin_span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+):
+    """Start a span and make it current until end_span is called.
+
+    For hook-based code (e.g. Flask before/teardown request) where a context
+    manager can't wrap the work.
+
+    Args:
+        name: Span name
+        attributes: Optional span attributes
+        headers: Incoming headers carrying the parent trace context
+
+    Returns:
+        A handle to pass to end_span, or None if OpenTelemetry is not installed
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        return None
+    parent = propagate.extract(headers) if headers else None
+    span = tracer.start_span(
+        name, context=parent, attributes=_clean_attributes(attributes)
+    )
+    token = otel_context.attach(trace.set_span_in_context(span, parent))
+    return span, token
+
+
+def end_span(handle, error: Optional[BaseException] = None, **attributes) -> None:
+    """End a span started with begin_span and restore the previous context.
+
+    Args:
+        handle: Value returned by begin_span
+        error: Exception to record on the span, if any
+        **attributes: Final attributes to add before ending
+    """
+    if handle is None:
+        return
+    span, token = handle
+    try:
+        if attributes:
+            span.set_attributes(_clean_attributes(attributes))
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+        span.end()
+    finally:
+        otel_context.detach(token)
+
+
+def set_span_attributes(**attributes) -> None:
+    """Add attributes to the current span, if any."""
+    if trace is None:
+        return
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attributes(_clean_attributes(attributes))
+
+
+def inject_trace_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add W3C trace context headers for the current span to outgoing headers.
+
+    Args:
+        headers: Headers to extend (a new dict is returned either way)
+
+    Returns:
+        Dict[str, str]: Headers including traceparent/tracestate when tracing
+    """
+    headers = dict(headers or {})
+    if propagate is not None:
+        propagate.inject(headers)
+    return headers
@@ -0,0 +1,147 @@
+"""Task workspaces: unique checkout directories and the workspace tools act on.
+
+Directories are allocated atomically with mkdtemp, so concurrent tasks can't
+pick the same one. Each has a lease file recording the owning process; if the
+process dies without cleaning up, the next allocation removes the workspace.
+
+Tools resolve paths against the current workspace, which is set per context
+with use_workspace (and so can differ between threads or asyncio tasks), or
+against an explicit repo_path. They fall back to the working directory, so
+code that still uses os.chdir keeps working.
+"""
+
+import atexit
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional, Set
+
+from prometheus_swarm.utils.logging import log_key_value, log_error
+
+LEASE_SUFFIX = ".lease"
+
+_current_workspace: ContextVar[Optional[str]] = ContextVar(
+    "current_workspace", default=None
+)
+
+# Workspaces leased by this process
+_leases: Set[str] = set()
+_leases_lock = threading.Lock()
+
+
+def current_workspace(repo_path: Optional[str] = None) -> str:
+    """Directory tools should work in.
+
+    Args:
+        repo_path: Explicit workspace; takes precedence when given
+    """
+    return repo_path or _current_workspace.get() or os.getcwd()
+
+
+@contextmanager
+def use_workspace(path: Optional[str]):
+    """Make path the current workspace within the block (no-op for None)."""
+    if path is None:
+        yield
+        return
+    token = _current_workspace.set(os.path.abspath(path))
+    try:
+        yield
+    finally:
+        _current_workspace.reset(token)
+
+
+def workspaces_root() -> Path:
+    return Path(os.getenv("WORKSPACE_DIR") or os.path.abspath("./repos"))
+
+
+def _lease_path(workspace: Path) -> Path:
+    return workspace.with_name(workspace.name + LEASE_SUFFIX)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def allocate_workspace(prefix: str = "repo_", root: Optional[str] = None) -> str:
+    """Create a new, empty workspace directory leased to this process.
+
+    Returns:
+        str: Absolute path of the workspace
+    """
+    root = Path(root) if root else workspaces_root()
+    root.mkdir(parents=True, exist_ok=True)
+    reap_stale_workspaces(root)
+
+    workspace = Path(tempfile.mkdtemp(prefix=prefix, dir=root))
+    lease = {"pid": os.getpid(), "host": socket.gethostname(), "created": time.time()}
+    _lease_path(workspace).write_text(json.dumps(lease))
+    with _leases_lock:
+        _leases.add(str(workspace))
+    return str(workspace)
+
+
+def release_workspace(path: str) -> None:
+    """Delete a workspace and its lease."""
+    if not path:
+        return
+    workspace = Path(path)
+    shutil.rmtree(workspace, ignore_errors=True)
+    try:
+        _lease_path(workspace).unlink()
+    except FileNotFoundError:
+        pass
+    with _leases_lock:
+        _leases.discard(str(workspace))
+
+
+def reap_stale_workspaces(root: Optional[str] = None) -> List[str]:
+    """Remove workspaces whose owning process on this host has exited.
+
+    Returns:
+        List[str]: Paths of the removed workspaces
+    """
+    root = Path(root) if root else workspaces_root()
+    if not root.is_dir():
+        return []
+    host = socket.gethostname()
+    reaped = []
+    for lease_file in root.glob(f"*{LEASE_SUFFIX}"):
+        try:
+            lease = json.loads(lease_file.read_text())
+        except (OSError, ValueError):
+            continue
+        pid = lease.get("pid")
+        if lease.get("host") != host or not isinstance(pid, int) or _pid_alive(pid):
+            continue
+        workspace = lease_file.with_name(lease_file.name[: -len(LEASE_SUFFIX)])
+        try:
+            shutil.rmtree(workspace, ignore_errors=True)
+            lease_file.unlink()
+            reaped.append(str(workspace))
+        except OSError as e:
+            log_error(e, f"Failed to remove stale workspace {workspace}")
+    if reaped:
+        log_key_value("Removed stale workspaces", len(reaped))
+    return reaped
+
+
+@atexit.register
+def _release_all() -> None:
+    with _leases_lock:
+        leased = list(_leases)
+    for path in leased:
+        release_workspace(path)
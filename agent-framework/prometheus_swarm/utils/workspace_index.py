@@ -0,0 +1,298 @@
+"""Per-repository index of files, content hashes and recently read contents.
+
+The file tools share one WorkspaceIndex per repository root so that repeated
+list_files and read_file calls don't rescan git or re-read unchanged files.
+
+The index stays current by:
+    - Tool write paths reporting the files they create, change or remove
+    - Watching the mtime of .git/index, which any git command that changes the
+      checkout (checkout, merge, pull, reset) updates
+    - Tools with arbitrary side effects (shell commands, dependency installs)
+      calling mark_all_dirty()
+
+Cached file contents and hashes are validated against the file's stat on every
+use, so external edits are never served stale.
+"""
+
+import hashlib
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from prometheus_swarm.utils.workspace import current_workspace
+
+# Files larger than this are never kept in the read cache
+MAX_CACHED_FILE_BYTES = 1024 * 1024
+# Total bytes of file contents kept in each index's read cache
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+StatKey = Tuple[int, int, int]
+
+
+def _stat_key(path: Path) -> Optional[StatKey]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _is_excluded(rel_path: str) -> bool:
+    parts = rel_path.split("/")
+    return parts[0] == ".git" or "node_modules" in parts
+
+
+def find_repo_root(path: Path) -> Optional[Path]:
+    """Find the root of the git repository containing path, if any."""
+    path = Path(path).resolve()
+    for candidate in (path, *path.parents):
+        if (candidate / ".git").exists():
+            return candidate
+    return None
+
+
+class WorkspaceIndex:
+    """File list, content hashes and read cache for one repository."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root).resolve()
+        self._lock = threading.RLock()
+        self._files: Optional[Set[str]] = None
+        self._sorted: Optional[List[str]] = None
+        self._git_stamp: Optional[StatKey] = None
+        # rel path -> (stat key, sha1 hex)
+        self._hashes: Dict[str, Tuple[StatKey, str]] = {}
+        # rel path -> (stat key, content), least recently used first
+        self._contents: "OrderedDict[str, Tuple[StatKey, str]]" = OrderedDict()
+        self._cached_bytes = 0
+
+    # File list
+
+    def _current_git_stamp(self) -> Optional[StatKey]:
+        return _stat_key(self.root / ".git" / "index")
+
+    def _scan(self) -> Set[str]:
+        """List tracked and untracked (not ignored) files in one git call."""
+        output = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=self.root,
+            capture_output=True,
+            check=True,
+        ).stdout.decode("utf-8", errors="surrogateescape")
+        return {
+            f
+            for f in output.split("\0")
+            if f and not _is_excluded(f) and (self.root / f).is_file()
+        }
+
+    def files(self) -> List[str]:
+        """Get all non-ignored files in the repository, sorted."""
+        with self._lock:
+            stamp = self._current_git_stamp()
+            if self._files is None or stamp != self._git_stamp:
+                self._files = self._scan()
+                self._sorted = None
+                self._git_stamp = stamp
+            if self._sorted is None:
+                self._sorted = sorted(self._files)
+            return self._sorted
+
+    def _is_ignored(self, rel_path: str) -> bool:
+        result = subprocess.run(
+            ["git", "check-ignore", "-q", "--", rel_path],
+            cwd=self.root,
+            capture_output=True,
+        )
+        return result.returncode == 0
+
+    def mark_dirty(self) -> None:
+        """Rescan the file list on next use."""
+        with self._lock:
+            self._files = None
+            self._sorted = None
+
+    def git_stamp(self) -> Optional[StatKey]:
+        """Get the current stat of .git/index, for acknowledge_git_change."""
+        return self._current_git_stamp()
+
+    def acknowledge_git_change(self, stamp_before: Optional[StatKey]) -> None:
+        """Accept a change to .git/index that didn't change which files exist.
+
+        For callers that stage and commit. The file list is only kept if it was
+        current as of stamp_before, taken before the git operation.
+        """
+        with self._lock:
+            if self._files is not None and self._git_stamp == stamp_before:
+                self._git_stamp = self._current_git_stamp()
+
+    # Incremental updates from tool write paths
+
+    def relative_path(self, path) -> Optional[str]:
+        """Get path relative to the repository root, or None if outside it."""
+        # Resolve symlinked parent directories but not the file itself
+        path = os.path.abspath(path)
+        parent = os.path.realpath(os.path.dirname(path))
+        try:
+            full_path = Path(parent, os.path.basename(path))
+            return full_path.relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+
+    def notify_written(self, path, content: Optional[str] = None) -> None:
+        """Record that a file was created or overwritten.
+
+        Args:
+            path: Absolute path of the file
+            content: The text written, to cache without re-reading
+        """
+        rel = self.relative_path(path)
+        if rel is None:
+            return
+        with self._lock:
+            self._forget(rel)
+            if self._files is not None and rel not in self._files:
+                if not _is_excluded(rel) and not self._is_ignored(rel):
+                    self._files.add(rel)
+                    self._sorted = None
+            if content is not None:
+                key = _stat_key(self.root / rel)
+                if key is not None:
+                    # Cache the text as read_text would read it back
+                    content = content.replace("\r\n", "\n").replace("\r", "\n")
+                    self._store_content(rel, key, content)
+
+    def notify_removed(self, path) -> None:
+        """Record that a file was deleted or moved away."""
+        rel = self.relative_path(path)
+        if rel is None:
+            return
+        with self._lock:
+            self._forget(rel)
+            if self._files is not None and rel in self._files:
+                self._files.discard(rel)
+                self._sorted = None
+
+    def _forget(self, rel: str) -> None:
+        self._hashes.pop(rel, None)
+        cached = self._contents.pop(rel, None)
+        if cached is not None:
+            self._cached_bytes -= len(cached[1])
+
+    # Contents and hashes
+
+    def _store_content(self, rel: str, key: StatKey, content: str) -> None:
+        if len(content) > MAX_CACHED_FILE_BYTES:
+            return
+        self._contents[rel] = (key, content)
+        self._cached_bytes += len(content)
+        while self._cached_bytes > MAX_CACHE_BYTES and self._contents:
+            _, (_, evicted) = self._contents.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+    def read_text(self, path, errors: str = "strict") -> str:
+        """Read a text file, served from cache if unchanged since last read.
+
+        The file is decoded as open() in text mode does (universal newlines).
+        Only files that decode cleanly are cached, so errors applies as usual.
+
+        Args:
+            path: Path of the file
+            errors: How to handle undecodable bytes, as for open()
+
+        Raises:
+            FileNotFoundError, UnicodeDecodeError, OSError: As open() would
+        """
+        full_path = Path(os.path.abspath(path))
+        rel = self.relative_path(full_path)
+        key = _stat_key(full_path)
+        if rel is not None and key is not None:
+            with self._lock:
+                cached = self._contents.get(rel)
+                if cached and cached[0] == key:
+                    self._contents.move_to_end(rel)
+                    return cached[1]
+
+        try:
+            with open(full_path, "r") as f:
+                content = f.read()
+        except UnicodeDecodeError:
+            if errors == "strict":
+                raise
+            with open(full_path, "r", errors=errors) as f:
+                return f.read()
+
+        if rel is not None and key is not None and key == _stat_key(full_path):
+            with self._lock:
+                self._forget(rel)
+                self._store_content(rel, key, content)
+        return content
+
+    def file_hash(self, path) -> Optional[str]:
+        """Get the SHA-1 of a file's contents, or None if it can't be read."""
+        full_path = Path(os.path.abspath(path))
+        rel = self.relative_path(full_path)
+        key = _stat_key(full_path)
+        if key is None:
+            return None
+        if rel is not None:
+            with self._lock:
+                cached = self._hashes.get(rel)
+                if cached and cached[0] == key:
+                    return cached[1]
+
+        digest = hashlib.sha1()
+        try:
+            with open(full_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+
+        if rel is not None:
+            with self._lock:
+                self._hashes[rel] = (key, digest.hexdigest())
+        return digest.hexdigest()
+
+
+_indexes: Dict[Path, WorkspaceIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_workspace_index(path=None) -> Optional[WorkspaceIndex]:
+    """Get the shared index for the repository containing path.
+
+    Args:
+        path: Any path inside the repository (defaults to the current workspace)
+
+    Returns:
+        Optional[WorkspaceIndex]: The index, or None if path is not in a git repo
+    """
+    root = find_repo_root(Path(path or current_workspace()))
+    if root is None:
+        return None
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = WorkspaceIndex(root)
+        return index
+
+
+def mark_all_dirty() -> None:
+    """Rescan every index's file list on next use.
+
+    Call after running something that may create or delete arbitrary files.
+    """
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.mark_dirty()
+
+
+def drop_workspace_index(path) -> None:
+    """Forget the index for a repository (e.g. when its checkout is deleted)."""
+    root = Path(path).resolve()
+    with _indexes_lock:
+        _indexes.pop(root, None)
@@ -3,6 +3,7 @@
 from typing import Optional, Dict, Any, List, Type, Union, get_args, get_origin, Tuple
 from abc import ABC, abstractmethod
 import ast
+from contextlib import nullcontext
 from dataclasses import dataclass
 from functools import wraps
 import uuid
@@ -10,6 +11,13 @@ import json
 from prometheus_swarm.types import ToolResponse, PhaseResult
 from prometheus_swarm.utils.retry import send_message_with_retry
 from prometheus_swarm.utils.logging import log_section, log_error, configure_logging
+from prometheus_swarm.utils.tracing import configure_tracing, start_span
+from prometheus_swarm.utils.budget import ToolLoopBudget
+from prometheus_swarm.utils.workspace import use_workspace
+from prometheus_swarm.tools.git_operations.implementations import (
+    batch_commits,
+    commit_batching_enabled,
+)
 from prometheus_swarm.clients import clients, setup_client
 import argparse
 import sys
@@ -145,10 +153,15 @@ class WorkflowPhase:
         required_tool: Optional[str] = None,
         conversation_id: Optional[str] = None,
         name: Optional[str] = None,
+        budget: Optional[ToolLoopBudget] = None,
+        prompt_context: Optional[Dict[str, Any]] = None,
     ):
         """Initialize a workflow phase.
 
         If workflow is provided, the prompt will be formatted with the workflow context.
+        prompt_context adds values used only by this phase's prompt.
+        If budget is not provided, limits are read from the environment
+        (see ToolLoopBudget.from_env).
         """
         self.available_tools = available_tools
         self.required_tool = required_tool
@@ -156,6 +169,9 @@ class WorkflowPhase:
         self.prompt_name = prompt_name
         self.name = name or self.__class__.__name__
         self.workflow = workflow
+        self.budget = budget or ToolLoopBudget.from_env()
+        # Result of the last execution, kept even when execute() returns None
+        self.result: Optional[PhaseResult] = None
 
         # Format the prompt if workflow is provided
         self.prompt = None
@@ -163,30 +179,79 @@ class WorkflowPhase:
         if workflow is None:
             raise ValueError("Workflow is not set")
 
-        self.prompt = workflow.prompts[prompt_name].format(**workflow.context)
+        self.prompt = workflow.prompts[prompt_name].format(
+            **{**workflow.context, **(prompt_context or {})}
+        )
 
     def _parse_result(self, tool_response: ToolResponse) -> PhaseResult:
         """Parse raw API response into standardized format"""
         try:
             response_data = ast.literal_eval(tool_response.get("response", "{}"))
+            data = response_data.get("data") or {}
+            stop_reason = data.get("stop_reason") if isinstance(data, dict) else None
             return PhaseResult(
                 success=response_data.get("success", False),
-                data=response_data.get("data", {}),
+                data=data,
                 error=(
                     response_data.get("message")
                     if not response_data.get("success")
                     else None
                 ),
+                stop_reason=stop_reason,
             )
         except (SyntaxError, ValueError) as e:
             return PhaseResult(
                 success=False,
                 data={},
                 error=f"Failed to parse response: {str(e)}",
+                stop_reason=None,
             )
 
     def execute(self):
-        """Run the phase."""
+        """Run the phase.
+
+        Returns the phase result, or None if the phase failed. The failed result
+        is kept in self.result; stop_reason tells if the tool loop budget ran out.
+        """
+        context = self.workflow.context if self.workflow else {}
+        with start_span(
+            f"phase {self.name}",
+            attributes={
+                "phase.name": self.name,
+                "task_id": context.get("task_id"),
+                "round_number": context.get("round_number"),
+                "conversation_id": self.conversation_id,
+            },
+        ) as span:
+            # File tools' commits are made and pushed once, when the phase ends
+            commits = batch_commits() if commit_batching_enabled() else nullcontext()
+            # Tools act on the workflow's checkout rather than the process's cwd
+            with use_workspace(context.get("repo_path")), commits as flushed:
+                result = self._execute()
+            if flushed and not flushed["success"]:
+                # The phase's changes never reached the remote
+                error = f"Deferred commits not pushed: {flushed['message']}"
+                log_error(Exception(error), f"Phase {self.name} failed")
+                self.result = PhaseResult(
+                    success=False,
+                    data=(self.result or {}).get("data") or {},
+                    error=error,
+                    stop_reason=self.stop_reason,
+                )
+                result = None
+            if span is not None:
+                span.set_attribute("phase.success", result is not None)
+                if self.stop_reason:
+                    span.set_attribute("phase.stop_reason", self.stop_reason)
+            return result
+
+    @property
+    def stop_reason(self) -> Optional[str]:
+        """Why the last execution's tool loop stopped early, if it did."""
+        return self.result.get("stop_reason") if self.result else None
+
+    def _execute(self):
+        """Run the phase without tracing."""
         log_section(f"RUNNING PHASE: {self.name}")
 
         workflow = self.workflow
@@ -220,7 +285,7 @@ class WorkflowPhase:
         )
 
         results = workflow.client.handle_tool_response(
-            response, context=workflow.context
+            response, context=workflow.context, budget=self.budget
         )
         if not results:
             log_error(
@@ -230,6 +295,7 @@ class WorkflowPhase:
             return None
 
         phase_result = self._parse_result(results[-1])  # Return the last result
+        self.result = phase_result
 
         if not phase_result.get("success"):
             log_error(Exception(phase_result.get("error")), f"Phase {self.name} failed")
@@ -246,6 +312,8 @@ class Workflow(ABC):
         self.client = client
         self.prompts = prompts
         self.context: Dict[str, Any] = kwargs
+        # Set by run() when a phase's tool loop budget ran out
+        self.stop_reason: Optional[str] = None
 
     @abstractmethod
     def setup(self):
@@ -463,6 +531,8 @@ class WorkflowExecution(ABC):
         """
         # Set up logging
         configure_logging()
+        # Set up span export (no-op unless configured via environment)
+        configure_tracing()
 
         # Check env vars
         if required_env_vars:
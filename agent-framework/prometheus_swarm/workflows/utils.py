@@ -1,15 +1,29 @@
 """Centralized workflow utilities."""
 
 import os
-import shutil
+import time
 from github import Github
 from git import Repo
 from prometheus_swarm.utils.logging import log_key_value, log_error
+from prometheus_swarm.utils.github_gateway import GitHubGateway, get_gateway
+from prometheus_swarm.utils.tracing import traced
 from prometheus_swarm.tools.file_operations.implementations import list_files
 from prometheus_swarm.tools.github_operations.parser import extract_section
 from prometheus_swarm.utils.signatures import verify_and_parse_signature
+from prometheus_swarm.utils.workspace_index import drop_workspace_index
+from prometheus_swarm.utils.repo_cache import clone_repository_cached, warm_pool
+from prometheus_swarm.utils.workspace import allocate_workspace, release_workspace
+from prometheus_swarm.tools.code_operations.search_index import (
+    build_search_index,
+    drop_search_index,
+)
 from typing import Optional, Tuple
 
+# Polling a new fork until it is ready: first and longest delay, and total time
+FORK_READY_DELAY = 0.25
+FORK_READY_MAX_DELAY = 8
+FORK_READY_TIMEOUT = 60
+
 
 def get_fork_name(
     source_owner: str, source_repo_url: str, github_token: str | None = None
@@ -26,8 +40,8 @@ def get_fork_name(
     """
     # Set up GitHub client
     if isinstance(github_token, str):
-        gh = Github(github_token)
-    elif isinstance(github_token, Github):
+        gh = get_gateway(github_token)
+    elif isinstance(github_token, (Github, GitHubGateway)):
         gh = github_token
     else:
         raise ValueError("GitHub token is required")
@@ -63,7 +77,7 @@ def check_required_env_vars(env_vars: list[str]):
 def validate_github_auth(github_token: str, github_username: str):
     """Validate GitHub authentication."""
     try:
-        gh = Github(github_token)
+        gh = get_gateway(github_token)
         user = gh.get_user()
         username = user.login
         if username != github_username:
@@ -92,6 +106,7 @@ def _setup_git_user_config(repo: Repo, github_username: str):
         )
 
 
+@traced("setup_repository")
 def setup_repository(
     repo_url: str,
     github_token: str = None,
@@ -130,43 +145,37 @@ def setup_repository(
             fork_owner = repo_owner
             fork_name = repo_name
 
-        # Generate sequential repo path
-        base_dir = os.path.abspath("./repos")
-        os.makedirs(base_dir, exist_ok=True)
-
-        counter = 0
-        while True:
-            candidate_path = os.path.join(base_dir, f"repo_{counter}")
-            if not os.path.exists(candidate_path):
-                repo_path = candidate_path
-                break
-            counter += 1
-
-        # Clean existing repository
-        if os.path.exists(repo_path):
-            shutil.rmtree(repo_path)
-
-        # Create parent directory
-        os.makedirs(os.path.dirname(repo_path), exist_ok=True)
+        # Allocate a unique workspace, leased to this process
+        repo_path = allocate_workspace()
 
         # Save original directory
         original_dir = os.getcwd()
 
         # Add GitHub token to URL for authentication
-        if github_token and "github.com" in clone_url:
-            auth_url = clone_url.replace("https://", f"https://{github_token}@")
-        else:
-            auth_url = clone_url
+        def with_token(url):
+            if github_token and "github.com" in url:
+                return url.replace("https://", f"https://{github_token}@")
+            return url
+
+        auth_url = with_token(clone_url)
 
         # Clone the repository
         log_key_value("Cloning repository", clone_url)
         log_key_value("Clone path", repo_path)
 
-        # Clone specific branch if provided, otherwise clone default branch
-        if branch:
-            repo = Repo.clone_from(auth_url, repo_path, branch=branch)
-        else:
-            repo = Repo.clone_from(auth_url, repo_path)
+        # Clone specific branch if provided, otherwise clone default branch.
+        # Objects come from a local mirror of the upstream where possible, since
+        # a fork shares nearly all of them.
+        clone_options = {
+            "branch": branch,
+            "auth_url": auth_url,
+            "reference_url": repo_url,
+            "reference_auth_url": with_token(repo_url),
+            "secret": github_token,
+        }
+        repo = clone_repository_cached(clone_url, repo_path, **clone_options)
+        # Have a clone ready for the next task on this repository
+        warm_pool(clone_url, **clone_options)
 
         # Configure Git user info if username provided
         if github_username:
@@ -176,6 +185,9 @@ def setup_repository(
         if not skip_fork:
             repo.create_remote("upstream", repo_url)
 
+        # Index the checkout for search_code while the workflow gets started
+        build_search_index(repo_path)
+
         return {
             "success": True,
             "message": "Successfully set up repository",
@@ -208,19 +220,44 @@ def cleanup_repository(original_dir: str, repo_path: str):
         repo_path: Repository path to clean up
     """
     os.chdir(original_dir)
-    if os.path.exists(repo_path):
-        shutil.rmtree(repo_path)
+    drop_search_index(repo_path)
+    drop_workspace_index(repo_path)
+    release_workspace(repo_path)
 
 
-def get_current_files():
-    """Get current files in repository."""
-    files_result = list_files(".")
+def get_current_files(repo_path: str = None):
+    """Get current files in repository (default: the current workspace)."""
+    files_result = list_files(".", repo_path=repo_path)
     if not files_result["success"]:
         raise Exception(f"Failed to get file list: {files_result['message']}")
 
     return files_result["data"]["files"]
 
 
+def _wait_for_fork(fork, timeout: float = None) -> bool:
+    """Wait until a new fork's default branch exists, backing off exponentially.
+
+    Args:
+        fork: The forked repository
+        timeout: Seconds to wait at most (default: FORK_READY_TIMEOUT)
+
+    Returns:
+        bool: True if the fork is ready
+    """
+    deadline = time.monotonic() + (timeout or FORK_READY_TIMEOUT)
+    delay = FORK_READY_DELAY
+    while True:
+        try:
+            fork.get_branch(fork.default_branch)
+            return True
+        except Exception:
+            if time.monotonic() + delay > deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, FORK_READY_MAX_DELAY)
+
+
+@traced("fork_repository")
 def _fork_repository(
     repo_full_name: str,
     github_token: Optional[str] = None,
@@ -240,7 +277,7 @@ def _fork_repository(
         if fork_name:
             log_key_value("Custom fork name", fork_name)
         token = github_token or os.environ["GITHUB_TOKEN"]
-        gh = Github(token)
+        gh = get_gateway(token)
         source_repo = gh.get_repo(repo_full_name)
 
         # Get authenticated user
@@ -259,17 +296,10 @@ def _fork_repository(
             fork = user.create_fork(source_repo, name=repo_name)
             log_key_value("Created new fork", fork.html_url)
 
-        # Wait for fork to be ready
-        log_key_value("Waiting for fork to be ready", "")
-        max_retries = 10
-        for _ in range(max_retries):
-            try:
-                fork.get_commits().get_page(0)
-                break
-            except Exception:
-                import time
-
-                time.sleep(1)
+            # Forking is asynchronous; wait until the new fork can be cloned
+            log_key_value("Waiting for fork to be ready", "")
+            if not _wait_for_fork(fork):
+                log_key_value("Fork not ready after seconds", FORK_READY_TIMEOUT)
 
         return {
             "success": True,
@@ -395,7 +425,7 @@ def create_remote_branch(
     """
     try:
         token = github_token or os.environ["GITHUB_TOKEN"]
-        gh = Github(token)
+        gh = get_gateway(token)
         repo = gh.get_repo(f"{repo_owner}/{repo_name}")
 
         # Get the base branch's latest commit
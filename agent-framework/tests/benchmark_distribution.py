@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark distribution list validation on a synthetic list.
+
+Builds a list of worker PRs signed with locally generated keys, serves their
+bodies instead of fetching them from GitHub, and times validate_distribution_list
+with different numbers of signature verification threads:
+
+    python tests/benchmark_distribution.py --entries 1000 --workers 1 2 4 8
+
+Measured on one CPU, 1000 entries took 0.22s verified in turn and 0.27s on a
+pool of 4 threads: the pool only adds overhead there, so validation verifies
+in turn when it has one worker (SIGNATURE_VERIFY_WORKERS=1 or a single CPU).
+"""
+
+import argparse
+import json
+import os
+import time
+
+import base58
+import nacl.signing
+
+from prometheus_swarm.utils import distribution
+from prometheus_swarm.utils.github_batch import PullRequestInfo
+from prometheus_swarm.utils.signatures import get_verify_key
+
+TASK_ID = "task"
+ROUND = 3
+
+
+def make_node(i):
+    """A distribution list entry and the body of its PR."""
+    signing_key = nacl.signing.SigningKey.generate()
+    staking_key = base58.b58encode(bytes(signing_key.verify_key)).decode()
+    payload = {
+        "taskId": TASK_ID,
+        "roundNumber": ROUND,
+        "stakingKey": staking_key,
+        "action": "task",
+    }
+    signature = base58.b58encode(
+        signing_key.sign(json.dumps(payload).encode())
+    ).decode()
+    node = {
+        "prUrl": f"https://github.com/worker{i}/repo/pull/{i}",
+        "taskId": TASK_ID,
+        "roundNumber": ROUND,
+        "stakingKey": staking_key,
+    }
+    body = (
+        "## Changes\n\n<!-- BEGIN_STAKING_KEY -->\n"
+        f"{staking_key}:{signature}\n<!-- END_STAKING_KEY -->"
+    )
+    return node, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    nodes = [make_node(i) for i in range(args.entries)]
+    bodies = {node["prUrl"]: body for node, body in nodes}
+    distribution.fetch_pull_requests = lambda urls, **kwargs: {
+        url: PullRequestInfo(
+            url, 1, bodies[url], None, "open", False, "", None, "", None
+        )
+        for url in urls
+    }
+    distribution.remove_leaders = lambda distribution_list, **kwargs: (
+        distribution_list
+    )
+    distribution_list = {f"node{i}": node for i, (node, _) in enumerate(nodes)}
+
+    print(f"{args.entries} entries, {os.cpu_count()} CPUs")
+    for workers in args.workers:
+        get_verify_key.cache_clear()
+        start = time.perf_counter()
+        validated, error = distribution.validate_distribution_list(
+            distribution_list, "owner", "repo", workers=workers
+        )
+        elapsed = time.perf_counter() - start
+        assert error is None and len(validated) == args.entries, error
+        print(f"RESULT {workers} workers: {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
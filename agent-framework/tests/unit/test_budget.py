@@ -0,0 +1,250 @@
+"""Tests for the tool loop budget."""
+
+import ast
+import itertools
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from prometheus_swarm.clients.base_client import Client
+from prometheus_swarm.utils.budget import ToolLoopBudget
+from prometheus_swarm.workflows.base import WorkflowPhase
+
+
+class FakeStorage:
+    def __init__(self):
+        self.messages = []
+
+    def save_message(self, conversation_id, role, content):
+        self.messages.append((role, content))
+
+    def update_tools(self, **kwargs):
+        pass
+
+
+class FakeClient(Client):
+    """Client whose agent keeps calling the same tool until told otherwise."""
+
+    def __init__(self, responses):
+        # Skip Client.__init__ to avoid touching the conversation database
+        self.tools = {}
+        self.api_name = "fake"
+        self.model = "fake"
+        self.responses = responses
+        self.sent = []
+        self.storage = FakeStorage()
+
+    def _get_default_model(self):
+        return "fake"
+
+    def _get_api_name(self):
+        return "fake"
+
+    def _convert_tool_to_api_format(self, tool):
+        return tool
+
+    def _convert_message_to_api_format(self, message):
+        return message
+
+    def _convert_api_response_to_message(self, response):
+        return response
+
+    def _convert_tool_choice_to_api_format(self, tool_choice):
+        return tool_choice
+
+    def _make_api_call(self, **kwargs):
+        return None
+
+    def _format_tool_response(self, response):
+        return {"role": "tool", "content": json.loads(response)}
+
+    def create_conversation(self, **kwargs):
+        return "conv"
+
+    def send_message(self, conversation_id=None, tool_response=None, **kwargs):
+        self.sent.append(tool_response)
+        return next(self.responses)
+
+
+def tool_call_response(call_id, path="a.txt", input_tokens=0):
+    return {
+        "conversation_id": "conv",
+        "usage": {"input_tokens": input_tokens, "output_tokens": 1},
+        "content": [
+            {
+                "type": "tool_call",
+                "tool_call": {
+                    "id": str(call_id),
+                    "name": "read_file",
+                    "arguments": {"file_path": path},
+                },
+            }
+        ],
+    }
+
+
+def make_client(path_for=lambda i: f"{i}.txt", input_tokens=0):
+    responses = (
+        tool_call_response(i, path_for(i), input_tokens) for i in itertools.count(1)
+    )
+    client = FakeClient(responses)
+    client.tools["read_file"] = {
+        "name": "read_file",
+        "function": lambda file_path, **kwargs: {
+            "success": True,
+            "message": "ok",
+            "data": {"content": file_path},
+        },
+    }
+    return client
+
+
+def stop_reason(results):
+    assert len(results) == 1
+    response = ast.literal_eval(results[0]["response"])
+    assert response["success"] is False
+    return response["data"]["stop_reason"]
+
+
+def test_stops_after_max_turns():
+    client = make_client()
+    first = tool_call_response(0)
+    results = client.handle_tool_response(
+        first, context={}, budget=ToolLoopBudget(max_turns=3)
+    )
+    assert "3 turns" in stop_reason(results)
+    assert len(client.sent) == 3
+
+
+def test_stops_on_repeated_identical_calls():
+    client = make_client(path_for=lambda i: "same.txt")
+    first = tool_call_response(0, "same.txt")
+    results = client.handle_tool_response(
+        first,
+        context={"repo_path": "/tmp"},
+        budget=ToolLoopBudget(max_repeated_calls=2),
+    )
+    assert "identical arguments" in stop_reason(results)
+    assert len(client.sent) == 2
+
+
+def test_stops_on_input_tokens():
+    client = make_client(input_tokens=400)
+    first = tool_call_response(0, input_tokens=400)
+    results = client.handle_tool_response(
+        first, context={}, budget=ToolLoopBudget(max_input_tokens=1000)
+    )
+    assert "input tokens" in stop_reason(results)
+    assert len(client.sent) == 2
+
+
+def test_stops_on_time(monkeypatch):
+    clock = itertools.count(0, 10)
+    monkeypatch.setattr(
+        "prometheus_swarm.utils.budget.time.monotonic", lambda: next(clock)
+    )
+    client = make_client()
+    results = client.handle_tool_response(
+        tool_call_response(0), context={}, budget=ToolLoopBudget(max_seconds=25)
+    )
+    assert "time limit" in stop_reason(results)
+
+
+def test_returns_last_results_when_agent_finishes():
+    client = make_client()
+    client.responses = iter([{"conversation_id": "conv", "content": []}])
+    results = client.handle_tool_response(
+        tool_call_response(0), context={}, budget=ToolLoopBudget(max_turns=3)
+    )
+    assert ast.literal_eval(results[0]["response"])["success"] is True
+
+
+def test_unanswered_tool_calls_get_stub_results():
+    client = make_client()
+    response = tool_call_response(1, "same.txt")
+    response["content"] += [
+        tool_call_response(2, "same.txt")["content"][0],
+        tool_call_response(3, "other.txt")["content"][0],
+    ]
+    results = client.handle_tool_response(
+        response, context={}, budget=ToolLoopBudget(max_repeated_calls=1)
+    )
+    assert "identical arguments" in stop_reason(results)
+    assert client.sent == []
+
+    # Every call of the last message is answered in the saved conversation
+    ((role, content),) = client.storage.messages
+    assert role == "tool"
+    assert [result["tool_call_id"] for result in content] == ["1", "2", "3"]
+    answers = [ast.literal_eval(result["response"]) for result in content]
+    assert answers[0]["success"] is True
+    assert all(answer["message"].startswith("Not run") for answer in answers[1:])
+
+
+def test_phase_reports_why_it_stopped(monkeypatch):
+    monkeypatch.setenv("COMMIT_BATCHING", "false")
+    client = make_client()
+    workflow = SimpleNamespace(
+        client=client,
+        context={},
+        prompts={"system_prompt": "", "task": "Read files"},
+    )
+    phase = WorkflowPhase(
+        workflow=workflow, prompt_name="task", budget=ToolLoopBudget(max_turns=2)
+    )
+    assert phase.execute() is None
+    assert "2 turns" in phase.stop_reason
+    assert phase.result["success"] is False
+    assert phase.result["stop_reason"] == phase.stop_reason
+
+
+@pytest.mark.parametrize("data", [["a.txt"], "text", None])
+def test_phase_results_with_any_data(data):
+    phase = WorkflowPhase(workflow=SimpleNamespace(prompts={"": ""}, context={}))
+    result = phase._parse_result(
+        {"response": str({"success": True, "message": "ok", "data": data})}
+    )
+    assert result["success"] is True
+    assert result["stop_reason"] is None
+
+
+def test_usage_comes_with_each_response():
+    barrier = threading.Barrier(2)
+
+    class UsageClient(FakeClient):
+        send_message = Client.send_message
+
+        def _make_api_call(self, messages, **kwargs):
+            tokens = len(messages[-1]["content"])
+            # Both threads are mid-call on the shared client
+            barrier.wait(timeout=5)
+            usage = SimpleNamespace(input_tokens=tokens, output_tokens=1)
+            return {"content": []}, self._parse_usage(usage)
+
+    client = UsageClient(None)
+    client.storage.get_conversation = lambda _: {"system_prompt": None}
+    client.storage.get_messages = lambda _: []
+    usage = {}
+
+    def send(prompt):
+        response = client.send_message(prompt=prompt, conversation_id="conv")
+        usage[prompt] = response["usage"]["input_tokens"]
+
+    threads = [threading.Thread(target=send, args=(p,)) for p in ("a", "bbbb")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert usage == {"a": 1, "bbbb": 4}
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("TOOL_LOOP_MAX_TURNS", "20")
+    monkeypatch.setenv("TOOL_LOOP_MAX_SECONDS", "90.5")
+    monkeypatch.delenv("TOOL_LOOP_MAX_INPUT_TOKENS", raising=False)
+    budget = ToolLoopBudget.from_env()
+    assert budget.max_turns == 20
+    assert budget.max_seconds == pytest.approx(90.5)
+    assert budget.max_input_tokens is None
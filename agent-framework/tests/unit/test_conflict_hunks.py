@@ -0,0 +1,170 @@
+"""Tests for resolving merge conflicts hunk by hunk."""
+
+import subprocess
+import threading
+import time
+
+import pytest
+
+from prometheus_swarm.utils.conflict_hunks import (
+    ConflictHunk,
+    auto_resolve,
+    parse_conflicts,
+    resolve_conflicts,
+    restore_line_ending,
+    validate_resolution,
+)
+
+
+def git(cwd, *args, check=True):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=check, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def hunk(base, ours, theirs):
+    return ConflictHunk(path="f.py", base=base, ours=ours, theirs=theirs)
+
+
+def test_parse_diff3_markers():
+    text = (
+        "a\n"
+        "<<<<<<< HEAD\nours\n||||||| base\nbase\n=======\ntheirs\n>>>>>>> pr\n"
+        "b\n"
+        "<<<<<<< HEAD\nx\n||||||| base\n=======\ny\n>>>>>>> pr\n"
+    )
+    segments = parse_conflicts("f.py", text, context_lines=1)
+    assert segments[0] == "a\n"
+    assert segments[2] == "b\n"
+    first, second = segments[1], segments[3]
+    assert (first.ours, first.base, first.theirs) == ("ours\n", "base\n", "theirs\n")
+    assert (first.before, first.after) == ("a\n", "b\n")
+    assert (second.ours, second.base, second.theirs) == ("x\n", "", "y\n")
+    assert (second.before, second.after) == ("b\n", "")
+
+
+def test_unbalanced_markers_raise():
+    with pytest.raises(ValueError):
+        parse_conflicts("f.py", "<<<<<<< HEAD\nours\n=======\ntheirs\n")
+
+
+@pytest.mark.parametrize(
+    "base, ours, theirs, expected",
+    [
+        # Identical changes
+        ("x = 1\n", "x = 2\n", "x = 2\n", "x = 2\n"),
+        # One-sided changes
+        ("x = 1\n", "x = 1\n", "x = 3\n", "x = 3\n"),
+        ("x = 1\n", "x = 2\n", "x = 1\n", "x = 2\n"),
+        # Whitespace-only changes on one side keep the other side's change
+        ("x = 1\n", "x  =  1   \n\n", "x = 3\n", "x = 3\n"),
+        ("x = 1\n", "x = 2\n", "x = 1 \n", "x = 2\n"),
+        # Changes differing only in whitespace
+        ("x = 1\n", "x = 2\n", "x =  2\n", "x = 2\n"),
+        # Real conflicts, including indentation changes
+        ("x = 1\n", "x = 2\n", "x = 3\n", None),
+        ("x = 1\n", "    x = 1\n", "x = 3\n", None),
+    ],
+)
+def test_auto_resolve(base, ours, theirs, expected):
+    assert auto_resolve(hunk(base, ours, theirs)) == expected
+
+
+def test_restore_line_ending():
+    assert restore_line_ending(hunk("a\n", "b\n", "c\n"), "d") == "d\n"
+    assert restore_line_ending(hunk("a\r\n", "b\r\n", "c"), "d") == "d\r\n"
+    assert restore_line_ending(hunk("a\n", "b\n", "c\n"), "d\n") == "d\n"
+    # At the end of a file without a final newline, nothing is added
+    assert restore_line_ending(hunk("a", "b", "c"), "d") == "d"
+    assert restore_line_ending(hunk("a\n", "b\n", "c\n"), "") == ""
+
+
+def test_validate_resolution():
+    assert validate_resolution("a.py", "x = 1\n") is None
+    assert "line 2" in validate_resolution("a.txt", "x\n<<<<<<< HEAD\n")
+    assert validate_resolution("a.py", "def f(:\n")
+    assert validate_resolution("a.json", "{") and not validate_resolution(
+        "a.json", "{}"
+    )
+
+
+@pytest.fixture
+def conflicted(tmp_path):
+    """A repository in the middle of a merge conflicting in three files."""
+    git(tmp_path, "init", "-q", "-b", "main")
+    git(tmp_path, "config", "user.email", "dev@example.com")
+    git(tmp_path, "config", "user.name", "Dev")
+    (tmp_path / "a.py").write_text("a = 1\n\n\nb = 1\n")
+    (tmp_path / "b.py").write_text("c = 1\n")
+    (tmp_path / "c.txt").write_text("one\n")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "Initial commit")
+
+    git(tmp_path, "checkout", "-q", "-b", "pr")
+    (tmp_path / "a.py").write_text("a = 2\n\n\nb = 2\n")
+    (tmp_path / "b.py").write_text("c = 2\n")
+    (tmp_path / "c.txt").write_text("two \n")
+    git(tmp_path, "commit", "-q", "-am", "PR change")
+
+    git(tmp_path, "checkout", "-q", "main")
+    (tmp_path / "a.py").write_text("a = 3\n\n\nb = 3\n")
+    (tmp_path / "b.py").write_text("c = 3\n")
+    (tmp_path / "c.txt").write_text("one  \n")
+    git(tmp_path, "commit", "-q", "-am", "Main change")
+    git(tmp_path, "merge", "--no-commit", "pr", check=False)
+    return tmp_path
+
+
+def test_resolves_hunks_concurrently(conflicted):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def resolve_hunk(hunk):
+        with lock:
+            active.append(hunk)
+            peak.append(len(active))
+        time.sleep(0.2)
+        with lock:
+            active.remove(hunk)
+        return f"{hunk.ours.strip()}  # or {hunk.theirs.strip()}\n"
+
+    result = resolve_conflicts(str(conflicted), resolve_hunk, workers=4)
+
+    assert result["resolved"] == ["a.py", "b.py", "c.txt"]
+    assert result["unresolved"] == []
+    # c.txt only changed whitespace on our side
+    assert (result["hunks"], result["auto_resolved"]) == (4, 1)
+    assert max(peak) == 3
+    assert (conflicted / "a.py").read_text() == (
+        "a = 3  # or a = 2\n\n\nb = 3  # or b = 2\n"
+    )
+    assert (conflicted / "c.txt").read_text() == "two \n"
+    assert git(conflicted, "diff", "--name-only", "--diff-filter=U") == ""
+
+
+def test_invalid_resolutions_are_left_conflicted(conflicted):
+    def resolve_hunk(hunk):
+        if hunk.path == "b.py":
+            return "c = (\n"
+        return None if "b = 3" in hunk.ours else hunk.theirs
+
+    result = resolve_conflicts(str(conflicted), resolve_hunk)
+
+    assert result["resolved"] == ["c.txt"]
+    assert result["unresolved"] == ["a.py", "b.py"]
+    unmerged = git(conflicted, "diff", "--name-only", "--diff-filter=U")
+    assert unmerged.splitlines() == ["a.py", "b.py"]
+    # The files left for the caller show the ancestor between the sides
+    assert "||||||| " in (conflicted / "b.py").read_text()
+
+
+def test_resolution_without_final_newline_keeps_next_line(conflicted):
+    # A model's answer often drops the final newline
+    result = resolve_conflicts(
+        str(conflicted), lambda hunk: hunk.ours.strip() + " # merged"
+    )
+    assert result["resolved"] == ["a.py", "b.py", "c.txt"]
+    assert (conflicted / "a.py").read_text() == (
+        "a = 3 # merged\n\n\nb = 3 # merged\n"
+    )
@@ -0,0 +1,182 @@
+"""Tests for predicting conflicts between PRs from their diffs."""
+
+import json
+import subprocess
+
+from git import Repo
+
+from prometheus_swarm.utils.conflict_index import (
+    WHOLE_FILE,
+    ConflictIndex,
+    parse_diff,
+    ranges_overlap,
+)
+
+DIFF = """\
+diff --git a/src/app.py b/src/app.py
+index 1111111..2222222 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -3,2 +3,3 @@ def main():
+-    a = 1
+-    b = 2
++    a = 10
++    b = 20
++    c = 30
+@@ -10,0 +12 @@ def main():
++    return c
+@@ -20 +22 @@ def helper():
+-    pass
++    return None
+diff --git a/docs/with space.md b/docs/with space.md
+new file mode 100644
+--- /dev/null
++++ b/docs/with space.md
+@@ -0,0 +1,2 @@
++# Docs
++
+diff --git a/logo.png b/logo.png
+index 3333333..4444444 100644
+Binary files a/logo.png and b/logo.png differ
+diff --git "a/t\\303\\251 \\"x\\".py" "b/t\\303\\251 \\"x\\".py"
+index 5555555..6666666 100644
+--- "a/t\\303\\251 \\"x\\".py"
++++ "b/t\\303\\251 \\"x\\".py"
+@@ -7 +7 @@
+-old
++new
+"""
+
+
+def test_parse_diff():
+    assert parse_diff(DIFF) == {
+        "src/app.py": [(3, 4), (10, 11), (20, 20)],
+        "docs/with space.md": [(0, 1)],
+        "logo.png": [WHOLE_FILE],
+        't\u00e9 "x".py': [(7, 7)],
+    }
+
+
+def test_ranges_overlap_when_touching():
+    assert ranges_overlap([(3, 4)], [(4, 8)])
+    assert ranges_overlap([(3, 4)], [(5, 8)])
+    assert not ranges_overlap([(3, 4)], [(6, 8)])
+    assert ranges_overlap([(1, 1), (50, 60)], [WHOLE_FILE])
+
+
+def index():
+    return ConflictIndex(
+        {
+            "late": {"app.py": [(1, 5)], "util.py": [(10, 12)]},
+            "a": {"app.py": [(1, 2)]},
+            "b": {"util.py": [(11, 11)], "readme.md": [(1, 1)]},
+            "c": {"app.py": [(40, 45)]},
+            "d": {"other.py": [(1, 1)]},
+        }
+    )
+
+
+def test_overlap_graph():
+    graph = index().graph
+    assert graph["late"]["a"] == {"files": ["app.py"], "lines": ["app.py"]}
+    assert graph["a"]["late"] is graph["late"]["a"]
+    # Same file, distant lines: an overlap but no predicted conflict
+    assert graph["late"]["c"] == {"files": ["app.py"], "lines": []}
+    assert graph["d"] == {}
+
+
+def test_groups_and_order():
+    conflict_index = index()
+    assert conflict_index.conflicts("late") == ["a", "b"]
+    assert conflict_index.groups() == [["late", "a", "b"], ["c"], ["d"]]
+    # The PR conflicting with most others goes last, not first
+    assert conflict_index.merge_order() == ["d", "c", "b", "a", "late"]
+    assert conflict_index.merge_order(last=["d"]) == ["c", "b", "a", "late", "d"]
+
+
+def test_stats_and_serialization():
+    data = index().to_dict()
+    assert data["stats"] == {
+        "prs": 5,
+        "files": 4,
+        "overlapping_pairs": 4,
+        "predicted_conflicts": 2,
+        "groups": 3,
+        "largest_group": 3,
+        "shared_files": [
+            {"path": "app.py", "prs": 3},
+            {"path": "util.py", "prs": 2},
+        ],
+    }
+    assert data["groups"][0] == ["late", "a", "b"]
+    json.dumps(data)
+
+
+def test_only_prs_sharing_files_are_compared(monkeypatch):
+    calls = []
+    original = ranges_overlap
+
+    def counting(a, b):
+        calls.append((a, b))
+        return original(a, b)
+
+    monkeypatch.setattr(
+        "prometheus_swarm.utils.conflict_index.ranges_overlap", counting
+    )
+    # 500 PRs touching their own file, and two sharing one
+    changes = {f"pr-{i}": {f"file-{i}.py": [(1, 1)]} for i in range(500)}
+    changes["pr-0"]["shared.py"] = [(1, 1)]
+    changes["pr-1"]["shared.py"] = [(9, 9)]
+
+    conflict_index = ConflictIndex(changes)
+    assert len(calls) == 1
+    assert conflict_index.stats()["overlapping_pairs"] == 1
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def test_from_repo(tmp_path):
+    git(tmp_path, "init", "-q", "-b", "main")
+    git(tmp_path, "config", "user.email", "dev@example.com")
+    git(tmp_path, "config", "user.name", "Dev")
+    (tmp_path / "app.py").write_text("".join(f"line {i}\n" for i in range(1, 31)))
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "Initial commit")
+
+    edits = {"top": 2, "also-top": 3, "bottom": 28}
+    for name, line in edits.items():
+        git(tmp_path, "checkout", "-q", "-b", name, "main")
+        lines = (tmp_path / "app.py").read_text().splitlines(keepends=True)
+        lines[line - 1] = f"changed on {name}\n"
+        (tmp_path / "app.py").write_text("".join(lines))
+        git(tmp_path, "commit", "-q", "-am", f"Change on {name}")
+    git(tmp_path, "checkout", "-q", "main")
+
+    conflict_index = ConflictIndex.from_repo(
+        Repo(tmp_path), "main", {name: name for name in edits}
+    )
+    assert conflict_index.changes["top"] == {"app.py": [(2, 2)]}
+    assert conflict_index.conflicts("top") == ["also-top"]
+    assert conflict_index.conflicts("bottom") == []
+    assert conflict_index.merge_order() == ["bottom", "top", "also-top"]
+
+
+def test_from_repo_with_quoted_paths(tmp_path):
+    git(tmp_path, "init", "-q", "-b", "main")
+    git(tmp_path, "config", "user.email", "dev@example.com")
+    git(tmp_path, "config", "user.name", "Dev")
+    path = tmp_path / "docs" / "caf\u00e9 menu.md"
+    path.parent.mkdir()
+    path.write_text("one\ntwo\n", encoding="utf-8")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "Initial commit")
+    git(tmp_path, "checkout", "-q", "-b", "edit")
+    path.write_text("one\n2\n", encoding="utf-8")
+    git(tmp_path, "commit", "-q", "-am", "Edit")
+
+    conflict_index = ConflictIndex.from_repo(Repo(tmp_path), "main", {"edit": "edit"})
+    assert conflict_index.changes["edit"] == {"docs/caf\u00e9 menu.md": [(2, 2)]}
@@ -0,0 +1,45 @@
+"""Tests for database sessions shared with worker threads."""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+
+from prometheus_swarm.database import database
+from prometheus_swarm.database.database import get_db, get_session
+
+
+def test_worker_threads_get_their_own_session():
+    app = Flask(__name__)
+    with app.app_context():
+        request_session = get_db()
+        assert get_db() is request_session
+
+        def use_session():
+            with get_session() as session:
+                return session, session is request_session
+
+        # Workers copy the request's context, app context included
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = [
+                executor.submit(contextvars.copy_context().run, use_session).result()
+                for _ in range(2)
+            ]
+        assert [shared for _, shared in results] == [False, False]
+        assert results[0][0] is not results[1][0]
+
+        # The request's own session stays open for the rest of the request
+        with get_session() as session:
+            assert session is request_session
+        assert request_session.is_active
+        request_session.close()
+
+
+def test_sessions_outside_flask_are_closed(monkeypatch):
+    closed = []
+    session = database.Session()
+    monkeypatch.setattr(session, "close", lambda: closed.append(True))
+    monkeypatch.setattr(database, "Session", lambda: session)
+    with get_session():
+        pass
+    assert closed == [True]
@@ -0,0 +1,116 @@
+"""Tests for distribution list validation, with locally generated keypairs."""
+
+import json
+
+import base58
+import nacl.signing
+import pytest
+
+from prometheus_swarm.utils import distribution
+from prometheus_swarm.utils.github_batch import PullRequestInfo
+from prometheus_swarm.utils.signatures import get_verify_key, verify_signature
+
+TASK_ID = "task"
+ROUND = 3
+
+
+def make_node(i, signing_key=None, payload=None):
+    signing_key = signing_key or nacl.signing.SigningKey.generate()
+    staking_key = base58.b58encode(bytes(signing_key.verify_key)).decode()
+    payload = payload or {
+        "taskId": TASK_ID,
+        "roundNumber": ROUND,
+        "stakingKey": staking_key,
+        "action": "task",
+    }
+    signature = base58.b58encode(
+        signing_key.sign(json.dumps(payload).encode())
+    ).decode()
+    url = f"https://github.com/worker{i}/repo/pull/{i}"
+    node = {
+        "prUrl": url,
+        "taskId": TASK_ID,
+        "roundNumber": ROUND,
+        "stakingKey": staking_key,
+    }
+    body = (
+        "## Changes\n\n<!-- BEGIN_STAKING_KEY -->\n"
+        f"{staking_key}:{signature}\n<!-- END_STAKING_KEY -->"
+    )
+    return node, body
+
+
+def distribution_list(nodes, monkeypatch):
+    """Serve the nodes' PR bodies instead of fetching them from GitHub."""
+    bodies = {node["prUrl"]: body for node, body in nodes}
+
+    def fetch_pull_requests(urls, **kwargs):
+        return {
+            url: (
+                PullRequestInfo(
+                    url, 1, bodies[url], None, "open", False, "", None, "", None
+                )
+                if url in bodies
+                else None
+            )
+            for url in urls
+        }
+
+    monkeypatch.setattr(distribution, "fetch_pull_requests", fetch_pull_requests)
+    monkeypatch.setattr(
+        distribution, "remove_leaders", lambda distribution_list, **_: distribution_list
+    )
+    return {f"node{i}": node for i, (node, _) in enumerate(nodes)}
+
+
+def test_invalid_entries_are_dropped(monkeypatch):
+    valid = make_node(0)
+    other_key = make_node(1)[0]["stakingKey"]
+    signing_key = nacl.signing.SigningKey.generate()
+    wrong_round = make_node(
+        2,
+        signing_key,
+        payload={
+            "taskId": TASK_ID,
+            "roundNumber": ROUND + 1,
+            "stakingKey": base58.b58encode(bytes(signing_key.verify_key)).decode(),
+            "action": "task",
+        },
+    )
+    tampered_node, tampered_body = make_node(3)
+    tampered_body = tampered_body.replace(":", ":1", 1)
+    mismatch_node, mismatch_body = make_node(4)
+    mismatch_node = dict(mismatch_node, stakingKey=other_key)
+    missing_node, _ = make_node(5)
+
+    nodes = [
+        valid,
+        wrong_round,
+        (tampered_node, tampered_body),
+        (mismatch_node, mismatch_body),
+    ]
+    dist = distribution_list(nodes, monkeypatch)
+    dist["node5"] = missing_node
+
+    for workers in (1, 4):
+        validated, error = distribution.validate_distribution_list(
+            dist, "owner", "repo", workers=workers
+        )
+        assert error is None
+        assert list(validated) == [valid[0]["stakingKey"]]
+
+
+def test_verify_keys_are_reused():
+    get_verify_key.cache_clear()
+    node, body = make_node(0)
+    for _ in range(3):
+        assert distribution._verify_node(node, body)
+    info = get_verify_key.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+@pytest.mark.parametrize("staking_key", ["not base58 0OIl", "1111", None])
+def test_bad_keys_fail_verification(staking_key):
+    _, body = make_node(0)
+    signature = body.split(":")[1].split("\n")[0]
+    assert "error" in verify_signature(signature, staking_key)
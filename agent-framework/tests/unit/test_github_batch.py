@@ -0,0 +1,140 @@
+"""Tests for batched pull request fetching, against a local fake API server."""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from prometheus_swarm.utils.github_batch import fetch_pull_requests, parse_pr_url
+from prometheus_swarm.utils.github_gateway import GitHubGateway
+
+# PRs the server knows about; 3 is only visible over REST
+PULLS = {1: "alice", 2: "bob", 3: "carol"}
+GRAPHQL_PULLS = {1, 2}
+
+
+def rest_pull(base, number):
+    return {
+        "url": f"{base}/repos/owner/repo/pulls/{number}",
+        "number": number,
+        "body": f"body {number}",
+        "state": "open",
+        "merged": False,
+        "user": {"login": PULLS[number]},
+        "head": {"ref": f"pr-{number}", "repo": {"full_name": "fork/repo"}},
+        "base": {"ref": "main", "repo": {"full_name": "owner/repo"}},
+    }
+
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    requests = Counter()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        base = f"http://{self.headers['Host']}"
+        path = self.path.split("?")[0]
+        self.requests[path] += 1
+        if path == "/repos/owner/repo":
+            self._reply(200, {"url": f"{base}{path}", "full_name": "owner/repo"})
+            return
+        number = int(path.rsplit("/", 1)[-1]) if path[-1].isdigit() else None
+        if path.startswith("/repos/owner/repo/pulls/") and number in PULLS:
+            self._reply(200, rest_pull(base, number))
+        else:
+            self._reply(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        self.requests[self.path] += 1
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        variables = payload["variables"]
+        data, errors = {}, []
+        i = 0
+        while f"n{i}" in variables:
+            number = variables[f"n{i}"]
+            if number in GRAPHQL_PULLS:
+                data[f"pr{i}"] = {
+                    "pullRequest": {
+                        "number": number,
+                        "body": f"body {number}",
+                        "state": "MERGED" if number == 2 else "OPEN",
+                        "merged": number == 2,
+                        "author": {"login": PULLS[number]},
+                        "headRefName": f"pr-{number}",
+                        "baseRefName": "main",
+                        "headRepository": {"nameWithOwner": "fork/repo"},
+                        "baseRepository": {"nameWithOwner": "owner/repo"},
+                    }
+                }
+            else:
+                data[f"pr{i}"] = None
+                errors.append({"type": "NOT_FOUND", "path": [f"pr{i}"]})
+            i += 1
+        self._reply(200, {"data": data, "errors": errors})
+
+    def _reply(self, status, document):
+        body = json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-RateLimit-Limit", "5000")
+        self.send_header("X-RateLimit-Remaining", "4000")
+        self.send_header("X-RateLimit-Reset", str(int(time.time() + 3600)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    FakeGitHub.requests = Counter()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHub)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def gateway(server, token="token"):
+    return GitHubGateway(
+        token, base_url=server, ttl=60, seconds_between_requests=0, retry=0
+    )
+
+
+URLS = [f"https://github.com/owner/repo/pull/{n}" for n in (1, 2, 3, 4)]
+
+
+def test_parse_pr_url():
+    assert parse_pr_url(" https://github.com/a/b/pull/12 ") == ("a", "b", 12)
+    assert parse_pr_url("https://github.com/a/b/issues/12") is None
+    assert parse_pr_url(None) is None
+
+
+def test_graphql_batch_with_rest_fallback(server):
+    results = fetch_pull_requests(
+        URLS + [URLS[0], "not a url"], gateway=gateway(server)
+    )
+
+    assert FakeGitHub.requests["/graphql"] == 1
+    # Only the PRs GraphQL didn't return are fetched over REST
+    assert FakeGitHub.requests["/repos/owner/repo/pulls/1"] == 0
+    assert FakeGitHub.requests["/repos/owner/repo/pulls/3"] == 1
+    assert FakeGitHub.requests["/repos/owner/repo/pulls/4"] == 1
+
+    assert list(results) == URLS + ["not a url"]
+    assert results[URLS[0]].author == "alice"
+    assert results[URLS[1]].merged and results[URLS[1]].state == "closed"
+    assert results[URLS[2]].author == "carol"
+    assert results[URLS[2]].head_repo == "fork/repo"
+    assert results[URLS[3]] is None
+    assert results["not a url"] is None
+
+
+def test_unauthenticated_uses_rest(server):
+    results = fetch_pull_requests(URLS[:2], gateway=gateway(server, token=None))
+
+    assert FakeGitHub.requests["/graphql"] == 0
+    assert results[URLS[0]].body == "body 1"
+    assert results[URLS[1]].author == "bob"
@@ -0,0 +1,58 @@
+"""Tests for sharing the GitHub rate limit between subsystems."""
+
+from types import SimpleNamespace
+
+from prometheus_swarm.tools.github_operations.implementations import (
+    _defer_low_priority,
+)
+from prometheus_swarm.utils.github_budget import (
+    CRITICAL,
+    LOW,
+    GitHubBudget,
+    github_subsystem,
+)
+
+
+def test_usage_is_charged_to_the_active_subsystem():
+    budget = GitHubBudget(shares={"audit": 0.5, "task": 0.3})
+    budget.observe(5000, 5000, 100)
+    with github_subsystem("task"):
+        budget.observe(4990, 5000, 100)
+    with github_subsystem("audit"):
+        budget.observe(4985, 5000, 100)
+    budget.observe(4984, 5000, 100)
+    assert budget.used == {"task": 10, "audit": 5, "other": 1}
+
+    # A new window starts counting afresh
+    budget.observe(4999, 5000, 3700)
+    assert budget.used == {}
+    assert budget.metrics()["quotas"] == {"audit": 2500, "task": 1500}
+
+
+def test_allow_when_budget_is_low():
+    budget = GitHubBudget(shares={"audit": 0.5, "task": 0.01}, low_water=0.25)
+    budget.observe(5000, 5000, 100)
+    assert budget.allow(LOW)
+
+    with github_subsystem("task"):
+        budget.observe(1000, 5000, 100)
+        # Over its share with the pool low
+        assert not budget.allow()
+    with github_subsystem("audit"):
+        assert budget.priority() == CRITICAL
+        assert budget.allow()
+    assert budget.allow(subsystem="audit")
+    assert not budget.allow(LOW)
+
+
+def test_low_priority_calls_are_deferred():
+    budget = GitHubBudget()
+    gh = SimpleNamespace(budget=budget)
+    budget.observe(5000, 5000, 0)
+    assert _defer_low_priority(gh, "star_repository") is None
+
+    budget.observe(100, 5000, 0)
+    result = _defer_low_priority(gh, "star_repository")
+    assert result["success"] is False
+    assert result["data"]["deferred"] is True
+    assert budget.metrics()["deferred"] == {"star_repository": 1}
@@ -0,0 +1,127 @@
+"""Tests for the cached GitHub gateway, against a local fake API server."""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from prometheus_swarm.utils.github_gateway import GitHubGateway
+
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    """Serves a repository and a pull request with ETags and rate limit headers."""
+
+    requests = Counter()
+    not_modified = Counter()
+    versions = {}
+    remaining = 5000
+    reset = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        base = f"http://{self.headers['Host']}"
+        documents = {
+            "/repos/owner/repo": {
+                "url": f"{base}/repos/owner/repo",
+                "name": "repo",
+                "full_name": "owner/repo",
+                "owner": {"login": "owner"},
+            },
+            "/repos/owner/repo/pulls/7": {
+                "url": f"{base}/repos/owner/repo/pulls/7",
+                "number": 7,
+                "body": f"version {self.versions.get('pull', 1)}",
+            },
+        }
+        path = self.path.split("?")[0]
+        document = documents.get(path)
+        self.requests[path] += 1
+        if document is None:
+            self._reply(404, {"message": "Not Found"})
+            return
+        etag = f'"{hash(json.dumps(document))}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.not_modified[path] += 1
+            self._reply(304, None, etag)
+        else:
+            type(self).remaining -= 1
+            self._reply(200, document, etag)
+
+    def _reply(self, status, document, etag=None):
+        body = json.dumps(document).encode() if document is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-RateLimit-Limit", "5000")
+        self.send_header("X-RateLimit-Remaining", str(self.remaining))
+        self.send_header("X-RateLimit-Reset", str(int(self.reset)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    FakeGitHub.requests = Counter()
+    FakeGitHub.not_modified = Counter()
+    FakeGitHub.versions = {}
+    FakeGitHub.remaining = 5000
+    FakeGitHub.reset = time.time() + 3600
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHub)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def gateway(server, **kwargs):
+    return GitHubGateway(
+        "token", base_url=server, seconds_between_requests=0, retry=0, **kwargs
+    )
+
+
+def test_repeated_lookups_hit_the_cache(server):
+    gh = gateway(server, ttl=60)
+    for _ in range(5):
+        assert gh.get_repo("owner/repo").full_name == "owner/repo"
+        assert gh.get_pull("owner/repo", 7).number == 7
+    assert FakeGitHub.requests["/repos/owner/repo"] == 1
+    assert FakeGitHub.requests["/repos/owner/repo/pulls/7"] == 1
+    assert gh.rate_limit()["remaining"] == 4998
+
+
+def test_expired_entries_are_revalidated_with_etags(server):
+    gh = gateway(server, ttl=0)
+    gh.get_pull("owner/repo", 7)
+    pr = gh.get_pull("owner/repo", 7)
+    assert FakeGitHub.not_modified["/repos/owner/repo/pulls/7"] == 1
+    assert pr.body == "version 1"
+
+    FakeGitHub.versions["pull"] = 2
+    assert gh.get_pull("owner/repo", 7).body == "version 2"
+    assert gh.stats["revalidated"] == 2
+
+
+def test_lru_eviction_and_passthrough(server):
+    gh = gateway(server, ttl=60, max_entries=1)
+    gh.get_repo("owner/repo")
+    gh.get_pull("owner/repo", 7)
+    gh.get_repo("owner/repo")
+    assert FakeGitHub.requests["/repos/owner/repo"] == 2
+    # Anything else goes to the underlying client
+    assert gh.get_repo("owner/repo").owner.login == "owner"
+    assert gh.requester is gh.client.requester
+
+
+def test_throttles_when_rate_limit_is_low(server):
+    gh = gateway(server, rate_limit_reserve=100)
+    assert gh.throttle_delay() == 0
+    FakeGitHub.remaining = 11
+    FakeGitHub.reset = time.time() + 100
+    gh.get_repo("owner/repo")
+    assert 5 < gh.throttle_delay() <= 10
@@ -0,0 +1,210 @@
+"""Tests for idempotent GitHub writes."""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from github import GithubException
+
+from prometheus_swarm.tools.github_operations import implementations
+from prometheus_swarm.utils.github_gateway import GitHubGateway
+from prometheus_swarm.utils.github_outbox import (
+    DONE,
+    GitHubOutbox,
+    idempotency_key,
+    outbox_path,
+)
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return GitHubOutbox(str(tmp_path / "outbox.db"), base_delay=0)
+
+
+def flaky(results, calls):
+    """A write failing with each exception in results before returning."""
+
+    def write():
+        calls["write"] += 1
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return write
+
+
+def test_key_requires_task():
+    assert idempotency_key(None, 1, "review") is None
+    assert idempotency_key("task", 1, "review", "o/r#2") == "task:1:review:o/r#2"
+
+
+def test_done_writes_are_not_repeated(outbox):
+    calls = Counter()
+    write = flaky([{"url": "a"}], calls)
+    assert outbox.send("k", write) == {"url": "a"}
+    assert outbox.send("k", write) == {"url": "a"}
+    assert calls["write"] == 1
+    assert outbox.get("k")["status"] == DONE
+
+
+def test_retry_finds_write_that_lost_its_response(outbox):
+    calls = Counter()
+    created = []
+
+    def write():
+        calls["write"] += 1
+        created.append("comment")
+        raise GithubException(502, {"message": "Bad Gateway"})
+
+    def find_existing():
+        calls["find"] += 1
+        return {"url": "a"} if created else None
+
+    assert outbox.send("k", write, find_existing) == {"url": "a"}
+    assert calls == {"write": 1, "find": 1}
+
+
+def test_permanent_errors_are_not_retried(outbox):
+    calls = Counter()
+    write = flaky([GithubException(422, {"message": "Invalid"})], calls)
+    with pytest.raises(GithubException):
+        outbox.send("k", write)
+    assert calls["write"] == 1
+
+    # The key stays pending, so the next attempt checks for an earlier write first
+    assert outbox.get("k")["status"] == "pending"
+    find = Counter()
+    outbox.send("k", lambda: {"url": "b"}, lambda: find.update(["find"]))
+    assert find["find"] == 1
+
+
+def test_path_is_fixed_before_changing_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GITHUB_OUTBOX_PATH", "outbox.db")
+    outbox = GitHubOutbox()
+    assert outbox.path == str(tmp_path / "outbox.db")
+
+    # A workflow moving into its clone keeps using the same file
+    clone = tmp_path / "clone"
+    clone.mkdir()
+    monkeypatch.chdir(clone)
+    outbox.send("k", lambda: {"url": "a"})
+    assert outbox.get("k")["status"] == DONE
+    assert not (clone / "outbox.db").exists()
+
+
+def test_default_path_is_outside_the_workspace(monkeypatch):
+    monkeypatch.delenv("GITHUB_OUTBOX_PATH", raising=False)
+    path = outbox_path()
+    assert os.path.isabs(path)
+    assert path.startswith(os.path.expanduser("~"))
+
+
+def test_send_many(outbox):
+    calls = Counter()
+    writes = [
+        {"key": "a", "write": flaky([{"n": 1}], calls)},
+        {"key": None, "write": flaky([GithubException(503, None), {"n": 2}], calls)},
+        {"key": "c", "write": flaky([GithubException(404, None)], calls)},
+    ]
+    results = outbox.send_many(writes, workers=3)
+    assert results[0] == {"success": True, "data": {"n": 1}}
+    assert results[1] == {"success": True, "data": {"n": 2}}
+    assert not results[2]["success"]
+    assert calls["write"] == 4
+
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    """Creates PRs, answering the first creation with a 502 nonetheless."""
+
+    pulls = []
+    requests = Counter()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        base = f"http://{self.headers['Host']}"
+        path, _, query = self.path.partition("?")
+        self.requests[f"GET {path}"] += 1
+        if path == "/repos/owner/repo":
+            self._reply(200, {"url": f"{base}{path}", "full_name": "owner/repo"})
+        elif path == "/repos/owner/repo/pulls":
+            head = "worker%3Afeature" in query or "worker:feature" in query
+            self._reply(200, [pull for pull in self.pulls if head])
+        else:
+            self._reply(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        self.requests[f"POST {self.path}"] += 1
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        number = len(self.pulls) + 1
+        self.pulls.append(
+            {
+                "number": number,
+                "title": payload["title"],
+                "html_url": f"https://github.com/owner/repo/pull/{number}",
+            }
+        )
+        if number == 1:
+            self._reply(502, {"message": "Bad Gateway"})
+        else:
+            self._reply(201, self.pulls[-1])
+
+    def _reply(self, status, document):
+        body = json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-RateLimit-Limit", "5000")
+        self.send_header("X-RateLimit-Remaining", "4000")
+        self.send_header("X-RateLimit-Reset", str(int(time.time() + 3600)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def test_pull_request_is_created_once(outbox, monkeypatch):
+    FakeGitHub.pulls = []
+    FakeGitHub.requests = Counter()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHub)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    gh = GitHubGateway(
+        "token",
+        base_url=f"http://127.0.0.1:{httpd.server_address[1]}",
+        seconds_between_requests=0,
+        retry=0,
+    )
+    monkeypatch.setattr(implementations, "_get_github_client", lambda token: gh)
+    monkeypatch.setattr(implementations, "get_outbox", lambda: outbox)
+    monkeypatch.setattr(implementations, "flush_commits", lambda **_: {"success": True})
+
+    def create():
+        return implementations.create_pull_request(
+            repo_owner="owner",
+            repo_name="repo",
+            head_branch="feature",
+            pr_template="{title}",
+            github_token="token",
+            github_username="worker",
+            data={"title": "Feature"},
+            task_id="task",
+            round_number=1,
+        )
+
+    try:
+        for _ in range(2):
+            result = create()
+            assert result["success"], result["message"]
+            assert result["data"]["pr_url"].endswith("/pull/1")
+    finally:
+        httpd.shutdown()
+
+    assert len(FakeGitHub.pulls) == 1
+    assert FakeGitHub.requests["POST /repos/owner/repo/pulls"] == 1
+    # Checked for an open PR before creating, and again before retrying
+    assert FakeGitHub.requests["GET /repos/owner/repo/pulls"] == 2
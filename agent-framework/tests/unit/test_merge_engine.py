@@ -0,0 +1,101 @@
+"""Tests for merging branches in memory with git merge-tree."""
+
+import subprocess
+
+import pytest
+
+from prometheus_swarm.utils.merge_engine import MergeCandidate, MergeEngine
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q", "-b", "main")
+    git(tmp_path, "config", "user.email", "dev@example.com")
+    git(tmp_path, "config", "user.name", "Dev")
+    for name in ("a.txt", "b.txt", "shared.txt"):
+        (tmp_path / name).write_text(f"{name}\n")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "Initial commit")
+    return tmp_path
+
+
+def branch(repo, name, files):
+    """Commit files on a new branch off main, leaving main checked out."""
+    git(repo, "checkout", "-q", "-b", name, "main")
+    for path, content in files.items():
+        (repo / path).write_text(content)
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", f"Change on {name}")
+    git(repo, "checkout", "-q", "main")
+    return MergeCandidate(ref=name, message=f"Merged branch {name}", key=name)
+
+
+def test_clean_merges_in_one_pass(repo):
+    candidates = [
+        branch(repo, "pr-1", {"a.txt": "one\n"}),
+        branch(repo, "pr-2", {"b.txt": "two\n"}),
+        branch(repo, "pr-3", {"c.txt": "three\n"}),
+    ]
+    result = MergeEngine(str(repo)).merge("main", candidates)
+
+    assert [c.key for c in result.merged] == ["pr-1", "pr-2", "pr-3"]
+    assert result.conflicting == []
+    assert git(repo, "rev-parse", "main") == result.head
+    log = git(repo, "log", "--first-parent", "--format=%s", "-3", "main")
+    assert log.splitlines() == [
+        "Merged branch pr-3",
+        "Merged branch pr-2",
+        "Merged branch pr-1",
+    ]
+    # Every merge commit has the branch and the PR as parents
+    for n in range(3):
+        parents = git(repo, "rev-list", "--parents", "-n", "1", f"main~{n}").split()
+        assert len(parents) == 3
+    # The checked-out working tree follows the branch
+    assert (repo / "c.txt").read_text() == "three\n"
+    assert git(repo, "status", "--porcelain") == ""
+
+
+def test_conflicting_candidates_are_left_for_the_caller(repo):
+    candidates = [
+        branch(repo, "pr-1", {"shared.txt": "one\n"}),
+        branch(repo, "pr-2", {"shared.txt": "two\n"}),
+    ]
+    result = MergeEngine(str(repo)).merge("main", candidates, order=False)
+
+    assert [c.key for c in result.merged] == ["pr-1"]
+    assert [c.key for c in result.conflicting] == ["pr-2"]
+    assert (repo / "shared.txt").read_text() == "one\n"
+
+    check = MergeEngine(str(repo)).check("main", candidates[1])
+    assert not check.clean
+    assert check.conflicts == ["shared.txt"]
+
+
+def test_plan_merges_least_overlapping_first(repo):
+    candidates = [
+        branch(repo, "wide", {"a.txt": "wide\n", "b.txt": "wide\n"}),
+        branch(repo, "only-a", {"a.txt": "a\n"}),
+        branch(repo, "only-b", {"b.txt": "b\n"}),
+        branch(repo, "alone", {"c.txt": "c\n"}),
+    ]
+    ordered, index = MergeEngine(str(repo)).plan("main", candidates)
+
+    assert [c.key for c in ordered] == ["alone", "only-a", "only-b", "wide"]
+    assert set(index.conflicts("wide")) == {"only-a", "only-b"}
+    assert index.conflicts("alone") == []
+
+    # Ordering merges both narrow PRs; in the given order, only the wide one
+    result = MergeEngine(str(repo)).merge("main", candidates)
+    assert {c.key for c in result.conflicting} == {"wide"}
+
+
+def test_unknown_ref_raises(repo):
+    with pytest.raises(RuntimeError):
+        MergeEngine(str(repo)).check("main", MergeCandidate("missing", "m"))
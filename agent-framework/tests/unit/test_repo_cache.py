@@ -0,0 +1,105 @@
+"""Tests for the repository mirror cache and clone pool."""
+
+import subprocess
+
+import pytest
+
+from prometheus_swarm.utils import repo_cache
+from prometheus_swarm.utils.repo_cache import (
+    clone_repository_cached,
+    mirror_path,
+    warm_pool,
+)
+
+
+def git(*args, cwd):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def commit(path, name, content):
+    (path / name).write_text(content)
+    git("add", "-A", cwd=path)
+    git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", name, cwd=path)
+    return git("rev-parse", "HEAD", cwd=path)
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    monkeypatch.setenv("REPO_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(repo_cache, "MIRROR_FETCH_INTERVAL", 0)
+    path = tmp_path / "upstream"
+    path.mkdir()
+    git("init", "-q", "-b", "main", cwd=path)
+    commit(path, "a.txt", "a\n")
+    return path
+
+
+def test_clone_borrows_from_mirror_and_is_independent(upstream, tmp_path):
+    fork = tmp_path / "fork"
+    git("clone", "-q", str(upstream), str(fork), cwd=tmp_path)
+    fork_head = commit(fork, "b.txt", "b\n")
+
+    target = tmp_path / "work"
+    repo = clone_repository_cached(
+        str(fork), str(target), reference_url=str(upstream)
+    )
+    assert repo.head.commit.hexsha == fork_head
+    assert (mirror_path(str(upstream)) / "HEAD").exists()
+    # Dissociated: no alternates left pointing into the cache
+    assert not (target / ".git" / "objects" / "info" / "alternates").exists()
+
+    # Mirror picks up new upstream commits
+    upstream_head = commit(upstream, "c.txt", "c\n")
+    clone_repository_cached(
+        str(upstream), str(tmp_path / "work2"), reference_url=str(upstream)
+    )
+    assert git("rev-parse", "main", cwd=mirror_path(str(upstream))) == upstream_head
+
+
+def test_falls_back_to_direct_clone(upstream, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        repo_cache, "update_mirror", lambda *a: (_ for _ in ()).throw(OSError("x"))
+    )
+    repo = clone_repository_cached(str(upstream), str(tmp_path / "work"))
+    assert (tmp_path / "work" / "a.txt").exists()
+    assert repo.active_branch.name == "main"
+
+
+def test_pool_clones_are_reused_and_updated(upstream, tmp_path, monkeypatch):
+    monkeypatch.setenv("REPO_POOL_SIZE", "1")
+    warm_pool(str(upstream), background=False)
+    pool = repo_cache._pool_dir(str(upstream), None)
+    assert len(repo_cache._pooled(pool)) == 1
+
+    head = commit(upstream, "d.txt", "d\n")
+    (pooled,) = repo_cache._pooled(pool)
+    (pooled / "stray.txt").write_text("x")
+
+    repo = clone_repository_cached(str(upstream), str(tmp_path / "work"))
+    assert repo_cache._pooled(pool) == []
+    assert repo.head.commit.hexsha == head
+    assert not (tmp_path / "work" / "stray.txt").exists()
+
+
+def test_pool_fills_to_size_without_taking_from_it(upstream, monkeypatch):
+    monkeypatch.setenv("REPO_POOL_SIZE", "3")
+    takes = []
+    monkeypatch.setattr(repo_cache, "_take_from_pool", lambda *a: takes.append(a))
+    warm_pool(str(upstream), background=False)
+    pool = repo_cache._pool_dir(str(upstream), None)
+    assert len(repo_cache._pooled(pool)) == 3
+    assert takes == []
+
+
+def test_missing_stamp_refreshes_mirror(upstream, tmp_path, monkeypatch):
+    monkeypatch.setattr(repo_cache, "MIRROR_FETCH_INTERVAL", 3600)
+    mirror = repo_cache.update_mirror(str(upstream))
+    # As if the process died between creating the mirror and stamping it
+    (mirror / "prometheus-fetched").unlink()
+    head = commit(upstream, "e.txt", "e\n")
+
+    repo_cache.update_mirror(str(upstream))
+    assert git("rev-parse", "main", cwd=mirror) == head
+    assert (mirror / "prometheus-fetched").exists()
@@ -0,0 +1,97 @@
+"""Tests for tool result memoization."""
+
+from prometheus_swarm.tools.code_operations.definitions import (
+    DEFINITIONS as CODE_DEFINITIONS,
+)
+from prometheus_swarm.tools.file_operations.definitions import DEFINITIONS
+from prometheus_swarm.utils.tool_cache import ToolResultCache
+
+OK = {"success": True, "message": "ok", "data": {}}
+EXECUTE_COMMAND = {"name": "execute_command"}
+
+
+def read(cache, path, call_id=None):
+    """Look up a read_file call, recording it as call_id on a miss."""
+    args = {"file_path": path, "repo_path": "/repo"}
+    hit = cache.lookup(DEFINITIONS["read_file"], args)
+    if hit is None and call_id:
+        cache.record(DEFINITIONS["read_file"], args, call_id, OK)
+    return hit
+
+
+def test_repeated_read_returns_reference():
+    cache = ToolResultCache()
+    assert read(cache, "src/a.py", "call-1") is None
+    hit = read(cache, "./src/a.py")
+    assert hit is None  # different arguments are a different call
+    hit = read(cache, "src/a.py")
+    assert hit["success"] is True
+    assert hit["data"] == {"unchanged_since": "call-1"}
+
+
+def test_failed_reads_are_not_cached():
+    cache = ToolResultCache()
+    args = {"file_path": "missing.py"}
+    cache.record(DEFINITIONS["read_file"], args, "call-1", {"success": False})
+    assert cache.lookup(DEFINITIONS["read_file"], args) is None
+
+
+def test_write_invalidates_only_touched_paths():
+    cache = ToolResultCache()
+    read(cache, "src/a.py", "call-1")
+    read(cache, "src/b.py", "call-2")
+    cache.record(
+        DEFINITIONS["write_file"],
+        {"file_path": "src/a.py", "content": "x", "commit_message": "m"},
+        "call-3",
+        OK,
+    )
+    assert read(cache, "src/a.py") is None
+    assert read(cache, "src/b.py") is not None
+
+
+def test_write_invalidates_directory_listing():
+    cache = ToolResultCache()
+    list_args = {"directory": "src"}
+    other_args = {"directory": "docs"}
+    cache.record(DEFINITIONS["list_files"], list_args, "call-1", OK)
+    cache.record(DEFINITIONS["list_files"], other_args, "call-2", OK)
+    cache.record(
+        DEFINITIONS["move_file"],
+        {"source": "src/new/c.py", "destination": "lib/c.py"},
+        "call-3",
+        OK,
+    )
+    assert cache.lookup(DEFINITIONS["list_files"], list_args) is None
+    assert cache.lookup(DEFINITIONS["list_files"], other_args) is not None
+
+
+def test_tools_without_paths_clear_cache():
+    cache = ToolResultCache()
+    read(cache, "src/a.py", "call-1")
+    cache.record(EXECUTE_COMMAND, {"command": "git pull"}, "call-2", OK)
+    assert read(cache, "src/a.py") is None
+
+
+def test_read_without_path_depends_on_everything():
+    cache = ToolResultCache()
+    args = {"pattern": "needle"}
+    cache.record(CODE_DEFINITIONS["search_code"], args, "call-1", OK)
+    assert cache.lookup(CODE_DEFINITIONS["search_code"], args) is not None
+    cache.record(DEFINITIONS["write_file"], {"file_path": "deep/x.py"}, "c2", OK)
+    assert cache.lookup(CODE_DEFINITIONS["search_code"], args) is None
+
+
+def test_batch_tools_track_every_path():
+    cache = ToolResultCache()
+    args = {"paths": ["src/a.py", "src/b.py"]}
+    cache.record(DEFINITIONS["read_files"], args, "call-1", OK)
+    read(cache, "docs/c.md", "call-2")
+    cache.record(
+        DEFINITIONS["write_files"],
+        {"files": [{"path": "src/b.py", "content": "x"}]},
+        "call-3",
+        OK,
+    )
+    assert cache.lookup(DEFINITIONS["read_files"], args) is None
+    assert read(cache, "docs/c.md") is not None
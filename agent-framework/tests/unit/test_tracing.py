@@ -0,0 +1,80 @@
+"""Tests for tracing utilities."""
+
+import pytest
+
+from prometheus_swarm.utils import tracing
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry import trace  # noqa: E402
+from opentelemetry.sdk.trace import TracerProvider  # noqa: E402
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (  # noqa: E402
+    InMemorySpanExporter,
+)
+
+_exporter = InMemorySpanExporter()
+_provider = TracerProvider()
+_provider.add_span_processor(SimpleSpanProcessor(_exporter))
+trace.set_tracer_provider(_provider)
+
+
+@pytest.fixture(autouse=True)
+def exporter():
+    """Collect spans for each test."""
+    _exporter.clear()
+    yield _exporter
+    _exporter.clear()
+
+
+def test_start_span_nests_and_records_attributes(exporter):
+    """Child spans share the trace and None attributes are skipped."""
+    with tracing.start_span("parent", {"round_number": 3, "task_id": None}):
+        with tracing.start_span("child"):
+            pass
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert spans["child"].parent.span_id == spans["parent"].context.span_id
+    assert dict(spans["parent"].attributes) == {"round_number": 3}
+
+
+def test_traced_records_exceptions(exporter):
+    """Decorated functions are spanned and errors are recorded."""
+
+    @tracing.traced("failing")
+    def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        failing()
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "failing"
+    assert not span.status.is_ok
+    assert span.events[0].name == "exception"
+
+
+def test_headers_propagate_between_spans(exporter):
+    """Injected headers continue the trace in begin_span."""
+    with tracing.start_span("client"):
+        headers = tracing.inject_trace_headers({"Content-Type": "application/json"})
+
+    assert headers["Content-Type"] == "application/json"
+    assert "traceparent" in headers
+
+    handle = tracing.begin_span("server", headers=headers)
+    with tracing.start_span("inner"):
+        pass
+    tracing.end_span(handle, **{"http.status_code": 200})
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    trace_id = spans["client"].context.trace_id
+    assert spans["server"].context.trace_id == trace_id
+    assert spans["inner"].parent.span_id == spans["server"].context.span_id
+    assert spans["server"].attributes["http.status_code"] == 200
+    assert trace.get_current_span() is trace.INVALID_SPAN
+
+
+def test_inject_without_span_leaves_headers_unchanged():
+    """No active span means no trace headers are added."""
+    assert tracing.inject_trace_headers() == {}
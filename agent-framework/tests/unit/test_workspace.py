@@ -0,0 +1,80 @@
+"""Tests for task workspace allocation and per-context tool workspaces."""
+
+import json
+import subprocess
+import threading
+
+from prometheus_swarm.tools.file_operations.implementations import (
+    read_file,
+    write_file,
+)
+from prometheus_swarm.utils import workspace
+from prometheus_swarm.utils.workspace import (
+    allocate_workspace,
+    current_workspace,
+    reap_stale_workspaces,
+    release_workspace,
+    use_workspace,
+)
+
+
+def test_concurrent_allocations_are_unique(tmp_path):
+    paths = []
+    lock = threading.Lock()
+
+    def allocate():
+        path = allocate_workspace(root=str(tmp_path))
+        with lock:
+            paths.append(path)
+
+    threads = [threading.Thread(target=allocate) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(paths)) == 20
+    for path in paths:
+        lease = json.loads(open(f"{path}.lease").read())
+        assert lease["pid"] > 0
+        release_workspace(path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stale_workspaces_are_reaped(tmp_path):
+    path = allocate_workspace(root=str(tmp_path))
+    (tmp_path / "unleased").mkdir()
+    dead = subprocess.Popen(["true"])
+    dead.wait()
+    lease = json.loads(open(f"{path}.lease").read())
+    lease["pid"] = dead.pid
+    open(f"{path}.lease", "w").write(json.dumps(lease))
+    live = allocate_workspace(root=str(tmp_path))
+
+    # Allocating already removed the dead process's workspace
+    assert reap_stale_workspaces(str(tmp_path)) == []
+    live_name = live.rsplit("/", 1)[-1]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        ["unleased", live_name, f"{live_name}.lease"]
+    )
+    workspace._release_all()
+    assert [p.name for p in tmp_path.iterdir()] == ["unleased"]
+
+
+def test_tools_use_context_workspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+
+    with use_workspace(str(first)):
+        write_file("a.txt", "first")
+        assert current_workspace() == str(first)
+    write_file("a.txt", "second", repo_path=str(second))
+
+    assert (first / "a.txt").read_text() == "first"
+    assert (second / "a.txt").read_text() == "second"
+    assert not (tmp_path / "a.txt").exists()
+    assert current_workspace() == str(tmp_path)
+    assert read_file("a.txt", repo_path=str(first))["data"]["content"] == "first"
@@ -0,0 +1,91 @@
+"""Tests for the workspace index used by the file tools."""
+
+import subprocess
+from unittest import mock
+
+import pytest
+
+from prometheus_swarm.tools.file_operations.implementations import (
+    read_file,
+    write_file,
+    delete_file,
+    move_file,
+    list_files,
+)
+from prometheus_swarm.utils import workspace_index
+from prometheus_swarm.utils.workspace_index import get_workspace_index
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Create a git repository with a couple of files and chdir into it."""
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / ".gitignore").write_text("ignored/\n")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("a = 1\n")
+    (tmp_path / "README.md").write_text("readme\n")
+    subprocess.run(["git", "add", "-A"], cwd=tmp_path, check=True)
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    workspace_index.drop_workspace_index(tmp_path)
+
+
+def count_scans():
+    return mock.patch.object(
+        workspace_index.WorkspaceIndex,
+        "_scan",
+        autospec=True,
+        side_effect=workspace_index.WorkspaceIndex._scan,
+    )
+
+
+def test_list_files_scans_once_and_updates_on_writes(repo):
+    with count_scans() as scan:
+        assert list_files(".")["data"]["files"] == [
+            ".gitignore",
+            "README.md",
+            "src/a.py",
+        ]
+        write_file("src/b.py", "b = 2\n")
+        write_file("ignored/out.txt", "x")
+        move_file("README.md", "docs/README.md")
+        delete_file("src/a.py")
+        files = list_files(".")["data"]["files"]
+        assert scan.call_count == 1
+
+    assert files == [".gitignore", "docs/README.md", "src/b.py"]
+    assert list_files("src")["data"]["files"] == ["b.py"]
+
+
+def test_git_changes_trigger_rescan(repo):
+    list_files(".")
+    (repo / "new.txt").write_text("new\n")
+    subprocess.run(["git", "add", "new.txt"], cwd=repo, check=True)
+    assert "new.txt" in list_files(".")["data"]["files"]
+
+
+def test_shell_commands_mark_index_dirty(repo):
+    from prometheus_swarm.tools.execute_command.implementations import (
+        execute_command,
+    )
+
+    list_files(".")
+    execute_command("touch made_by_shell.txt")
+    assert "made_by_shell.txt" in list_files(".")["data"]["files"]
+
+
+def test_read_file_is_cached_until_file_changes(repo):
+    index = get_workspace_index(repo)
+    assert read_file("src/a.py")["data"]["content"] == "a = 1\n"
+    with mock.patch("builtins.open", side_effect=AssertionError("not cached")):
+        assert read_file("src/a.py")["data"]["content"] == "a = 1\n"
+
+    (repo / "src" / "a.py").write_text("a = 100\n")
+    assert read_file("src/a.py")["data"]["content"] == "a = 100\n"
+    assert index.file_hash(repo / "src" / "a.py") is not None
+
+
+def test_written_content_served_without_reread(repo):
+    write_file("src/c.py", "c = 3\n")
+    with mock.patch("builtins.open", side_effect=AssertionError("not cached")):
+        assert read_file("src/c.py")["data"]["content"] == "c = 3\n"
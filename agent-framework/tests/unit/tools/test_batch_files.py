@@ -0,0 +1,104 @@
+"""Tests for the read_files and write_files batch tools."""
+
+import os
+
+import pytest
+
+from prometheus_swarm.tools.file_operations import implementations
+from prometheus_swarm.tools.file_operations.implementations import (
+    read_files,
+    write_files,
+)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.txt").write_text("alpha\n")
+    (tmp_path / "b.txt").write_text("bravo\n" * 10)
+    return tmp_path
+
+
+def test_read_files_reports_each_file(workdir):
+    result = read_files(["a.txt", "missing.txt", "b.txt"])
+    assert result["success"]
+    assert result["message"] == "Read 2 of 3 files"
+    a, missing, b = result["data"]["files"]
+    assert a["content"] == "alpha\n"
+    assert missing["success"] is False
+    assert missing["message"] == "File not found: missing.txt"
+    assert b["total_lines"] == 10
+
+
+def test_read_files_shares_byte_budget(workdir):
+    (workdir / "c.txt").write_text("charlie\n")
+    result = read_files(["a.txt", "b.txt", "c.txt"], max_bytes=20)
+    a, b, c = result["data"]["files"]
+    assert a["content"] == "alpha\n"
+    assert b["content"] == "bravo\nbravo\n"
+    assert b["truncated"] is True
+    assert c["skipped"] is True
+    assert "1 skipped" in result["message"]
+
+
+def test_write_files_writes_all(workdir):
+    os.chmod(workdir / "a.txt", 0o600)
+    result = write_files(
+        [
+            {"path": "a.txt", "content": "new alpha\n"},
+            {"path": "pkg/new.py", "content": "x = 1\n"},
+        ]
+    )
+    assert result["success"], result
+    assert (workdir / "a.txt").read_text() == "new alpha\n"
+    assert (workdir / "a.txt").stat().st_mode & 0o777 == 0o600
+    assert (workdir / "pkg" / "new.py").read_text() == "x = 1\n"
+    assert [f["created"] for f in result["data"]["files"]] == [False, True]
+    assert sorted(p.name for p in workdir.iterdir()) == ["a.txt", "b.txt", "pkg"]
+
+
+def test_write_files_validates_before_writing(workdir):
+    result = write_files(
+        [
+            {"path": "a.txt", "content": "changed\n"},
+            {"path": "./a.txt", "content": "again\n"},
+            {"path": "c.txt"},
+        ]
+    )
+    assert not result["success"]
+    errors = [p["error"] for p in result["data"]["problems"]]
+    assert errors == ["Duplicate path in batch", "Missing content"]
+    assert (workdir / "a.txt").read_text() == "alpha\n"
+
+
+def test_write_files_rolls_back_on_failure(workdir, monkeypatch):
+    real_replace = os.replace
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 3:
+            raise OSError("disk full")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(implementations.os, "replace", failing_replace)
+    result = write_files(
+        [
+            {"path": "a.txt", "content": "new alpha\n"},
+            {"path": "new.txt", "content": "new\n"},
+            {"path": "b.txt", "content": "new bravo\n"},
+        ]
+    )
+    assert not result["success"]
+    assert "disk full" in result["message"]
+    assert (workdir / "a.txt").read_text() == "alpha\n"
+    assert (workdir / "b.txt").read_text() == "bravo\n" * 10
+    assert not (workdir / "new.txt").exists()
+    assert sorted(p.name for p in workdir.iterdir()) == ["a.txt", "b.txt"]
+
+
+def test_write_files_byte_cap(workdir, monkeypatch):
+    monkeypatch.setattr(implementations, "MAX_BATCH_WRITE_BYTES", 5)
+    result = write_files([{"path": "big.txt", "content": "123456"}])
+    assert not result["success"]
+    assert not (workdir / "big.txt").exists()
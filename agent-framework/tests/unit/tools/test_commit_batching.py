@@ -0,0 +1,120 @@
+"""Tests for deferred, batched commits."""
+
+import subprocess
+
+import pytest
+
+from prometheus_swarm.tools.file_operations.implementations import (
+    delete_file,
+    write_file,
+)
+from prometheus_swarm.tools.git_operations.implementations import (
+    batch_commits,
+    commit_and_push,
+    flush_commits,
+)
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    remote = tmp_path / "remote.git"
+    work = tmp_path / "work"
+    git(tmp_path, "init", "-q", "--bare", str(remote))
+    git(tmp_path, "init", "-q", "-b", "main", str(work))
+    git(work, "config", "user.email", "dev@example.com")
+    git(work, "config", "user.name", "Dev")
+    (work / "README.md").write_text("hello\n")
+    git(work, "add", "-A")
+    git(work, "commit", "-q", "-m", "Initial commit")
+    git(work, "remote", "add", "origin", str(remote))
+    git(work, "push", "-q", "origin", "main")
+    monkeypatch.chdir(work)
+    return {"work": work, "remote": remote}
+
+
+def remote_log(repo):
+    return git(repo["remote"], "log", "--format=%s", "main").splitlines()
+
+
+def test_commits_immediately_without_batching(repo):
+    assert write_file("a.txt", "a\n", commit_message="Add a")["success"]
+    assert remote_log(repo) == ["Add a", "Initial commit"]
+
+
+def test_batch_makes_one_commit_and_push(repo):
+    with batch_commits():
+        write_file("a.txt", "a\n", commit_message="Add a")
+        write_file("b.txt", "b\n", commit_message="Add b")
+        delete_file("README.md", commit_message="Remove readme")
+        assert remote_log(repo) == ["Initial commit"]
+
+    assert remote_log(repo) == ["Add a", "Initial commit"]
+    body = git(repo["remote"], "log", "-1", "--format=%b", "main")
+    assert body == "- Add b\n- Remove readme"
+    files = git(repo["remote"], "ls-tree", "--name-only", "main").splitlines()
+    assert files == ["a.txt", "b.txt"]
+
+
+def test_flush_commits_pushes_early(repo):
+    with batch_commits():
+        result = commit_and_push("Nothing yet")
+        assert result["data"]["deferred"] is True
+        write_file("a.txt", "a\n", commit_message="Add a")
+        flushed = flush_commits()
+        assert flushed["success"]
+        assert flushed["data"]["commits"][0]["changes"] == 2
+        assert remote_log(repo) == ["Nothing yet", "Initial commit"]
+        assert flush_commits()["data"]["commits"] == []
+
+    assert remote_log(repo) == ["Nothing yet", "Initial commit"]
+
+
+def test_flush_without_changes_makes_no_commit(repo):
+    with batch_commits():
+        commit_and_push("No-op")
+    assert remote_log(repo) == ["Initial commit"]
+
+
+def test_batch_reports_a_failed_push(repo, tmp_path):
+    with batch_commits() as flushed:
+        write_file("a.txt", "a\n", commit_message="Add a")
+        git(repo["work"], "remote", "set-url", "origin", str(tmp_path / "missing"))
+
+    assert flushed["success"] is False
+    assert remote_log(repo) == ["Initial commit"]
+
+
+def test_nested_batch_leaves_the_flush_to_the_outer_one(repo):
+    with batch_commits() as outer:
+        with batch_commits() as inner:
+            write_file("a.txt", "a\n", commit_message="Add a")
+        assert inner == {}
+        assert remote_log(repo) == ["Initial commit"]
+
+    assert outer["success"]
+    assert remote_log(repo) == ["Add a", "Initial commit"]
+
+
+def test_flush_can_be_limited_to_one_repo(repo, tmp_path):
+    other = tmp_path / "other"
+    git(tmp_path, "init", "-q", "-b", "main", str(other))
+    git(other, "config", "user.email", "dev@example.com")
+    git(other, "config", "user.name", "Dev")
+    (other / "README.md").write_text("other\n")
+    git(other, "add", "-A")
+    git(other, "commit", "-q", "-m", "Initial commit")
+
+    with batch_commits():
+        write_file("a.txt", "a\n", commit_message="Add a")
+        # The other repo can't push: it has no remote
+        write_file("b.txt", "b\n", commit_message="Add b", repo_path=str(other))
+        flushed = flush_commits(repo_path=str(repo["work"]))
+        assert flushed["success"]
+        assert remote_log(repo) == ["Add a", "Initial commit"]
+        assert not flush_commits(repo_path=str(other))["success"]
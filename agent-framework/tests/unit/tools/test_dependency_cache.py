@@ -0,0 +1,90 @@
+"""Tests for the node-local dependency cache."""
+
+import os
+
+import pytest
+
+from prometheus_swarm.tools.execute_command import dependency_cache
+from prometheus_swarm.tools.execute_command.implementations import (
+    setup_dependencies,
+)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    root = tmp_path / "cache"
+    monkeypatch.setenv("DEPENDENCY_CACHE_DIR", str(root))
+    monkeypatch.delenv("PIP_CACHE_DIR", raising=False)
+    return root
+
+
+def test_cache_env_points_at_shared_dirs(cache_dir, monkeypatch):
+    env = dependency_cache.cache_env()
+    assert env["PIP_CACHE_DIR"] == str(cache_dir / "pip")
+    assert env["npm_config_cache"] == str(cache_dir / "npm")
+
+    monkeypatch.setenv("PIP_CACHE_DIR", "/elsewhere")
+    assert "PIP_CACHE_DIR" not in dependency_cache.cache_env()
+    monkeypatch.setenv("DEPENDENCY_CACHE", "false")
+    assert dependency_cache.cache_env() == {}
+
+
+def test_hash_depends_on_contents(tmp_path):
+    (tmp_path / "package.json").write_text('{"name": "a"}')
+    first = dependency_cache.hash_files(tmp_path, ["package.json", "yarn.lock"])
+    (tmp_path / "yarn.lock").write_text("lock")
+    second = dependency_cache.hash_files(tmp_path, ["package.json", "yarn.lock"])
+    assert first and second and first != second
+    assert dependency_cache.hash_files(tmp_path, ["missing.txt"]) is None
+
+
+def test_node_modules_round_trip(cache_dir, tmp_path):
+    first = tmp_path / "repo_1"
+    (first / "node_modules" / "left-pad").mkdir(parents=True)
+    (first / "node_modules" / "left-pad" / "index.js").write_text("module.exports")
+    os.symlink("left-pad", first / "node_modules" / "alias")
+
+    dependency_cache.store_node_modules(str(first), "key")
+    second = tmp_path / "repo_2"
+    second.mkdir()
+    assert dependency_cache.restore_node_modules(str(second), "key")
+    restored = second / "node_modules" / "left-pad" / "index.js"
+    assert restored.read_text() == "module.exports"
+    assert os.readlink(second / "node_modules" / "alias") == "left-pad"
+    # Writing to a restored file leaves the cache and other workspaces alone
+    restored.write_text("patched")
+    third = tmp_path / "repo_3"
+    third.mkdir()
+    assert dependency_cache.restore_node_modules(str(third), "key")
+    assert (third / "node_modules" / "left-pad" / "index.js").read_text() == (
+        "module.exports"
+    )
+    assert (first / "node_modules" / "left-pad" / "index.js").read_text() == (
+        "module.exports"
+    )
+    assert not dependency_cache.restore_node_modules(str(second), "other")
+
+
+def test_old_node_modules_are_pruned(cache_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(dependency_cache, "MAX_CACHED_NODE_MODULES", 2)
+    repo = tmp_path / "repo"
+    (repo / "node_modules").mkdir(parents=True)
+    for number, key in enumerate(["a", "b", "c"]):
+        dependency_cache.store_node_modules(str(repo), key)
+        os.utime(cache_dir / "node_modules" / key, (number, number))
+    dependency_cache.store_node_modules(str(repo), "d")
+    assert sorted(os.listdir(cache_dir / "node_modules")) == ["c", "d"]
+
+
+def test_identical_requirements_are_installed_once(cache_dir, tmp_path):
+    (tmp_path / "requirements.txt").write_text("# nothing to install\n")
+    result = setup_dependencies("pip", repo_path=str(tmp_path))
+    assert result["success"], result
+    assert result["data"]["cached"] is False
+
+    result = setup_dependencies("pip", repo_path=str(tmp_path))
+    assert result["message"] == "Dependencies already installed (cached)"
+
+    (tmp_path / "requirements.txt").write_text("# changed\n")
+    result = setup_dependencies("pip", repo_path=str(tmp_path))
+    assert result["data"]["cached"] is False
@@ -0,0 +1,155 @@
+"""Tests for the edit_file tool and patch application."""
+
+import subprocess
+
+import pytest
+
+from prometheus_swarm.tools.file_operations.implementations import edit_file
+from prometheus_swarm.tools.file_operations.patch import (
+    PatchError,
+    parse_unified_diff,
+)
+
+SOURCE = """def greet(name):
+    message = "Hello, " + name
+    print(message)
+    return message
+
+
+def farewell(name):
+    print("Bye, " + name)
+"""
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "app.py").write_text(SOURCE)
+    return tmp_path
+
+
+def test_search_replace(workdir):
+    result = edit_file(
+        "app.py",
+        edits=[
+            {"search": '"Hello, "', "replace": '"Hi, "'},
+            {"search": 'print("Bye, " + name)', "replace": "return name"},
+        ],
+    )
+    assert result["success"], result
+    text = (workdir / "app.py").read_text()
+    assert '"Hi, " + name' in text
+    assert text.endswith("    return name\n")
+    assert [a["line"] for a in result["data"]["applied"]] == [2, 8]
+
+
+def test_failed_block_leaves_file_unchanged(workdir):
+    result = edit_file(
+        "app.py",
+        edits=[
+            {
+                "search": "message = 'Hello, ' + name\nprint(message)",
+                "replace": "message = f'Hello, {name}'\nprint(message)",
+            },
+            {
+                "search": "print(something_else)",
+                "replace": "log(message)",
+            },
+        ],
+    )
+    assert not result["success"]
+    assert [f["hunk"] for f in result["data"]["failed"]] == [2]
+    assert (workdir / "app.py").read_text() == SOURCE
+
+
+def test_search_tolerates_whitespace_and_reindents(workdir):
+    result = edit_file(
+        "app.py",
+        edits=[
+            {
+                "search": 'message = "Hello, " +  name\nprint(message)',
+                "replace": "message = f'Hello, {name}'\nlog(message)",
+            }
+        ],
+    )
+    assert result["success"], result
+    assert result["data"]["applied"][0]["match"] == "whitespace"
+    text = (workdir / "app.py").read_text()
+    assert "    message = f'Hello, {name}'\n    log(message)\n" in text
+
+
+def test_ambiguous_search_fails(workdir):
+    result = edit_file("app.py", edits=[{"search": "name", "replace": "who"}])
+    assert not result["success"]
+    assert "more than one place" in result["data"]["failed"][0]["reason"]
+    assert (workdir / "app.py").read_text() == SOURCE
+
+
+def test_unified_diff_with_drifted_line_numbers(workdir):
+    diff = """--- a/app.py
++++ b/app.py
+@@ -5,3 +5,3 @@
+ def farewell(name):
+-    print("Bye, " + name)
++    print("Goodbye, " + name)
+@@ -1,2 +1,3 @@
+ def greet(name):
++    name = name.strip()
+     message = "Hello, " + name
+"""
+    result = edit_file("app.py", diff=diff)
+    assert result["success"], result
+    text = (workdir / "app.py").read_text()
+    assert 'print("Goodbye, " + name)' in text
+    assert text.startswith("def greet(name):\n    name = name.strip()\n")
+
+
+def test_fuzzy_diff_context(workdir):
+    diff = """@@
+ def greet(name):
+     message = "Hello, " + name
+-    print(message)
++    print(message.upper())
+     return mesage
+"""
+    result = edit_file("app.py", diff=diff)
+    assert result["success"], result
+    assert result["data"]["applied"][0]["match"] == "fuzzy"
+    assert "print(message.upper())" in (workdir / "app.py").read_text()
+
+
+def test_preserves_crlf(workdir):
+    (workdir / "win.txt").write_bytes(b"one\r\ntwo\r\nthree\r\n")
+    result = edit_file("win.txt", diff="@@ -2 +2 @@\n-two\n+TWO\n")
+    assert result["success"], result
+    assert (workdir / "win.txt").read_bytes() == b"one\r\nTWO\r\nthree\r\n"
+
+
+def test_requires_exactly_one_form(workdir):
+    assert not edit_file("app.py")["success"]
+    assert not edit_file("app.py", edits=[{"search": "a", "replace": "b"}], diff="x")[
+        "success"
+    ]
+
+
+def test_multi_file_diff_rejected():
+    diff = "--- a/x\n+++ b/x\n@@ -1 +1 @@\n-a\n+b\n--- a/y\n+++ b/y\n"
+    with pytest.raises(PatchError):
+        parse_unified_diff(diff)
+
+
+def test_zero_context_diff_inserts_after_line(workdir):
+    (workdir / "before.txt").write_text("a\nb\nc\nd\ne\n")
+    (workdir / "after.txt").write_text("a\nb\nX\nc\nD\ne\nY\n")
+    diff = subprocess.run(
+        ["diff", "-U0", "before.txt", "after.txt"],
+        cwd=workdir,
+        capture_output=True,
+        text=True,
+    ).stdout
+    # Pure inserts ("-N,0") go after line N
+    assert "@@ -2,0 +3 @@" in diff
+
+    result = edit_file("before.txt", diff=diff)
+    assert result["success"], result
+    assert (workdir / "before.txt").read_text() == "a\nb\nX\nc\nD\ne\nY\n"
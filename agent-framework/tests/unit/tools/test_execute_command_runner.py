@@ -0,0 +1,72 @@
+"""Tests for streaming command execution."""
+
+import time
+
+from prometheus_swarm.tools.execute_command.implementations import execute_command
+from prometheus_swarm.tools.execute_command.runner import OutputBuffer, run_command
+
+
+def test_output_buffer_keeps_head_and_tail():
+    buffer = OutputBuffer(max_bytes=40)
+    for i in range(100):
+        buffer.write(f"{i:03d}\n".encode())
+    text = buffer.text()
+    assert buffer.truncated
+    assert buffer.total == 400
+    assert text.startswith("000\n001\n")
+    assert text.endswith("098\n099\n")
+    assert "bytes of output omitted" in text
+    assert len(text.encode()) < 100
+
+
+def test_small_output_is_kept_whole():
+    buffer = OutputBuffer(max_bytes=40)
+    buffer.write(b"hello\n")
+    assert not buffer.truncated
+    assert buffer.text() == "hello\n"
+
+
+def test_captures_both_streams(tmp_path):
+    result = run_command("echo out; echo err >&2; exit 3", cwd=str(tmp_path))
+    assert result.stdout == "out\n"
+    assert result.stderr == "err\n"
+    assert result.returncode == 3
+    assert not result.timed_out
+
+
+def test_large_output_is_capped(tmp_path):
+    result = run_command(
+        "python3 -c \"print('x' * 1000000)\"", cwd=str(tmp_path), max_output_bytes=1024
+    )
+    assert result.stdout_bytes == 1000001
+    assert result.truncated
+    assert len(result.stdout) < 2048
+
+
+def test_timeout_kills_process_group(tmp_path):
+    marker = tmp_path / "survived"
+    start = time.monotonic()
+    result = run_command(
+        f"(sleep 2 && touch {marker}) & sleep 30", cwd=str(tmp_path), timeout=0.5
+    )
+    assert result.timed_out
+    assert time.monotonic() - start < 10
+    time.sleep(2.5)
+    assert not marker.exists()
+
+
+def test_background_process_does_not_hang(tmp_path):
+    start = time.monotonic()
+    result = run_command("sleep 30 & echo started", cwd=str(tmp_path))
+    assert result.stdout == "started\n"
+    assert not result.timed_out
+    assert time.monotonic() - start < 10
+
+
+def test_execute_command_reports_timeout(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = execute_command("echo partial; sleep 30", timeout=1)
+    assert not result["success"]
+    assert result["message"] == "Command timed out after 1 seconds"
+    assert result["data"]["stdout"] == "partial\n"
+    assert result["data"]["timed_out"] is True
@@ -0,0 +1,149 @@
+"""Tests for the get_file_outline tool."""
+
+import pytest
+
+from prometheus_swarm.tools.code_operations import outline
+from prometheus_swarm.tools.code_operations.implementations import get_file_outline
+
+PYTHON_SOURCE = '''"""Module."""
+
+
+class Store(Base, metaclass=Meta):
+    """Keeps things.
+
+    More detail.
+    """
+
+    @property
+    def size(self) -> int:
+        return 0
+
+    async def fetch(self, key: str, default=None):
+        pass
+
+
+def helper(*args, **kwargs):
+    return args
+'''
+
+TS_SOURCE = """import { x } from "y";
+
+export class Client extends Base {
+  private cache = {};
+
+  constructor(url: string) {
+    super(url);
+  }
+
+  async get(path: string): Promise<string> {
+    if (path) {
+      return path;
+    }
+  }
+}
+
+export function makeClient(url) {
+  return new Client(url);
+}
+
+export const handler = async (event) => {
+  return event;
+};
+"""
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "store.py").write_text(PYTHON_SOURCE)
+    (tmp_path / "client.ts").write_text(TS_SOURCE)
+    return tmp_path
+
+
+def test_python_outline(workdir):
+    result = get_file_outline("store.py")
+    assert result["success"]
+    data = result["data"]
+    assert data["parser"] == "python"
+    assert data["total_lines"] == 19
+    store, helper = data["symbols"]
+    assert store["signature"] == "class Store(Base, metaclass=Meta)"
+    assert store["doc"] == "Keeps things."
+    assert (store["start_line"], store["end_line"]) == (4, 15)
+    size, fetch = store["children"]
+    assert size["kind"] == "method"
+    assert (size["start_line"], size["end_line"]) == (10, 12)
+    assert fetch["signature"] == "async def fetch(self, key: str, default=None)"
+    assert helper["kind"] == "function"
+    assert helper["signature"] == "def helper(*args, **kwargs)"
+    assert result["message"] == "Found 4 symbols in store.py"
+
+
+def test_python_signatures_keep_their_source():
+    (symbol,) = outline.python_outline(
+        "def f(a, /, b: int = 1, *, c='é',\n      **kw) -> Dict[\n    str, int]:\n"
+        "    pass\n"
+    )
+    assert symbol["signature"] == (
+        "def f(a, /, b: int = 1, *, c='é', **kw) -> Dict[str, int]"
+    )
+
+
+def test_multi_line_signature_with_comments():
+    (symbol,) = outline.python_outline(
+        "def f(\n"
+        "    mapping: Dict[\n"
+        "        str,  # the key\n"
+        "        int\n"
+        "    ],\n"
+        "    flag='#',  # not a comment inside the string\n"
+        ") -> None:\n"
+        "    pass\n"
+    )
+    assert symbol["signature"] == "def f(mapping: Dict[str, int], flag='#') -> None"
+
+
+def test_typescript_outline(workdir):
+    data = get_file_outline("client.ts")["data"]
+    assert data["parser"] == "generic"
+    client, make_client, handler = data["symbols"]
+    assert (client["name"], client["start_line"], client["end_line"]) == (
+        "Client",
+        3,
+        15,
+    )
+    assert [m["name"] for m in client["children"]] == ["constructor", "get"]
+    assert client["children"][1]["end_line"] == 14
+    assert (make_client["name"], make_client["end_line"]) == ("makeClient", 19)
+    assert (handler["name"], handler["kind"]) == ("handler", "function")
+
+
+def test_broken_python_falls_back_to_regex(workdir):
+    (workdir / "broken.py").write_text("def ok(:\n")
+    result = get_file_outline("broken.py")
+    assert result["success"]
+    assert result["data"]["parser"] == "generic"
+
+
+def test_outline_is_cached_by_content(workdir, monkeypatch):
+    calls = []
+    real = outline.outline_source
+
+    def counting(source, suffix):
+        calls.append(suffix)
+        return real(source, suffix)
+
+    monkeypatch.setattr(outline, "outline_source", counting)
+    (workdir / "fresh.py").write_text("def first():\n    pass\n")
+    get_file_outline("fresh.py")
+    get_file_outline("fresh.py")
+    assert len(calls) == 1
+
+    (workdir / "fresh.py").write_text("def second():\n    pass\n")
+    data = get_file_outline("fresh.py")["data"]
+    assert data["symbols"][0]["name"] == "second"
+    assert len(calls) == 2
+
+
+def test_missing_file(workdir):
+    assert get_file_outline("nope.py")["message"] == "File not found: nope.py"
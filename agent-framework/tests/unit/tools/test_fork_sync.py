@@ -0,0 +1,154 @@
+"""Tests for syncing forks through the merge-upstream API, with a local fallback."""
+
+import json
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from github import GithubException
+
+from prometheus_swarm.tools.github_operations import implementations
+from prometheus_swarm.tools.github_operations.implementations import sync_fork
+from prometheus_swarm.utils.github_gateway import GitHubGateway
+from prometheus_swarm.workflows import utils as workflow_utils
+
+FORK_URL = "https://github.com/owner/fork.git"
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    """Syncs the fork's bare repository on merge-upstream, unless it conflicts."""
+
+    fork = None
+    conflict = False
+    merges = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        base = f"http://{self.headers['Host']}"
+        self._reply(200, {"url": f"{base}/repos/owner/fork", "full_name": "owner/fork"})
+
+    def do_POST(self):
+        type(self).merges += 1
+        branch = json.loads(self.rfile.read(int(self.headers["Content-Length"])))[
+            "branch"
+        ]
+        if self.conflict:
+            self._reply(409, {"message": "There are merge conflicts"})
+            return
+        git(self.fork, "fetch", "-q", "upstream", f"{branch}:{branch}")
+        self._reply(
+            200,
+            {
+                "message": "Successfully fetched and fast-forwarded",
+                "merge_type": "fast-forward",
+                "base_branch": f"upstream:{branch}",
+            },
+        )
+
+    def _reply(self, status, document):
+        body = json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def repos(tmp_path, monkeypatch):
+    upstream = tmp_path / "upstream"
+    fork = tmp_path / "fork.git"
+    work = tmp_path / "work"
+    git(tmp_path, "init", "-q", "-b", "main", str(upstream))
+    git(upstream, "config", "user.email", "dev@example.com")
+    git(upstream, "config", "user.name", "Dev")
+    (upstream / "README.md").write_text("hello\n")
+    git(upstream, "add", "-A")
+    git(upstream, "commit", "-q", "-m", "Initial commit")
+    git(tmp_path, "clone", "-q", "--bare", str(upstream), str(fork))
+    git(fork, "remote", "add", "upstream", str(upstream))
+    git(tmp_path, "clone", "-q", str(fork), str(work))
+    # origin looks like GitHub but resolves to the local fork
+    git(work, "remote", "set-url", "origin", FORK_URL)
+    git(work, "config", f"url.{fork}.insteadOf", FORK_URL)
+    git(work, "remote", "add", "upstream", str(upstream))
+    git(work, "config", "user.email", "dev@example.com")
+    git(work, "config", "user.name", "Dev")
+
+    (upstream / "new.txt").write_text("new\n")
+    git(upstream, "add", "-A")
+    git(upstream, "commit", "-q", "-m", "Upstream change")
+
+    FakeGitHub.fork = str(fork)
+    FakeGitHub.conflict = False
+    FakeGitHub.merges = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHub)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    gh = GitHubGateway(
+        "token",
+        base_url=f"http://127.0.0.1:{httpd.server_address[1]}",
+        seconds_between_requests=0,
+        retry=0,
+    )
+    monkeypatch.setattr(implementations, "_get_github_client", lambda token: gh)
+    yield {"work": work, "fork": fork}
+    httpd.shutdown()
+
+
+def fork_log(repos):
+    return git(repos["fork"], "log", "--format=%s", "main").splitlines()
+
+
+def test_syncs_on_github(repos, monkeypatch):
+    # The local path would fetch from upstream; make sure it isn't used
+    monkeypatch.setattr(implementations, "fetch_remote", None)
+    result = sync_fork(str(repos["work"]), "main", github_token="token")
+
+    assert result["success"], result["message"]
+    assert result["data"]["merge_type"] == "fast-forward"
+    assert FakeGitHub.merges == 1
+    assert fork_log(repos) == ["Upstream change", "Initial commit"]
+    assert (repos["work"] / "new.txt").exists()
+
+
+def test_falls_back_to_local_sync(repos):
+    FakeGitHub.conflict = True
+    result = sync_fork(str(repos["work"]), "main", github_token="token")
+
+    assert result["success"], result["message"]
+    assert "merge_type" not in result["data"]
+    assert FakeGitHub.merges == 1
+    assert fork_log(repos) == ["Upstream change", "Initial commit"]
+
+
+class NewFork:
+    default_branch = "main"
+
+    def __init__(self, ready_after):
+        self.calls = 0
+        self.ready_after = ready_after
+
+    def get_branch(self, branch):
+        self.calls += 1
+        if self.calls <= self.ready_after:
+            raise GithubException(404, {"message": "Branch not found"})
+
+
+def test_fork_readiness_backs_off(monkeypatch):
+    delays = []
+    monkeypatch.setattr(workflow_utils.time, "sleep", delays.append)
+
+    assert workflow_utils._wait_for_fork(NewFork(ready_after=4))
+    assert delays == [0.25, 0.5, 1, 2]
+
+    delays.clear()
+    assert not workflow_utils._wait_for_fork(NewFork(ready_after=100), timeout=0.5)
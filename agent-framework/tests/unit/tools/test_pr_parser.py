@@ -0,0 +1,84 @@
+"""Tests for parsing sections out of PR descriptions."""
+
+import re
+
+import pytest
+
+from prometheus_swarm.tools.github_operations.parser import (
+    _parse_sections,
+    extract_section,
+    parse_pr_description,
+    parse_sections,
+)
+from prometheus_swarm.tools.github_operations.templates import TEMPLATES
+
+
+def search_section(content, section):
+    """The per-section regex the parser used to compile on every call."""
+    pattern = f"<!-- BEGIN_{section} -->\\s*(.+?)\\s*<!-- END_{section} -->"
+    match = re.search(pattern, content, re.DOTALL)
+    return match.group(1).strip() if match else None
+
+
+BODIES = [
+    TEMPLATES["review_template"].format(
+        title="Title",
+        description="Some description",
+        recommendation="APPROVE",
+        recommendation_reasons="- fine",
+        unmet_requirements="",
+        failed_tests="none",
+        missing_tests="none",
+        action_items="- none",
+        staking_key="key",
+        staking_signature="sig",
+        pub_key="pub",
+        public_signature="pubsig",
+    ),
+    # Nested, repeated, unterminated and empty sections
+    "<!-- BEGIN_OUTER -->\nA <!-- BEGIN_INNER -->B<!-- END_INNER --> C\n"
+    "<!-- END_OUTER -->\n<!-- BEGIN_INNER -->second<!-- END_INNER -->\n"
+    "<!-- BEGIN_OPEN -->never closed\n<!-- BEGIN_EMPTY --><!-- END_EMPTY -->",
+    "no sections at all",
+]
+SECTIONS = [
+    "TITLE",
+    "DESCRIPTION",
+    "RECOMMENDATION",
+    "UNMET_REQUIREMENTS",
+    "TESTS",
+    "STAKING_KEY",
+    "PUB_KEY",
+    "OUTER",
+    "INNER",
+    "OPEN",
+    "EMPTY",
+    "MISSING",
+]
+
+
+@pytest.mark.parametrize("body", BODIES)
+def test_single_pass_matches_per_section_search(body):
+    sections = parse_sections(body)
+    for section in SECTIONS:
+        assert sections.get(section) == search_section(body, section)
+        assert extract_section(body, section) == search_section(body, section)
+
+
+def test_sections_are_parsed_once_per_body():
+    _parse_sections.cache_clear()
+    body = BODIES[0]
+    parse_pr_description(body)
+    extract_section(body, "STAKING_KEY")
+    extract_section(body, "PUB_KEY")
+    info = _parse_sections.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+    # Callers get their own copy
+    parse_sections(body)["TITLE"] = "changed"
+    assert extract_section(body, "TITLE") == "# Title"
+
+
+def test_non_word_section_names():
+    body = "<!-- BEGIN_A.B -->x<!-- END_A.B -->"
+    assert extract_section(body, "A.B") == "x"
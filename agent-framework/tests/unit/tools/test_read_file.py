@@ -0,0 +1,87 @@
+"""Tests for ranged and size-limited read_file."""
+
+import subprocess
+
+import pytest
+
+from prometheus_swarm.tools.file_operations import implementations
+from prometheus_swarm.tools.file_operations.implementations import (
+    read_file,
+    write_file,
+)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "lines.txt").write_text("".join(f"line {i}\n" for i in range(1, 11)))
+    return tmp_path
+
+
+def test_reads_whole_file_by_default(workdir):
+    result = read_file("lines.txt")
+    assert result["success"]
+    assert result["message"] == "Successfully read file lines.txt"
+    assert result["data"]["content"].startswith("line 1\n")
+    assert result["data"]["total_lines"] == 10
+    assert result["data"]["truncated"] is False
+
+
+def test_reads_line_window(workdir):
+    data = read_file("lines.txt", start_line=3, end_line=5)["data"]
+    assert data["content"] == "line 3\nline 4\nline 5\n"
+    assert (data["start_line"], data["end_line"], data["total_lines"]) == (3, 5, 10)
+
+
+def test_truncates_at_max_bytes(workdir):
+    result = read_file("lines.txt", max_bytes=15)
+    assert result["data"]["content"] == "line 1\nline 2\n"
+    assert result["data"]["truncated"] is True
+    assert "continue from line 3" in result["message"]
+
+
+def test_streams_large_files(workdir, monkeypatch):
+    monkeypatch.setattr(implementations, "MAX_CACHED_FILE_BYTES", 10)
+    data = read_file("lines.txt", start_line=9)["data"]
+    assert data["content"] == "line 9\nline 10\n"
+    assert data["total_lines"] == 10
+
+
+def test_long_single_line_is_cut(workdir):
+    (workdir / "min.js").write_text("x" * 100)
+    data = read_file("min.js", max_bytes=10)["data"]
+    assert data["content"] == "x" * 10
+    assert data["truncated"] is True
+
+
+def test_rejects_binary_files(workdir):
+    (workdir / "image.png").write_bytes(b"\x89PNG\r\n\x1a\n\0\0\0")
+    result = read_file("image.png")
+    assert not result["success"]
+    assert result["data"]["binary"] is True
+
+
+def test_start_line_past_end(workdir):
+    result = read_file("lines.txt", start_line=20)
+    assert not result["success"]
+    assert result["data"]["total_lines"] == 10
+
+
+def test_missing_file(workdir):
+    assert read_file("nope.txt")["message"] == "File not found: nope.txt"
+
+
+@pytest.mark.parametrize("cache_limit", [1024 * 1024, 1])
+def test_output_does_not_depend_on_the_read_cache(tmp_path, monkeypatch, cache_limit):
+    # In a git repo, small files go through the workspace index's read cache
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    monkeypatch.setattr(implementations, "MAX_CACHED_FILE_BYTES", cache_limit)
+
+    write_file("crlf.txt", "one\r\ntwo\r\n", commit_message="Add crlf.txt")
+    assert read_file("crlf.txt")["data"]["content"] == "one\ntwo\n"
+
+    (tmp_path / "latin1.txt").write_bytes("caf\xe9\n".encode("latin-1"))
+    result = read_file("latin1.txt")
+    assert result["success"]
+    assert result["data"]["content"] == "caf\ufffd\n"
@@ -0,0 +1,140 @@
+"""Tests for structured run_tests results."""
+
+import json
+
+import pytest
+
+from prometheus_swarm.tools.execute_command import implementations
+from prometheus_swarm.tools.execute_command.implementations import run_tests
+from prometheus_swarm.tools.execute_command.test_results import (
+    parse_jest_json,
+    parse_junit_xml,
+)
+
+TESTS = """
+import pytest
+
+
+def test_ok():
+    assert 1 + 1 == 2
+
+
+class TestMath:
+    def test_broken(self):
+        assert 1 + 1 == 3
+
+
+@pytest.mark.skip
+def test_skipped():
+    pass
+"""
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(implementations, "_last_failures", {})
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_math.py").write_text(TESTS)
+    (tmp_path / "tests" / "test_other.py").write_text("def test_fine():\n    pass\n")
+    return tmp_path
+
+
+def test_pytest_results_are_parsed(project):
+    result = run_tests("tests", "pytest", parallel=False)
+    assert result["success"]
+    data = result["data"]
+    assert data["tests_passed"] is False
+    assert data["summary"] == {
+        "total": 4,
+        "passed": 2,
+        "failed": 1,
+        "errors": 0,
+        "skipped": 1,
+    }
+    (failure,) = data["failures"]
+    assert failure["id"] == "tests/test_math.py::TestMath::test_broken"
+    assert failure["line"] == 10
+    assert "assert 1 + 1 == 3" in failure["traceback"]
+    assert result["message"].startswith("Tests completed: 2 passed, 1 failed")
+
+
+def test_only_failed_reruns_failures(project):
+    run_tests("tests", "pytest", parallel=False)
+    result = run_tests("tests", "pytest", only_failed=True, parallel=False)
+    assert result["data"]["summary"]["total"] == 1
+    assert "--lf --lfnf=none" in result["data"]["command"]
+
+    (project / "tests" / "test_math.py").write_text(
+        TESTS.replace("1 + 1 == 3", "1 + 1 == 2")
+    )
+    result = run_tests("tests", "pytest", only_failed=True, parallel=False)
+    assert result["data"]["tests_passed"] is True
+    result = run_tests("tests", "pytest", only_failed=True, parallel=False)
+    assert result["data"]["summary"]["total"] == 0
+    assert result["data"]["tests_passed"] is True
+
+
+def test_several_paths_in_another_repo(project, tmp_path_factory, monkeypatch):
+    monkeypatch.chdir(tmp_path_factory.mktemp("elsewhere"))
+    result = run_tests(
+        "tests/test_other.py tests/test_math.py::test_ok",
+        "pytest",
+        parallel=False,
+        repo_path=str(project),
+    )
+    assert result["data"]["summary"]["total"] == 2
+    assert result["data"]["tests_passed"] is True
+
+
+def test_unknown_framework(project):
+    assert not run_tests("tests", "nose")["success"]
+
+
+def test_parse_junit_error(tmp_path):
+    report = tmp_path / "report.xml"
+    report.write_text(
+        '<testsuites><testsuite><testcase classname="tests.test_a" '
+        'name="test_x" file="tests/test_a.py" line="4">'
+        '<error message="fixture failed">Traceback\nValueError: boom</error>'
+        "</testcase></testsuite></testsuites>"
+    )
+    summary = parse_junit_xml(str(report))
+    assert summary["errors"] == 1
+    assert summary["failures"][0]["id"] == "tests/test_a.py::test_x"
+    assert summary["failures"][0]["traceback"].endswith("ValueError: boom")
+    assert summary["failed_files"] == ["tests/test_a.py"]
+
+
+def test_parse_jest_json(tmp_path):
+    report = tmp_path / "report.json"
+    report.write_text(
+        json.dumps(
+            {
+                "testResults": [
+                    {
+                        "name": "/repo/src/a.test.js",
+                        "status": "failed",
+                        "assertionResults": [
+                            {"status": "passed", "fullName": "adds"},
+                            {
+                                "status": "failed",
+                                "fullName": "subtracts",
+                                "failureMessages": ["Expected 1\nReceived 2"],
+                            },
+                        ],
+                    },
+                    {
+                        "name": "/repo/src/b.test.js",
+                        "status": "failed",
+                        "message": "SyntaxError: Unexpected token",
+                        "assertionResults": [],
+                    },
+                ]
+            }
+        )
+    )
+    summary = parse_jest_json(str(report), root="/repo")
+    assert (summary["passed"], summary["failed"], summary["errors"]) == (1, 1, 1)
+    assert summary["failures"][0]["id"] == "src/a.test.js > subtracts"
+    assert summary["failed_files"] == ["src/a.test.js", "src/b.test.js"]
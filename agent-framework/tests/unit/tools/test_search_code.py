@@ -0,0 +1,91 @@
+"""Tests for the search_code tool."""
+
+import subprocess
+
+import pytest
+
+from prometheus_swarm.tools.code_operations.implementations import search_code
+from prometheus_swarm.tools.code_operations.search_index import (
+    drop_search_index,
+    get_search_index,
+    required_literals,
+)
+from prometheus_swarm.utils.workspace_index import drop_workspace_index
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text(
+        "import os\n\n\ndef load_config(path):\n    return open(path).read()\n"
+    )
+    (tmp_path / "src" / "util.js").write_text(
+        "export function loadConfig(path) {\n  return fetch(path);\n}\n"
+    )
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_app.py").write_text(
+        "from src.app import load_config\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    drop_search_index(tmp_path)
+    drop_workspace_index(tmp_path)
+
+
+def test_literal_search_with_context(repo):
+    result = search_code("def load_config", context_lines=1)
+    assert result["success"]
+    (match,) = result["data"]["matches"]
+    assert match["file"] == "src/app.py"
+    assert match["line"] == 4
+    assert match["before"] == [""]
+    assert match["after"] == ["    return open(path).read()"]
+    assert result["data"]["used_index"] is True
+    assert result["data"]["files_searched"] == 1
+
+
+def test_regex_case_insensitive_and_globs(repo):
+    result = search_code(r"load_?config", regex=True, case_sensitive=False)
+    files = [m["file"] for m in result["data"]["matches"]]
+    assert files == ["src/app.py", "src/util.js", "tests/test_app.py"]
+
+    result = search_code(
+        r"load_?config",
+        regex=True,
+        case_sensitive=False,
+        include=["*.py"],
+        exclude=["tests/*"],
+    )
+    assert [m["file"] for m in result["data"]["matches"]] == ["src/app.py"]
+
+
+def test_results_are_capped(repo):
+    (repo / "many.txt").write_text("needle\n" * 20)
+    result = search_code("needle", max_results=5, context_lines=0)
+    assert len(result["data"]["matches"]) == 5
+    assert result["data"]["truncated"] is True
+
+
+def test_index_picks_up_changes(repo):
+    assert search_code("brand_new_symbol")["data"]["matches"] == []
+    (repo / "src" / "app.py").write_text("brand_new_symbol = 1\n")
+    index = get_search_index(repo)
+    assert index.refresh() == 1
+    assert search_code("brand_new_symbol")["data"]["matches"][0]["line"] == 1
+
+
+def test_required_literals():
+    assert required_literals("foo", is_regex=False) == ["foo"]
+    assert required_literals(r"def \w+_handler\(", is_regex=True) == [
+        "def ",
+        "_handler(",
+    ]
+    assert required_literals("(foo|bar)baz", is_regex=True) == ["baz"]
+    assert required_literals("a.b", is_regex=True) == []
+
+
+def test_invalid_regex(repo):
+    result = search_code("(unclosed", regex=True)
+    assert not result["success"]
+    assert "Invalid regular expression" in result["message"]
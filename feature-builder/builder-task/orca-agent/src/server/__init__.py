@@ -8,6 +8,12 @@ from prometheus_swarm.utils.logging import (
     log_key_value,
     log_value,
 )
+from prometheus_swarm.utils.tracing import (
+    configure_tracing,
+    begin_span,
+    end_span,
+    set_span_attributes,
+)
 from src.database import initialize_database
 from colorama import Fore, Style
 import uuid
@@ -24,6 +30,18 @@ def create_app():
         request.id = str(uuid.uuid4())
         # Store request start time for duration calculation
         request.start_time = request.environ.get("REQUEST_TIME", 0)
+        # Continue the caller's trace (if any) with a span for this request
+        round_number = (request.view_args or {}).get("round_number")
+        request.trace_span = begin_span(
+            f"{request.method} {request.url_rule or request.path}",
+            attributes={
+                "http.method": request.method,
+                "http.target": request.path,
+                "request.id": request.id,
+                "round_number": round_number,
+            },
+            headers=dict(request.headers),
+        )
 
     @app.after_request
     def after_request(response):
@@ -41,6 +59,8 @@ def create_app():
                 # If we can't get JSON data, try to get the message from the response
                 error_msg = getattr(response, "description", "")
 
+        set_span_attributes(**{"http.status_code": response.status_code})
+
         # Log the request with appropriate color
         color = Fore.GREEN if response.status_code < 400 else Fore.RED
         log_value(
@@ -50,6 +70,10 @@ def create_app():
 
         return response
 
+    @app.teardown_request
+    def teardown_request(error=None):
+        end_span(getattr(request, "trace_span", None), error=error)
+
     # Register blueprints
     app.register_blueprint(healthz.bp)
     app.register_blueprint(task.bp)
@@ -60,6 +84,8 @@ def create_app():
     with app.app_context():
         # Set up logging (includes both console and database logging)
         configure_logging()
+        # Set up span export (no-op unless OTEL_EXPORTER_OTLP_ENDPOINT or TRACE_FILE is set)
+        configure_tracing(os.getenv("OTEL_SERVICE_NAME", "builder-task"))
         # Initialize database
         initialize_database()
         # Disable Flask's default logging
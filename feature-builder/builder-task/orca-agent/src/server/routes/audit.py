@@ -102,7 +102,7 @@ def audit_worker_submission(round_number: str):
         return jsonify(
             {
                 "success": True,
-                "message": "Error during PR review, defaulting to pass",
+                "message": f"Error during PR review ({e}), defaulting to pass",
                 "data": {"passed": True},
             }
         )
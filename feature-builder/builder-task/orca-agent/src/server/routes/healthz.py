@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify
 from src.database import get_db
+from prometheus_swarm.utils.github_gateway import get_gateway
 
 bp = Blueprint("healthz", __name__)
 
@@ -9,3 +10,11 @@ def healthz():
     # Test database connection
     _ = get_db()
     return jsonify({"status": "ok"})
+
+
+@bp.get("/github-budget")
+def github_budget():
+    # Rate limit state from the last GitHub response, and use per subsystem
+    gateway = get_gateway()
+    gateway.observe()
+    return jsonify(gateway.budget.metrics())
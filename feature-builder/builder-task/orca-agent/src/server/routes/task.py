@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 from src.server.services import task_service
 from prometheus_swarm.utils.logging import logger
+from prometheus_swarm.utils.tracing import inject_trace_headers
 import requests
 import os
 
@@ -101,6 +102,9 @@ def start_task(round_number, node_type, request):
         return jsonify({"success": False, "message": error}), status
 
     logger.info(response_data["message"])
+    conflict_prediction = response_data.get("conflict_prediction")
+    if conflict_prediction:
+        logger.info(f"Conflict prediction: {conflict_prediction['stats']}")
 
     # Record PR for both worker and leader tasks, but only workers record remotely
     response = task_service.record_pr(
@@ -118,13 +122,14 @@ def start_task(round_number, node_type, request):
         error = response.get("error", "Unknown error")
         return jsonify({"success": False, "message": error}), status
 
-    return jsonify(
-        {
-            "success": True,
-            "message": response_data["message"],
-            "pr_url": response_data["pr_url"],
-        }
-    )
+    result = {
+        "success": True,
+        "message": response_data["message"],
+        "pr_url": response_data["pr_url"],
+    }
+    if conflict_prediction:
+        result["conflict_prediction"] = conflict_prediction
+    return jsonify(result)
 
 
 @bp.post("/update-audit-result/<task_id>/<round_number>")
@@ -139,7 +144,7 @@ def update_audit_result(task_id, round_number):
                 "taskId": task_id,
                 "round": round_number,
             },
-            headers={"Content-Type": "application/json"},
+            headers=inject_trace_headers({"Content-Type": "application/json"}),
         )
         response.raise_for_status()
 
@@ -4,9 +4,12 @@ from prometheus_swarm.clients import setup_client
 from src.workflows.audit.workflow import AuditWorkflow
 from src.workflows.audit.prompts import PROMPTS as AUDIT_PROMPTS
 from prometheus_swarm.utils.logging import log_error
+from prometheus_swarm.utils.tracing import traced, inject_trace_headers
 import re
 import requests
-from github import Github
+from prometheus_swarm.utils.github_batch import fetch_pull_requests
+from prometheus_swarm.utils.github_gateway import get_gateway
+from prometheus_swarm.utils.github_budget import github_subsystem
 import os
 from git import Repo
 from typing import Tuple, Dict
@@ -15,6 +18,8 @@ from src.workflows.utils import verify_pr_signatures
 import json
 
 
+@traced("audit_service.verify_pr_ownership")
+@github_subsystem("audit")
 def verify_pr_ownership(
     pr_url: str,
     expected_username: str,
@@ -46,7 +51,7 @@ def verify_pr_ownership(
     response = requests.get(
         os.environ["MIDDLE_SERVER_URL"]
         + f"/api/builder/get-source-repo/{node_type}/{uuid}",
-        headers={"Content-Type": "application/json"},
+        headers=inject_trace_headers({"Content-Type": "application/json"}),
     )
 
     response_data = response.json()
@@ -99,7 +104,7 @@ def verify_pr_ownership(
         print(f"Node action: {node_actions.get(node_type)}")
         print(f"Node endpoint: {node_endpoints.get(node_type)}")
 
-        gh = Github(os.environ.get("GITHUB_TOKEN"))
+        gh = get_gateway(os.environ.get("GITHUB_TOKEN"))
 
         # Parse PR URL
         match = re.match(r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)", pr_url)
@@ -131,8 +136,7 @@ def verify_pr_ownership(
             }
 
         # Get PR and verify author
-        repo = gh.get_repo(f"{owner}/{repo_name}")
-        pr = repo.get_pull(int(pr_number))
+        pr = gh.get_pull(f"{owner}/{repo_name}", int(pr_number))
 
         if pr.user.login != expected_username:
             log_error(
@@ -186,7 +190,7 @@ def verify_pr_ownership(
         response = requests.post(
             middleware_url,
             json=middleware_payload,
-            headers={"Content-Type": "application/json"},
+            headers=inject_trace_headers({"Content-Type": "application/json"}),
         )
 
         response_data = response.json()
@@ -212,6 +216,8 @@ def verify_pr_ownership(
         }
 
 
+@traced("audit_service.review_pr")
+@github_subsystem("audit")
 def review_pr(pr_url, staking_key, pub_key, staking_signature, public_signature):
     """Review PR and decide if it should be accepted, revised, or rejected."""
     try:
@@ -229,12 +235,16 @@ def review_pr(pr_url, staking_key, pub_key, staking_signature, public_signature)
 
         # Run workflow and get result
         workflow.run()
-        return True
     except Exception as e:
         log_error(e, context="PR review failed")
         raise Exception("PR review failed")
+    if workflow.stop_reason:
+        raise Exception(f"PR review failed: tool loop stopped, {workflow.stop_reason}")
+    return True
 
 
+@traced("audit_service.validate_pr_list")
+@github_subsystem("audit")
 def validate_pr_list(
     pr_url: str,
     repo_owner: str,
@@ -254,7 +264,7 @@ def validate_pr_list(
         print("\nStarting leader audit...", flush=True)
         print(f"PR URL: {pr_url}", flush=True)
 
-        gh = Github(os.environ["GITHUB_TOKEN"])
+        gh = get_gateway(os.environ["GITHUB_TOKEN"])
 
         # Parse PR URL and get PR object
         match = re.match(r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)", pr_url)
@@ -269,7 +279,7 @@ def validate_pr_list(
 
         # Get source repo and PR
         source_repo = gh.get_repo(f"{repo_owner}/{repo_name}")
-        pr = source_repo.get_pull(int(pr_number))
+        pr = gh.get_pull(f"{repo_owner}/{repo_name}", int(pr_number))
         print(f"PR base repo: {pr.base.repo.full_name}", flush=True)
         print(f"PR head repo: {pr.head.repo.full_name}", flush=True)
 
@@ -344,6 +354,13 @@ def validate_pr_list(
         # Track used PR URLs to prevent duplicates
         used_pr_urls = set()
 
+        # Fetch the worker PRs named in the merge commits together
+        pr_url_pattern = r"https://github\.com/[^/\s]+/[^/\s]+/pull/\d+"
+        commit_pr_urls = [
+            url for c in merge_commits for url in re.findall(pr_url_pattern, c.message)
+        ]
+        pull_requests = fetch_pull_requests(commit_pr_urls, gateway=gh)
+
         # Verify each merge commit corresponds to a PR from the PR list
         for commit in merge_commits:
             print(f"\nChecking commit: {commit.hexsha[:8]}", flush=True)
@@ -376,11 +393,13 @@ def validate_pr_list(
                         )
                         continue
 
-                    pr_owner, pr_repo_name, pr_number = pr_match.groups()
+                    pr_number = pr_match.group(3)
 
-                    # Fetch the PR to extract the staking key from its description
-                    pr_repo = gh.get_repo(f"{pr_owner}/{pr_repo_name}")
-                    worker_pr = pr_repo.get_pull(int(pr_number))
+                    # The PR's description holds the worker's staking key
+                    worker_pr = pull_requests.get(merge_pr_url)
+                    if worker_pr is None:
+                        print(f"Warning: Could not fetch PR {merge_pr_url}")
+                        continue
 
                     # Extract staking key from PR body
                     staking_section = extract_section(worker_pr.body, "STAKING_KEY")
@@ -2,10 +2,12 @@
 
 import requests
 import os
-from github import Github
+from prometheus_swarm.utils.github_gateway import get_gateway
+from prometheus_swarm.utils.github_budget import github_subsystem
 from src.database import get_db, Submission
 from prometheus_swarm.clients import setup_client
 from prometheus_swarm.utils.logging import logger, log_error
+from prometheus_swarm.utils.tracing import traced, inject_trace_headers
 from src.workflows.task.workflow import TaskWorkflow
 from src.workflows.mergeconflict.workflow import MergeConflictWorkflow
 from src.workflows.mergeconflict.prompts import PROMPTS as CONFLICT_PROMPTS
@@ -17,6 +19,8 @@ import time
 load_dotenv()
 
 
+@traced("task_service.complete_todo")
+@github_subsystem("task")
 def complete_todo(
     task_id,
     round_number,
@@ -64,7 +68,7 @@ def complete_todo(
             }
 
         # Check if base branch exists in target repo
-        github = Github(os.environ["GITHUB_TOKEN"])
+        github = get_gateway(os.environ["GITHUB_TOKEN"])
         try:
             repo_url = f"{repo_owner}/{repo_name}"
             logger.info(f"Attempting to find repository: {repo_url}")
@@ -133,6 +137,7 @@ def complete_todo(
         }
 
 
+@traced("task_service.get_task_details")
 def get_task_details(signature, staking_key, pub_key, task_type):
     """Get task details from middle server."""
 
@@ -150,7 +155,7 @@ def get_task_details(signature, staking_key, pub_key, task_type):
                 "stakingKey": staking_key,
                 "pubKey": pub_key,
             },
-            headers={"Content-Type": "application/json"},
+            headers=inject_trace_headers({"Content-Type": "application/json"}),
         )
         response.raise_for_status()
         result = response.json()
@@ -187,6 +192,8 @@ def get_task_details(signature, staking_key, pub_key, task_type):
         }
 
 
+@traced("task_service.run_todo_task")
+@github_subsystem("task")
 def run_todo_task(
     task_id,
     round_number,
@@ -270,6 +277,10 @@ def run_todo_task(
 
         # Run workflow and get PR URL
         pr_url = workflow.run()
+        if not pr_url:
+            submission.status = "failed"
+            db.commit()
+            return _workflow_failed("Task workflow failed to create PR", workflow)
 
         # Store PR URL in local DB immediately
         submission.pr_url = pr_url
@@ -307,6 +318,16 @@ def run_todo_task(
         return {"success": False, "status": 500, "error": str(e)}
 
 
+def _workflow_failed(error: str, workflow) -> dict:
+    """Service response for a workflow that returned no PR."""
+    response = {"success": False, "status": 500, "error": error}
+    if workflow.stop_reason:
+        # The agent's tool loop ran out of budget
+        response["error"] = f"{error}: tool loop stopped, {workflow.stop_reason}"
+        response["stop_reason"] = workflow.stop_reason
+    return response
+
+
 def _check_existing_pr(round_number: int, task_id: str) -> dict:
     """Check if we already have a completed record for this round in local DB.
 
@@ -342,6 +363,7 @@ def _check_existing_pr(round_number: int, task_id: str) -> dict:
         return {"success": False, "status": 500, "error": str(e)}
 
 
+@traced("task_service._store_pr_remotely")
 def _store_pr_remotely(
     staking_key: str,
     staking_signature: str,
@@ -417,7 +439,7 @@ def _store_pr_remotely(
         response = requests.post(
             os.environ["MIDDLE_SERVER_URL"] + endpoint,
             json=payload,
-            headers={"Content-Type": "application/json"},
+            headers=inject_trace_headers({"Content-Type": "application/json"}),
         )
         response.raise_for_status()
         return {
@@ -493,6 +515,7 @@ def _store_pr_locally(
         return {"success": False, "status": 500, "error": str(e)}
 
 
+@traced("task_service.record_pr")
 def record_pr(
     staking_key,
     staking_signature,
@@ -623,6 +646,8 @@ def record_pr(
     }
 
 
+@traced("task_service.consolidate_prs")
+@github_subsystem("task")
 def consolidate_prs(
     task_id, round_number, staking_key, pub_key, staking_signature, public_signature
 ):
@@ -641,6 +666,7 @@ def consolidate_prs(
 
         # If we have an existing PR, we'll use it
         pr_url = None
+        conflict_prediction = None
         if existing_submission and existing_submission.pr_url:
             pr_url = existing_submission.pr_url
             logger.info(
@@ -692,7 +718,7 @@ def consolidate_prs(
             )
 
             # Get source fork
-            github = Github(os.environ["GITHUB_TOKEN"])
+            github = get_gateway(os.environ["GITHUB_TOKEN"])
             source_fork = github.get_repo(f"{repo_owner}/{repo_name}")
 
             # Verify this is a fork
@@ -728,6 +754,7 @@ def consolidate_prs(
 
             # Run workflow
             pr_url = workflow.run()
+            conflict_prediction = workflow.conflict_prediction
             if not pr_url:
                 log_error(
                     Exception("No PR URL returned from workflow"),
@@ -735,16 +762,13 @@ def consolidate_prs(
                 )
                 submission.status = "failed"
                 db.commit()
-                return {
-                    "success": False,
-                    "status": 500,
-                    "error": "Merge workflow failed to create PR",
-                }
+                return _workflow_failed("Merge workflow failed to create PR", workflow)
 
-        return {
-            "success": True,
-            "data": {"pr_url": pr_url, "message": "PRs consolidated successfully"},
-        }
+        data = {"pr_url": pr_url, "message": "PRs consolidated successfully"}
+        if conflict_prediction is not None:
+            # Which worker PRs overlapped, and how they were grouped and ordered
+            data["conflict_prediction"] = conflict_prediction
+        return {"success": True, "data": data}
 
     except Exception as e:
         log_error(e, context="PR consolidation failed")
@@ -767,6 +791,7 @@ def consolidate_prs(
         return {"success": False, "status": 500, "error": str(e)}
 
 
+@github_subsystem("task")
 def create_aggregator_repo(task_id):
     """Create an aggregator repo for a given round and task.
 
@@ -782,7 +807,7 @@ def create_aggregator_repo(task_id):
     """
     try:
         # Initialize GitHub client with token
-        github = Github(os.environ["GITHUB_TOKEN"])
+        github = get_gateway(os.environ["GITHUB_TOKEN"])
         username = os.environ["GITHUB_USERNAME"]
 
         # Get issue UUID and repo info from assign_issue response
@@ -929,6 +954,7 @@ def create_aggregator_repo(task_id):
 #         return {"status": e.response.status_code, "error": e.response.text}
 
 
+@traced("task_service.assign_issue")
 def assign_issue(task_id):
     try:
         logger.info(
@@ -941,7 +967,7 @@ def assign_issue(task_id):
         response = requests.post(
             os.environ["MIDDLE_SERVER_URL"] + "/api/builder/assign-issue",
             json={"taskId": task_id, "githubUsername": os.environ["GITHUB_USERNAME"]},
-            headers={"Content-Type": "application/json"},
+            headers=inject_trace_headers({"Content-Type": "application/json"}),
         )
         logger.info(f"Response status code: {response.status_code}")
         logger.info(f"Response headers: {response.headers}")
@@ -988,6 +1014,7 @@ def assign_issue(task_id):
         }
 
 
+@traced("task_service.add_aggregator_info")
 def add_aggregator_info(task_id, staking_key, pub_key, signature):
     """Add aggregator info to the middle server.
 
@@ -1012,7 +1039,7 @@ def add_aggregator_info(task_id, staking_key, pub_key, signature):
         response = requests.post(
             os.environ["MIDDLE_SERVER_URL"] + "/api/builder/add-aggregator-info",
             json=payload,
-            headers={"Content-Type": "application/json"},
+            headers=inject_trace_headers({"Content-Type": "application/json"}),
         )
         response.raise_for_status()
         result = response.json()
@@ -25,7 +25,10 @@ class AuditPhase(WorkflowPhase):
             prompt_name="review_pr",
             available_tools=[
                 "read_file",
+                "read_files",
                 "list_files",
+                "search_code",
+                "get_file_outline",
                 "run_tests",
                 "review_pull_request",
             ],
@@ -100,7 +100,7 @@ class AuditWorkflow(Workflow):
         os.system("git checkout FETCH_HEAD")
 
         # Get current files for context
-        self.context["current_files"] = get_current_files()
+        self.context["current_files"] = get_current_files(self.context["repo_path"])
 
     def cleanup(self):
         """Clean up repository."""
@@ -117,8 +117,9 @@ class AuditWorkflow(Workflow):
             audit_result = audit_phase.execute()
 
             if not audit_result or not audit_result.get("success"):
+                self.stop_reason = audit_phase.stop_reason
                 log_error(
-                    Exception(audit_result.get("error", "No result")),
+                    Exception((audit_phase.result or {}).get("error") or "No result"),
                     "Audit failed",
                 )
                 return None
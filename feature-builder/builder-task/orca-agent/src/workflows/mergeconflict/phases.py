@@ -2,6 +2,7 @@
 
 from typing import List
 from prometheus_swarm.workflows.base import WorkflowPhase, Workflow, requires_context
+from prometheus_swarm.utils.conflict_hunks import ConflictHunk
 
 
 @requires_context(
@@ -19,7 +20,10 @@ class ConflictResolutionPhase(WorkflowPhase):
             prompt_name="resolve_conflicts",
             available_tools=[
                 "read_file",
+                "read_files",
                 "list_files",
+                "search_code",
+                "get_file_outline",
                 "resolve_conflict",
             ],
             conversation_id=conversation_id,
@@ -27,6 +31,27 @@ class ConflictResolutionPhase(WorkflowPhase):
         )
 
 
+class HunkResolutionPhase(WorkflowPhase):
+    """Resolve one conflicting hunk, given only the hunk and nearby code."""
+
+    def __init__(self, workflow: Workflow, hunk: ConflictHunk):
+        super().__init__(
+            workflow=workflow,
+            prompt_name="resolve_hunk",
+            available_tools=["submit_hunk_resolution"],
+            required_tool="submit_hunk_resolution",
+            name=f"Hunk Resolution ({hunk.path})",
+            prompt_context={
+                "file_path": hunk.path,
+                "before": hunk.before,
+                "base": hunk.base,
+                "ours": hunk.ours,
+                "theirs": hunk.theirs,
+                "after": hunk.after,
+            },
+        )
+
+
 # @requires_context(
 #     templates={
 #         "source_fork": Dict[str, str],  # Source fork info (url, owner, name, branch)
@@ -57,6 +82,7 @@ class CreatePullRequestPhase(WorkflowPhase):
             prompt_name="create_consolidated_pr",
             available_tools=[
                 "read_file",
+                "read_files",
                 "list_files",
                 "create_leader_pull_request",
             ],
@@ -80,8 +106,14 @@ class TestVerificationPhase(WorkflowPhase):
             available_tools=[
                 "run_tests",
                 "read_file",
+                "read_files",
                 "write_file",
+                "edit_file",
+                "write_files",
+                "flush_commits",
                 "list_files",
+                "search_code",
+                "get_file_outline",
             ],
             conversation_id=conversation_id,
             name="Test Verification",
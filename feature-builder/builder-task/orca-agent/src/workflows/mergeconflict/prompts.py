@@ -35,6 +35,18 @@ PROMPTS = {
         "- Consider implications for other parts of the codebase\n\n"
         "Current repository state:\n{current_files}\n\n"
     ),
+    "resolve_hunk": (
+        "Resolve a single merge conflict in {file_path}.\n\n"
+        "Code before the conflict:\n```\n{before}```\n\n"
+        "Common ancestor:\n```\n{base}```\n\n"
+        "Our version (already merged PRs):\n```\n{ours}```\n\n"
+        "Their version (the PR being merged):\n```\n{theirs}```\n\n"
+        "Code after the conflict:\n```\n{after}```\n\n"
+        "Combine both versions so that the intent of each change is preserved, then "
+        "call submit_hunk_resolution with the text replacing the conflict. Submit "
+        "only that text, without the surrounding code or conflict markers, and keep "
+        "the file's indentation and style.\n"
+    ),
     "create_consolidated_pr": (
         "Create a descriptive title and summary for a pull request that consolidates multiple changes.\n\n"
         "Guidelines:\n"
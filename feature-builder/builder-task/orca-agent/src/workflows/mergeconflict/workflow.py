@@ -1,9 +1,13 @@
 """Merge conflict resolver workflow implementation."""
 
 import os
-from github import Github
+from git import GitCommandError, Repo
+from prometheus_swarm.utils.github_budget import github_subsystem
+from prometheus_swarm.utils.github_gateway import get_gateway
 from prometheus_swarm.workflows.base import Workflow
 from prometheus_swarm.utils.logging import log_section, log_key_value, log_error
+from prometheus_swarm.utils.merge_engine import MergeCandidate, MergeEngine
+from prometheus_swarm.utils.conflict_hunks import resolve_conflicts
 from prometheus_swarm.tools.github_operations.parser import extract_section
 from prometheus_swarm.utils.signatures import verify_and_parse_signature
 from prometheus_swarm.workflows.utils import (
@@ -15,6 +19,7 @@ from prometheus_swarm.workflows.utils import (
 from src.workflows.mergeconflict.phases import (
     ConflictResolutionPhase,
     CreatePullRequestPhase,
+    HunkResolutionPhase,
     TestVerificationPhase,
 )
 
@@ -48,6 +53,8 @@ class MergeConflictWorkflow(Workflow):
 
         # Initialize conversation ID
         self.conversation_id = None
+        # Predicted overlaps between the merged PRs (see ConflictIndex.to_dict)
+        self.conflict_prediction = None
 
         check_required_env_vars([github_token, github_username])
         self.context["github_token"] = os.getenv(github_token)
@@ -87,7 +94,7 @@ class MergeConflictWorkflow(Workflow):
         )
 
         # Get upstream repo info and add to context
-        gh = Github(self.context["github_token"])
+        gh = get_gateway(self.context["github_token"])
         source_fork = gh.get_repo(f"{source_fork_owner}/{source_repo_name}")
         upstream = source_fork.parent
 
@@ -224,80 +231,68 @@ class MergeConflictWorkflow(Workflow):
             log_error(e, "Failed to set up repository")
             return False
 
-    def merge_pr(self, pr_url, pr_title):
-        """Merge a single PR into the head branch."""
-        # Extract PR info from URL
-        parts = pr_url.strip("/").split("/")
-        pr_number = int(parts[-1])
-        pr_repo_owner = parts[-4]
-        pr_repo_name = parts[-3]
+    def _pr_branch(self, pr):
+        """Name of the branch holding a PR's contents, pushed for auditing."""
+        parts = pr.html_url.strip("/").split("/")
+        return f"pr-{pr.number}-{parts[-4]}-{parts[-3]}"
+
+    def fetch_prs(self, prs):
+        """Fetch the PRs' heads into local branches with a single fetch."""
+        remote = "origin" if self.is_source_fork_owner else "source"
+        refspecs = [f"+pull/{pr.number}/head:{self._pr_branch(pr)}" for pr in prs]
+        log_key_value(f"Fetching PRs from {remote}", len(refspecs))
+        Repo(self.context["repo_path"]).git.fetch(remote, *refspecs)
+
+    def record_merge(self, pr):
+        """Track a merged PR for the consolidated PR's description."""
+        self.context["merged_prs"].append(pr.number)
+        self.context["pr_details"].append(
+            {
+                "number": pr.number,
+                "title": pr.title,
+                "url": pr.html_url,
+                "source_owner": pr.user.login,  # The PR's author, not the repo owner
+            }
+        )
+        print(f"Successfully merged PR #{pr.number}")
 
-        try:
-            # Get the actual PR author from the GitHub API
-            gh = Github(self.context["github_token"])
-            repo = gh.get_repo(f"{pr_repo_owner}/{pr_repo_name}")
-            pr = repo.get_pull(pr_number)
-            pr_author = pr.user.login  # Get the actual author's GitHub username
-
-            print(f"PR #{pr_number} created by GitHub user: {pr_author}")
-
-            # Create unique branch name for PR content
-            pr_branch = f"pr-{pr_number}-{pr_repo_owner}-{pr_repo_name}"
-            print(
-                f"Attempting to merge PR #{pr_number} from {pr_repo_owner}/{pr_repo_name}"
-            )
-            print(f"Creating branch: {pr_branch}")
-            print(f"Current directory: {os.getcwd()}")
-            print("Git remotes:")
-            remotes_output = os.popen("git remote -v 2>&1").read()
-            print(remotes_output)
+    def resolve_hunk(self, hunk):
+        """Resolve one conflicting hunk in its own small conversation."""
+        result = HunkResolutionPhase(workflow=self, hunk=hunk).execute()
+        if not result:
+            return None
+        return result["data"].get("resolution")
 
-            # Always create a new branch with PR contents, regardless of fork ownership
-            if self.is_source_fork_owner:
-                # Even though we own the fork, create a new branch from the PR's HEAD
-                print("Fetching PR from origin (we own the fork)")
-                fetch_output = os.popen(
-                    f"git fetch origin pull/{pr_number}/head 2>&1"
-                ).read()
-                print(f"Fetch output: {fetch_output}")
-                checkout_output = os.popen(
-                    f"git checkout -b {pr_branch} FETCH_HEAD 2>&1"
-                ).read()
-                print(f"Checkout output: {checkout_output}")
-            else:
-                # Fetch PR from source fork into new branch
-                print("Fetching PR from source remote")
-                fetch_output = os.popen(
-                    f"git fetch source pull/{pr_number}/head 2>&1"
-                ).read()
-                print(f"Fetch output: {fetch_output}")
-                checkout_output = os.popen(
-                    f"git checkout -b {pr_branch} FETCH_HEAD 2>&1"
-                ).read()
-                print(f"Checkout output: {checkout_output}")
-
-            # Push PR branch to our fork for auditing
-            print(f"Pushing branch {pr_branch} to origin")
-            push_output = os.popen(f"git push origin {pr_branch} 2>&1").read()
-            print(f"Push output: {push_output}")
-
-            # Try to merge into head branch
-            print(f"Checking out head branch: {self.context['head_branch']}")
-            checkout_output = os.popen(
-                f"git checkout {self.context['head_branch']} 2>&1"
-            ).read()
-            print(f"Checkout output: {checkout_output}")
+    def merge_pr(self, pr):
+        """Merge a conflicting PR in the working tree, resolving its conflicts."""
+        pr_branch = self._pr_branch(pr)
+        repo = Repo(self.context["repo_path"])
 
+        try:
             print(f"Attempting to merge {pr_branch}")
-            merge_output = os.popen(
-                f"git merge --no-commit --no-ff {pr_branch} 2>&1"
-            ).read()
-            print(f"Merge output: {merge_output}")
-
-            # Handle conflicts through the ConflictResolutionPhase
-            if "CONFLICT" in merge_output:
+            try:
+                repo.git.merge("--no-commit", "--no-ff", pr_branch)
+            except GitCommandError as e:
+                # A conflicted merge exits non-zero; anything else is an error
+                if not repo.index.unmerged_blobs():
+                    raise
+                print(f"Merge output: {e.stdout.strip()}")
+
+            # Resolve conflicts hunk by hunk, and whatever is left through the
+            # ConflictResolutionPhase
+            if repo.index.unmerged_blobs():
                 print("Merge conflicts detected, attempting resolution")
-                self.context["current_files"] = get_current_files()
+                hunks = resolve_conflicts(self.context["repo_path"], self.resolve_hunk)
+                log_key_value(
+                    "Resolved by hunk",
+                    f"{len(hunks['resolved'])} files "
+                    f"({hunks['auto_resolved']}/{hunks['hunks']} hunks trivial)",
+                )
+
+            if repo.index.unmerged_blobs():
+                self.context["current_files"] = get_current_files(
+                    self.context["repo_path"]
+                )
                 resolution_phase = ConflictResolutionPhase(
                     workflow=self,
                     conversation_id=getattr(
@@ -310,49 +305,63 @@ class MergeConflictWorkflow(Workflow):
                 self.conversation_id = resolution_phase.conversation_id
 
                 if not resolution_result or not resolution_result.get("success"):
+                    self.stop_reason = resolution_phase.stop_reason
                     raise Exception("Failed to resolve conflicts")
                 print("Successfully resolved conflicts")
 
             # Commit the merge with branch name and PR URL
             print("Committing merge")
-            commit_output = os.popen(
-                f'git commit -m "Merged branch {pr_branch} for PR {pr_url}" 2>&1'
-            ).read()
-            print(f"Commit output: {commit_output}")
-
-            print(f"Pushing merged changes to {self.context['head_branch']}")
-            push_output = os.popen(
-                f"git push origin {self.context['head_branch']} 2>&1"
-            ).read()
-            print(f"Push output: {push_output}")
-
-            # Only track successfully merged PRs
-            self.context["merged_prs"].append(pr_number)
-            self.context["pr_details"].append(
-                {
-                    "number": pr_number,
-                    "title": pr_title,
-                    "url": pr_url,
-                    "source_owner": pr_author,  # Use the actual PR author instead of repo owner
-                }
-            )
-            print(f"Successfully merged PR #{pr_number}")
-            return {"success": True, "message": f"Successfully merged PR #{pr_number}"}
+            repo.git.commit("-m", f"Merged branch {pr_branch} for PR {pr.html_url}")
+
+            self.record_merge(pr)
+            return {"success": True, "message": f"Successfully merged PR #{pr.number}"}
 
         except Exception as e:
-            log_error(e, f"Failed to merge PR #{pr_number}")
+            log_error(e, f"Failed to merge PR #{pr.number}")
             print(f"Current directory: {os.getcwd()}")
             print("Git status:")
-            status_output = os.popen("git status 2>&1").read()
-            print(status_output)
-            print("Git branch:")
-            branch_output = os.popen("git branch 2>&1").read()
-            print(branch_output)
+            print(repo.git.status())
             print("Git log:")
-            log_output = os.popen("git log --oneline -n 5 2>&1").read()
-            print(log_output)
+            print(repo.git.log("--oneline", "-n", "5"))
             return {"success": False, "message": str(e)}
 
+    def merge_prs(self, prs):
+        """Merge PRs into the head branch and push it once.
+
+        PRs that merge cleanly are merged in memory first, in an order that
+        minimizes predicted conflicts; only the rest go through conflict
+        resolution.
+        """
+        head_branch = self.context["head_branch"]
+        self.fetch_prs(prs)
+
+        by_url = {pr.html_url: pr for pr in prs}
+        candidates = [
+            MergeCandidate(
+                ref=self._pr_branch(pr),
+                message=f"Merged branch {self._pr_branch(pr)} for PR {pr.html_url}",
+                key=pr.html_url,
+            )
+            for pr in prs
+        ]
+        result = MergeEngine(self.context["repo_path"]).merge(head_branch, candidates)
+        self.conflict_prediction = result.index.to_dict()
+        for candidate in result.merged:
+            self.record_merge(by_url[candidate.key])
+
+        for candidate in result.conflicting:
+            log_section(f"Resolving conflicts for {candidate.ref}")
+            merged = self.merge_pr(by_url[candidate.key])
+            if not merged["success"]:
+                return merged
+
+        # Push the merged branch, and each PR's branch for auditing
+        branches = [head_branch] + [self._pr_branch(pr) for pr in prs]
+        print(f"Pushing {len(branches)} branches to origin")
+        Repo(self.context["repo_path"]).git.push("origin", *branches)
+        return {"success": True, "message": f"Merged {len(prs)} PRs"}
+
+    @github_subsystem("task")
     def run(self):
         """Execute the merge conflict workflow."""
         try:
@@ -361,7 +370,7 @@ class MergeConflictWorkflow(Workflow):
                 return None
 
             # Get list of PRs to process
-            gh = Github(self.context["github_token"])
+            gh = get_gateway(self.context["github_token"])
             source_fork = gh.get_repo(
                 f"{self.source_fork_owner}/{self.context['source_fork']['name']}"
             )
@@ -381,32 +390,32 @@ class MergeConflictWorkflow(Workflow):
                 log_error(Exception("No open PRs found"), "No PRs to process")
                 return None
 
-            # Process each PR in chronological order
+            # Validate each PR in chronological order
+            prs_to_merge = []
             for pr in open_prs:
-                log_section(f"Processing PR #{pr.number}")
-
                 try:
                     # Validate PR and check if we should merge it
-                    should_merge = self.validate_pr_for_merge(pr)
-                    if not should_merge:
+                    if not self.validate_pr_for_merge(pr):
                         print(
                             f"Skipping PR #{pr.number} - not in PR list or wrong staking key"
                         )
                         continue
-
-                    # If we get here, validation passed and we should merge
-                    result = self.merge_pr(pr_url=pr.html_url, pr_title=pr.title)
-                    if not result["success"]:
-                        log_error(
-                            Exception(result.get("message", "Unknown error")),
-                            f"Failed to merge PR #{pr.number}",
-                        )
-                        return None
+                    prs_to_merge.append(pr)
 
                 except ValueError as e:
                     log_error(e, f"Validation failed for PR #{pr.number}")
                     return None
 
+            if prs_to_merge:
+                log_section(f"Merging {len(prs_to_merge)} PRs")
+                result = self.merge_prs(prs_to_merge)
+                if not result["success"]:
+                    log_error(
+                        Exception(result.get("message", "Unknown error")),
+                        "Failed to merge PRs",
+                    )
+                    return None
+
             if not self.context["merged_prs"]:
                 log_error(
                     Exception("No PRs were merged"), "No PRs were successfully merged"
@@ -415,14 +424,18 @@ class MergeConflictWorkflow(Workflow):
 
             # Run tests and fix any issues
             print("\nRunning test verification phase")
-            self.context["current_files"] = get_current_files()
+            self.context["current_files"] = get_current_files(self.context["repo_path"])
             test_phase = TestVerificationPhase(
                 workflow=self, conversation_id=self.conversation_id
             )
             test_result = test_phase.execute()
             if not test_result or not test_result.get("success"):
+                self.stop_reason = test_phase.stop_reason
                 log_error(
-                    Exception(test_result.get("error", "Test verification failed")),
+                    Exception(
+                        (test_phase.result or {}).get("error")
+                        or "Test verification failed"
+                    ),
                     "Tests failed after merging PRs",
                 )
                 return None
@@ -438,6 +451,7 @@ class MergeConflictWorkflow(Workflow):
             try:
                 pr_result = pr_phase.execute()
                 if not pr_result:
+                    self.stop_reason = pr_phase.stop_reason
                     log_error(
                         Exception("PR creation phase returned None"),
                         "PR creation failed - no result returned",
@@ -52,9 +52,15 @@ class ImplementationPhase(WorkflowPhase):
             prompt_name="implement_todo",
             available_tools=[
                 "read_file",
+                "read_files",
                 "list_files",
+                "search_code",
+                "get_file_outline",
                 "write_file",
+                "edit_file",
+                "write_files",
                 "delete_file",
+                "flush_commits",
                 "run_tests",
                 "install_dependency",
                 "setup_dependencies",
@@ -84,9 +90,13 @@ class FixImplementationPhase(WorkflowPhase):
             prompt_name="fix_implementation",
             available_tools=[
                 "read_file",
+                "read_files",
                 "list_files",
+                "search_code",
+                "get_file_outline",
                 "edit_file",
                 "delete_file",
+                "flush_commits",
                 "run_tests",
                 "install_dependency",
             ],
@@ -113,7 +123,10 @@ class ValidationPhase(WorkflowPhase):
             prompt_name="validate_criteria",
             available_tools=[
                 "read_file",
+                "read_files",
                 "list_files",
+                "search_code",
+                "get_file_outline",
                 "run_tests",
                 "validate_implementation",
             ],
@@ -51,7 +51,8 @@ PROMPTS = {
         "1. Review and understand the reported problems\n"
         "2. Make necessary changes to fix each issue\n"
         "3. Ensure changes don't introduce new problems\n"
-        "4. Run tests to verify your fixes\n"
+        "4. Run tests to verify your fixes: first re-run only the failing tests "
+        "(run_tests with only_failed), then the full suite once they pass\n"
         "5. Confirm all acceptance criteria are met\n\n"
         "STOP after fixing the implementation, do not create a pull request."
     ),
@@ -147,7 +147,7 @@ class TaskWorkflow(Workflow):
                     raise
 
         # Get current files for context
-        self.context["current_files"] = get_current_files()
+        self.context["current_files"] = get_current_files(self.context["repo_path"])
 
     def cleanup(self):
         """Clean up repository."""
@@ -164,6 +164,7 @@ class TaskWorkflow(Workflow):
             branch_result = branch_phase.execute()
 
             if not branch_result:
+                self.stop_reason = branch_phase.stop_reason
                 return None
 
             self.context["head_branch"] = branch_result["data"]["branch_name"]
@@ -175,7 +176,7 @@ class TaskWorkflow(Workflow):
                 )
 
                 # Get current files
-                self.context["current_files"] = get_current_files()
+                self.context["current_files"] = get_current_files(self.context["repo_path"])
 
                 # Run implementation
                 phase_class = (
@@ -189,6 +190,7 @@ class TaskWorkflow(Workflow):
                 implementation_result = implementation_phase.execute()
 
                 if not implementation_result:
+                    self.stop_reason = implementation_phase.stop_reason
                     return None
 
                 # Validate
@@ -196,6 +198,8 @@ class TaskWorkflow(Workflow):
                 validation_result = validation_phase.execute()
 
                 if not validation_result:
+                    # Try again, but keep the reason if validation ran out of budget
+                    self.stop_reason = validation_phase.stop_reason or self.stop_reason
                     continue
 
                 validation_data = validation_result.get("data", {})
@@ -225,7 +229,7 @@ class TaskWorkflow(Workflow):
                 time.sleep(5)  # Brief pause before retry
 
             # Create PR
-            self.context["current_files"] = get_current_files()
+            self.context["current_files"] = get_current_files(self.context["repo_path"])
 
             # Base was already set in setup()
             log_value(
@@ -237,12 +241,14 @@ class TaskWorkflow(Workflow):
             )
             pr_result = pr_phase.execute()
 
-            if pr_result.get("success"):
+            if pr_result and pr_result.get("success"):
                 pr_url = pr_result.get("data", {}).get("pr_url")
                 log_key_value("PR created successfully", pr_url)
                 return pr_url
             else:
-                log_error(Exception(pr_result.get("error")), "PR creation failed")
+                self.stop_reason = pr_phase.stop_reason
+                error = (pr_phase.result or {}).get("error")
+                log_error(Exception(error), "PR creation failed")
                 return None
 
         except Exception as e:
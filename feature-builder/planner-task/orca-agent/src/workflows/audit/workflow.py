@@ -102,7 +102,7 @@ class AuditWorkflow(Workflow):
 
 
         # Get current files for context
-        self.context["current_files"] = get_current_files()
+        self.context["current_files"] = get_current_files(self.context["repo_path"])
 
         # Add feature spec to context
         self.context["issue_spec"] = self.issueSpec
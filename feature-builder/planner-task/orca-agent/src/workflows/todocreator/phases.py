@@ -21,6 +21,7 @@ class TaskDecompositionPhase(WorkflowPhase):
             available_tools=[
                 "read_file",
                 "list_files",
+                "get_file_outline",
                 "generate_tasks",
             ],
             conversation_id=conversation_id,
@@ -99,7 +99,7 @@ class TodoCreatorWorkflow(Workflow):
   
 
         # Get current files for context
-        self.context["current_files"] = get_current_files()
+        self.context["current_files"] = get_current_files(self.context["repo_path"])
 
         # Add feature spec to context
         # self.context["feature_spec"] = self.feature_spec